@@ -84,35 +84,44 @@ class BinarySearchTree(BinaryTree):
     def add(self, key):
         """
         Adds a new key to the binary search tree.
+        The tree is rebalanced on the way back up, so the root may change.
 
         Parameters:
             key: The value of the new key to be added.
+
+        Returns:
+            BinarySearchTree: The root of the updated binary search tree after insertion.
         """
         if self._BinaryTree__key is None:
             self._BinaryTree__key = key
-            return
-        self.__add(key) # Recursively adds a new key to the binary search tree.
-        self.__height = 1 + max(self.__get_height(self._BinaryTree__left_tree), self.__get_height(self._BinaryTree__right_tree)) # Calculate the height between left and right tree
-        self.__balance_tree() # Check if tree requires balancing
+            return self
+        return self.__add(key) # Recursively adds a new key to the binary search tree.
     
     def __add(self, key):
         """
-        Recursively adds a new key to the binary search tree.
+        Recursively adds a new key to the binary search tree, rebalancing every subtree on the insertion path.
 
         Parameters:
             key: The value of the new key to be added.
+
+        Returns:
+            BinarySearchTree: The root of the subtree after insertion.
         """
         temp_key, temp_curr_key = key, self._BinaryTree__key
         if temp_key < temp_curr_key: # If new key is less than the current key, insert into the left tree
             if self._BinaryTree__left_tree is None: # If tree has not been created, create one and set key as initial key
                 self._BinaryTree__left_tree = BinarySearchTree(key)
             else:
-                self._BinaryTree__left_tree.__add(key) # If tree has been created, traverse down left-wards until left tree is not found
+                self._BinaryTree__left_tree = self._BinaryTree__left_tree.__add(key) # If tree has been created, traverse down left-wards until left tree is not found
         elif temp_key > temp_curr_key: # If new key is more than the current key, insert into the right tree
             if self._BinaryTree__right_tree is None: # If tree has not been created, create one and set key as initial key
                 self._BinaryTree__right_tree = BinarySearchTree(key)
             else:
-                self._BinaryTree__right_tree.__add(key) # If tree has been created, traverse down right-wards until right tree is not found
+                self._BinaryTree__right_tree = self._BinaryTree__right_tree.__add(key) # If tree has been created, traverse down right-wards until right tree is not found
+        else: # Key already exists
+            return self
+        self.__height = 1 + max(self.__get_height(self._BinaryTree__left_tree), self.__get_height(self._BinaryTree__right_tree)) # Calculate the height between left and right tree
+        return self.__balance_tree() # Check if tree requires balancing
 
     def delete(self, key):
         """
@@ -78,6 +78,24 @@ class BinaryTree:
             The right subtree.
         """
         return self.__right_tree
+
+    def set_left_tree(self, tree):
+        """
+        Sets the left subtree of the node.
+
+        Parameters:
+            tree (BinaryTree): The new left subtree.
+        """
+        self.__left_tree = tree
+
+    def set_right_tree(self, tree):
+        """
+        Sets the right subtree of the node.
+
+        Parameters:
+            tree (BinaryTree): The new right subtree.
+        """
+        self.__right_tree = tree
     
     def insert_left(self, key):
         """
@@ -201,4 +219,69 @@ class BinaryTree:
             return f"({left}{self.__key}{right})"
         else:
             # If either left or right subtree is None, return the key itself
-            return self.__key
\ No newline at end of file
+            return self.__key
+
+    def copy(self):
+        """
+        Builds a deep copy of the binary tree, without recursion.
+
+        Returns:
+            BinaryTree: The root of the copy.
+        """
+        root = BinaryTree(self.__key)
+        stack = [(self, root)]
+        while stack:
+            node, copy = stack.pop()
+            if node.__left_tree:
+                copy.__left_tree = BinaryTree(node.__left_tree.__key)
+                stack.append((node.__left_tree, copy.__left_tree))
+            if node.__right_tree:
+                copy.__right_tree = BinaryTree(node.__right_tree.__key)
+                stack.append((node.__right_tree, copy.__right_tree))
+        return root
+
+    def to_postfix(self):
+        """
+        Encodes the expression tree as a flat list in postfix order, without recursion.
+        A node with both subtrees is encoded as a one element tuple holding its key,
+        any other node is a leaf and is encoded as its key.
+
+        Returns:
+            list: The encoded nodes in postfix order.
+        """
+        postfix = []
+        stack = [(self, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if node.__left_tree and node.__right_tree:
+                if children_done:
+                    postfix.append((node.__key,))
+                else:
+                    stack.append((node, True))
+                    stack.append((node.__right_tree, False))
+                    stack.append((node.__left_tree, False))
+            else:
+                postfix.append(node.__key)
+        return postfix
+
+    @staticmethod
+    def from_postfix(postfix):
+        """
+        Builds an expression tree from a list encoded by to_postfix.
+
+        Parameters:
+            postfix (list): The encoded nodes in postfix order.
+
+        Returns:
+            BinaryTree: The root of the expression tree.
+        """
+        stack = []
+        for item in postfix:
+            if isinstance(item, tuple):
+                node = BinaryTree(item[0])
+                node.__right_tree = stack.pop()
+                node.__left_tree = stack.pop()
+                stack.append(node)
+            else:
+                stack.append(BinaryTree(item))
+        return stack.pop()
@@ -0,0 +1,294 @@
+#-----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Represents the dependency graph between assignment statements.
+# An edge dep -> var means that the expression of var refers to dep.
+# A topological order of the variables is maintained incrementally with the
+# Pearce-Kelly algorithm, so inserting an edge only touches the variables
+# whose order actually has to change, and cycles are detected on insertion.
+# The graph also tracks which variables are unresolved, i.e. refer directly or
+# indirectly to an undefined variable, updating the status as definitions change.
+# References: https://www.doc.ic.ac.uk/~phjk/Publications/DynamicTopoSortAlg-JEA-07.pdf
+#
+# Attributes:
+#     __dependencies (dict): Maps each defined variable to the set of variables it refers to.
+#     __dependents (dict): Maps each variable to the set of defined variables referring to it.
+#     __order (dict): Maps each variable to its position in the topological order.
+#     __unresolved_counts (dict): Maps each defined variable to the number of variables it refers to that are unresolved.
+#
+#-----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : DependencyGraph.py
+#
+#-----------------------------------------------------
+# To run: python main.py
+#-----------------------------------------------------
+
+class DependencyGraph:
+    """
+    Represents the dependency graph between assignment statements.
+    An edge dep -> var means that the expression of var refers to dep.
+
+    A topological order of the variables is maintained incrementally with the
+    Pearce-Kelly algorithm, so inserting an edge only touches the variables
+    whose order actually has to change, and cycles are detected on insertion.
+
+    A variable is resolved if it is defined and every variable it refers to is resolved.
+    The dependents of a variable are the statements waiting on it, so when its status changes
+    only the dependents whose own status changes are updated, and is_resolved takes O(1).
+
+    Attributes:
+        __dependencies (dict): Maps each defined variable to the set of variables it refers to.
+        __dependents (dict): Maps each variable to the set of defined variables referring to it.
+        __order (dict): Maps each variable to its position in the topological order.
+        __unresolved_counts (dict): Maps each defined variable to the number of variables it refers to that are unresolved.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty dependency graph.
+        """
+        self.__dependencies = {}
+        self.__dependents = {}
+        self.__order = {}
+        self.__unresolved_counts = {}
+        self.__lowest = 0  # Next position for variables placed in front of the order
+        self.__highest = 1  # Next position for variables placed at the end of the order
+
+    # Getter methods
+    def get_dependencies(self, var):
+        """
+        Returns the variables referred to by the expression of a variable.
+
+        Parameters:
+            var (str): The variable.
+
+        Returns:
+            set: The variables it depends on, empty if the variable is not defined.
+        """
+        return self.__dependencies.get(var, set())
+
+    def get_dependents(self, var):
+        """
+        Returns the defined variables whose expression refers to a variable.
+
+        Parameters:
+            var (str): The variable.
+
+        Returns:
+            set: The variables depending on it.
+        """
+        return self.__dependents.get(var, set())
+
+    def get_order(self, var):
+        """
+        Returns the position of a variable in the topological order.
+
+        Parameters:
+            var (str): The variable.
+
+        Returns:
+            int: The position, or None if the variable is not in the graph.
+        """
+        return self.__order.get(var)
+
+    def is_resolved(self, var):
+        """
+        Checks if a variable is defined and does not refer, directly or indirectly, to an undefined variable.
+
+        Parameters:
+            var (str): The variable.
+
+        Returns:
+            bool: True if the variable is resolved, False otherwise.
+        """
+        return self.__unresolved_counts.get(var) == 0
+
+    def __contains__(self, var):
+        """
+        Checks if a variable is defined in the graph.
+
+        Parameters:
+            var (str): The variable.
+
+        Returns:
+            bool: True if the variable has an expression, False otherwise.
+        """
+        return var in self.__dependencies
+
+    def __len__(self):
+        """
+        Returns the number of defined variables.
+
+        Returns:
+            int: The number of defined variables.
+        """
+        return len(self.__dependencies)
+
+    def set_dependencies(self, var, dependencies):
+        """
+        Sets the variables referred to by the expression of a variable, replacing the previous ones.
+
+        The graph is left unchanged if the new dependencies would create a circular dependency.
+
+        Parameters:
+            var (str): The variable being defined.
+            dependencies (iterable): The variables its expression refers to.
+
+        Raises:
+            ValueError: If a circular dependency is detected.
+        """
+        dependencies = set(dependencies)
+        was_resolved = self.is_resolved(var)
+        if var in dependencies:
+            raise ValueError(f"Circular dependency detected for variable: {var}")
+
+        # A new variable nothing depends on yet can go at the end of the order,
+        # and a new variable that is only referred to can go in front of it
+        if var not in self.__order:
+            self.__order[var] = self.__highest
+            self.__highest += 1
+        for dep in dependencies:
+            if dep not in self.__order:
+                self.__order[dep] = self.__lowest
+                self.__lowest -= 1
+
+        was_defined = var in self.__dependencies
+        old_dependencies = self.__dependencies.get(var, set())
+        kept = old_dependencies & dependencies
+
+        # Removing edges never invalidates a topological order
+        for dep in old_dependencies - kept:
+            self.__dependents[dep].discard(var)
+        self.__dependencies[var] = set(kept)
+
+        try:
+            for dep in dependencies - kept:
+                self.__add_edge(dep, var)
+        except ValueError:
+            # Roll back to the previous dependencies
+            for dep in self.__dependencies[var] - kept:
+                self.__dependents[dep].discard(var)
+            for dep in old_dependencies - kept:
+                self.__dependents[dep].add(var)
+            if was_defined:
+                self.__dependencies[var] = old_dependencies
+            else:
+                del self.__dependencies[var]
+            raise ValueError(f"Circular dependency detected for variable: {var}")
+
+        # Update the status of the variable and of the variables waiting on it
+        self.__unresolved_counts[var] = sum(1 for dep in dependencies if not self.is_resolved(dep))
+        self.__update_resolved(var, was_resolved)
+
+    def remove(self, var):
+        """
+        Removes the expression of a variable from the graph.
+        The variable stays in the order while other expressions still refer to it.
+
+        Parameters:
+            var (str): The variable to remove.
+        """
+        was_resolved = self.is_resolved(var)
+        for dep in self.__dependencies.pop(var, set()):
+            self.__dependents[dep].discard(var)
+        self.__unresolved_counts.pop(var, None)
+        self.__update_resolved(var, was_resolved)
+
+    def __update_resolved(self, var, was_resolved):
+        """
+        Updates the unresolved counts of the variables waiting on a variable whose status may have changed.
+        The change is passed on only to the dependents whose own status changes.
+
+        Parameters:
+            var (str): The variable whose definition changed.
+            was_resolved (bool): Whether the variable was resolved before the change.
+        """
+        if self.is_resolved(var) == was_resolved:
+            return
+
+        # A variable becoming resolved removes one unresolved dependency from each dependent
+        change = 1 if was_resolved else -1
+        changed_count = 1 if was_resolved else 0
+        stack = [var]
+        while stack:
+            for dependent in self.__dependents.get(stack.pop(), ()):
+                self.__unresolved_counts[dependent] += change
+                if self.__unresolved_counts[dependent] == changed_count:
+                    stack.append(dependent)
+
+    def topological_order(self, variables=None):
+        """
+        Sorts variables so that every variable comes after the variables it depends on.
+
+        Parameters:
+            variables (iterable, optional): The variables to sort. Defaults to all defined variables.
+
+        Returns:
+            list: The variables in topological order.
+        """
+        if variables is None:
+            variables = self.__dependencies
+        return sorted(variables, key=self.__order.__getitem__)
+
+    def __add_edge(self, dep, var):
+        """
+        Adds the edge dep -> var, reordering the affected variables if needed (Pearce-Kelly).
+
+        Parameters:
+            dep (str): The variable referred to.
+            var (str): The variable whose expression refers to dep.
+
+        Raises:
+            ValueError: If the edge would create a circular dependency.
+        """
+        order = self.__order
+        lower, upper = order[var], order[dep]
+
+        if lower < upper:
+            # Variables reachable from var that are currently placed before dep
+            forward = self.__search(var, self.__dependents, lambda position: position < upper, dep)
+            # Variables dep depends on that are currently placed after var
+            backward = self.__search(dep, self.__dependencies, lambda position: position > lower)
+
+            # Reuse the same positions: first everything dep needs, then everything needing var
+            positions = sorted(order[v] for v in forward + backward)
+            reordered = sorted(backward, key=order.__getitem__) + sorted(forward, key=order.__getitem__)
+            for v, position in zip(reordered, positions):
+                order[v] = position
+
+        self.__dependencies[var].add(dep)
+        self.__dependents.setdefault(dep, set()).add(var)
+
+    def __search(self, start, edges, in_region, target=None):
+        """
+        Collects the variables reachable from start whose position lies in the affected region.
+
+        Parameters:
+            start (str): The variable to start from.
+            edges (dict): The adjacency to follow (dependents or dependencies).
+            in_region (function): Tells if a position is inside the affected region.
+            target (str, optional): Reaching this variable means a cycle.
+
+        Returns:
+            list: The variables visited, including start.
+
+        Raises:
+            ValueError: If the target is reached.
+        """
+        order = self.__order
+        visited = {start}
+        stack = [start]
+        while stack:
+            for neighbour in edges.get(stack.pop(), ()):
+                if neighbour == target:
+                    raise ValueError(f"Circular dependency detected for variable: {target}")
+                if neighbour not in visited and in_region(order[neighbour]):
+                    visited.add(neighbour)
+                    stack.append(neighbour)
+        return list(visited)
@@ -32,12 +32,14 @@ class DoubleStatement(Statement):
         __double_tokens (list): The tokens of the complete double statement.
     """
 
-    def __init__(self, equation):
+    def __init__(self, equation, allow_alter=None):
         """
         Initializes a DoubleStatement object with the given equation.
 
         Parameters:
             equation (str): The equation string containing two expressions separated by an equals sign.
+            allow_alter (bool, optional): Whether the expressions may be altered to the operand, operator, operand
+                                          format without asking. Defaults to None, which prompts the user.
         """
         self.validation = Validation()
 
@@ -45,11 +47,11 @@ class DoubleStatement(Statement):
         exp1, exp2 = self.split_statement(equation) # Inherited
 
         # Tokenize the expressions
-        tokenizer = ExpressionTokenizer()
+        tokenizer = ExpressionTokenizer(allow_alter)
         tokens1 = tokenizer.tokenize_expression(exp1)
 
         # Reinitialize tokenizer because it saves the tokens as an attribute
-        tokenizer = ExpressionTokenizer()
+        tokenizer = ExpressionTokenizer(allow_alter)
         tokens2 = tokenizer.tokenize_expression(exp2)
 
         # Validate both expressions
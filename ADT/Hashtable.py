@@ -30,8 +30,12 @@ class Hashtable:
         __buckets (list): A list to store values of the key-value pairs.
         __current_index (int): Index for iterator.
         __bst (BinarySearchTree): Binary search tree for inorder traversal of keys.
+        __tombstones (int): The number of buckets left marked by deleted entries.
     """
 
+    # Marks the bucket of a deleted entry, so probing continues past it to the keys placed after it
+    __DELETED = object()
+
     def __init__(self, initial_size=100):
         """
         Initializes a hashtable with an optional initial size.
@@ -45,6 +49,7 @@ class Hashtable:
         self.__buckets = [None] * self.__size
         self.__current_index = 0
         self.__bst = BinarySearchTree()
+        self.__tombstones = 0
 
     # Getter methods
     def get_size(self):
@@ -167,7 +172,8 @@ class Hashtable:
             int: The hash value, an integer representing the calculated hash value.
 
         This method calculates the hash value based on the type of the key:
-        - If the key is a string, it computes the sum of the ASCII values of its characters.
+        - If the key is a string, it computes a polynomial sum of the ASCII values of its characters,
+          so that keys made of the same characters (e.g. generated names) do not all collide.
         - If the key is a float, it multiplies it by 1,000,000 and converts it to an integer.
         - For other data types, it converts the key to an integer directly.
 
@@ -177,8 +183,8 @@ class Hashtable:
         effectively mapping keys to valid indices in the hashtable.
         """
         if isinstance(key, str):
-            # Calculate the sum of ASCII values of characters in the string key
-            key_sum = sum(ord(char) for char in key)
+            # Calculate the polynomial sum of ASCII values of characters in the string key
+            key_sum = self.__string_sum(key)
         elif isinstance(key, float):
             # Convert the float key to an integer by multiplying it by 1000000
             key_sum = int(key * 1000000)
@@ -189,6 +195,22 @@ class Hashtable:
         # Compute the hash value by taking the remainder when dividing the key_sum by the size of the hashtable
         return key_sum % self.__size
 
+    def __string_sum(self, key):
+        """
+        Calculates the polynomial sum of the ASCII values of the characters of a string key.
+
+        Parameters:
+            key (str): The string key.
+
+        Returns:
+            int: The polynomial sum, kept below the Mersenne prime 2**61 - 1.
+        """
+        key_sum = 0
+        for char in key:
+            key_sum = (key_sum * 31 + ord(char)) % 2305843009213693951
+        # Scatter keys that only differ in their last character, instead of filling consecutive buckets
+        return (key_sum * 2654435761) % 2305843009213693951
+
     def rehash_function(self, key, attempt):
         """
         Calculates the rehash value for a given key and attempt.
@@ -201,7 +223,7 @@ class Hashtable:
             int: The rehash value, an integer representing the calculated rehash value.
 
         This method calculates the rehash value based on the type of the key and the attempt number:
-        - If the key is a string, it computes the sum of the ASCII values of its characters.
+        - If the key is a string, it computes the polynomial sum of the ASCII values of its characters.
         - For other data types, it directly uses the key value.
         - The rehash value is then computed as the sum of the hash value of the key and the square of the attempt number,
           followed by taking the remainder when dividing by the size of the hashtable.
@@ -210,8 +232,8 @@ class Hashtable:
         effectively mapping keys to valid indices in the hashtable.
         """
         if isinstance(key, str):
-            # Calculate the sum of ASCII values of characters in the string key
-            key_sum = sum(ord(char) for char in key)
+            # Calculate the polynomial sum of ASCII values of characters in the string key
+            key_sum = self.__string_sum(key)
         else:
             # For other data types, use the key value directly
             key_sum = key
@@ -232,6 +254,21 @@ class Hashtable:
         if self.load_factor() > 0.7:
             self.resize()
 
+        # Add new keys to the binary search tree for inorder traversal, the root may change after rebalancing
+        if self.__place(key, value):
+            self.__bst = self.__bst.add(key)
+
+    def __place(self, key, value):
+        """
+        Places a key-value pair in the buckets, without resizing or updating the binary search tree.
+
+        Parameters:
+            key: The key of the entry. It can be of any data type.
+            value: The value of the entry. It can be of any data type.
+
+        Returns:
+            bool: True if the key was not in the hashtable before, False otherwise.
+        """
         # Calculate the index using the hash function
         index = self.hash_function(key)
         attempt = 1
@@ -243,15 +280,14 @@ class Hashtable:
             attempt += 1
 
         # If the bucket at the calculated index is empty, increment the count
-        if self.__buckets[index] is None:
+        is_new = self.__buckets[index] is None
+        if is_new:
             self.__count += 1
 
         # Set the key-value pair in the hashtable
         self.__buckets[index] = value
         self.__keys[index] = key
-
-        # Add the key to the binary search tree for inorder traversal
-        self.__bst.add(key)
+        return is_new
 
     def __getitem__(self, key):
         """
@@ -320,11 +356,13 @@ class Hashtable:
             index = self.rehash_function(key, attempt)
             attempt += 1
 
-        # Once the key is found, delete the entry by setting the bucket and key to None
-        self.__buckets[index] = None
-        self.__keys[index] = None
+        # Once the key is found, mark the entry as deleted, since setting the bucket to None
+        # would stop the probing of the keys placed after it
+        self.__buckets[index] = self.__DELETED
+        self.__keys[index] = self.__DELETED
         self.__count -= 1  # Decrement the count of entries
-        self.__bst.delete(key)  # Delete the key from the binary search tree
+        self.__tombstones += 1
+        self.__bst = self.__bst.delete(key) or BinarySearchTree()  # Delete the key from the binary search tree
 
     def __contains__(self, key):
         """
@@ -382,8 +420,8 @@ class Hashtable:
         # Iterate over the hashtable until a key is found or the end is reached
         while self.__current_index < self.__size:
             # If the current index points to a non-empty slot, return the key
-            if self.__keys[self.__current_index] is not None:
-                key = self.__keys[self.__current_index]
+            key = self.__keys[self.__current_index]
+            if key is not None and key is not self.__DELETED:
                 self.__current_index += 1
                 return key
             # Move to the next index
@@ -401,22 +439,25 @@ class Hashtable:
         self.__keys = [None] * self.__size
         self.__buckets = [None] * self.__size
         self.__bst = BinarySearchTree()
+        self.__tombstones = 0
 
     def load_factor(self):
         """
-        Calculates the load factor of the hashtable.
+        Calculates the load factor of the hashtable. Buckets marked by deleted entries are counted,
+        since they lengthen the probing like entries do.
 
         Returns:
             float: The load factor.
         """
-        return self.__count / self.__size
+        return (self.__count + self.__tombstones) / self.__size
 
     def resize(self):
         """
         Dynamic Resizing resizes the hashtable when the load factor exceeds a threshold.
         """
-        # Calculate the new size as double the current size
-        new_size = self.__size * 2
+        # Calculate the new size as double the current size, unless most of the load
+        # is made of deleted entries, which are simply dropped
+        new_size = self.__size * 2 if self.__count >= self.__tombstones else self.__size
         # Store references to the old buckets and keys
         old_buckets = self.__buckets
         old_keys = self.__keys
@@ -425,12 +466,12 @@ class Hashtable:
         self.__keys = [None] * new_size
         # Update the size attribute
         self.__size = new_size
-        # Reset the count of entries to 0
+        # Reset the count of entries to 0, the buckets of deleted entries are dropped
         self.__count = 0
-        # Reinitialize the binary search tree
-        self.__bst = BinarySearchTree()
+        self.__tombstones = 0
 
-        # Rehash and reinsert all the old key-value pairs into the resized hashtable
-        for key in old_keys:
-            if key is not None:
-                self[key] = old_buckets[old_keys.index(key)]
\ No newline at end of file
+        # Rehash and reinsert all the old key-value pairs into the resized hashtable,
+        # the keys are unchanged so the binary search tree is kept as it is
+        for index, key in enumerate(old_keys):
+            if key is not None and key is not self.__DELETED:
+                self.__place(key, old_buckets[index])
\ No newline at end of file
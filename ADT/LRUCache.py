@@ -0,0 +1,154 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Class representing a cache of bounded size with least recently used eviction
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : LRUCache.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    A cache holding at most capacity entries. Once it is full, adding an entry evicts
+    the entry that was least recently read or written. Lookups are counted as hits or misses.
+
+    Attributes:
+        capacity (int): The largest number of entries kept.
+        entries (OrderedDict): The entries, from the least to the most recently used.
+        hits (int): The number of lookups that found their key.
+        misses (int): The number of lookups that did not find their key.
+        evictions (int): The number of entries evicted to make room for new ones.
+    """
+
+    def __init__(self, capacity=256):
+        """
+        Initialize an empty cache.
+
+        Parameters:
+            capacity (int, optional): The largest number of entries kept. Defaults to 256.
+
+        Raises:
+            ValueError: If the capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError('Cache capacity must be at least 1.')
+        self.__capacity = capacity
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    # Getter methods
+    def get_capacity(self):
+        return self.__capacity
+
+    def get_hits(self):
+        return self.__hits
+
+    def get_misses(self):
+        return self.__misses
+
+    def get_evictions(self):
+        return self.__evictions
+
+    def get_hit_rate(self):
+        """
+        Get the fraction of lookups that found their key.
+
+        Returns:
+            float: The hit rate, 0.0 if there was no lookup yet.
+        """
+        lookups = self.__hits + self.__misses
+        return self.__hits / lookups if lookups else 0.0
+
+    # Setter method
+    def set_capacity(self, capacity):
+        """
+        Set the largest number of entries kept, evicting the least recently used entries if needed.
+
+        Raises:
+            ValueError: If the capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError('Cache capacity must be at least 1.')
+        self.__capacity = capacity
+        self.__evict()
+
+    def get(self, key, default=None):
+        """
+        Look up a key, marking its entry as the most recently used.
+
+        Parameters:
+            key: The key to look up.
+            default (optional): The value returned if the key is not cached. Defaults to None.
+
+        Returns:
+            The cached value, or default if the key is not cached.
+        """
+        if key in self.__entries:
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+            return self.__entries[key]
+        self.__misses += 1
+        return default
+
+    def __setitem__(self, key, value):
+        """
+        Add or replace an entry, marking it as the most recently used.
+
+        Parameters:
+            key: The key of the entry.
+            value: The value of the entry.
+        """
+        self.__entries[key] = value
+        self.__entries.move_to_end(key)
+        self.__evict()
+
+    def __contains__(self, key):
+        """
+        Check if a key is cached, without counting a lookup.
+        """
+        return key in self.__entries
+
+    def __delitem__(self, key):
+        """
+        Remove an entry.
+
+        Raises:
+            KeyError: If the key is not cached.
+        """
+        del self.__entries[key]
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def clear(self):
+        """
+        Remove all the entries and reset the statistics.
+        """
+        self.__entries.clear()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __str__(self):
+        return (f"{len(self.__entries)}/{self.__capacity} entries, {self.__hits} hits, "
+                f"{self.__misses} misses, hit rate {self.get_hit_rate():.1%}")
+
+    def __evict(self):
+        """
+        Evict the least recently used entries until the cache fits its capacity.
+        """
+        while len(self.__entries) > self.__capacity:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
@@ -23,4 +23,6 @@ from .Statement import *
 from .SortedList import *
 from .File import *
 from .BinarySearchTree import *
-from .DoubleStatement import *
\ No newline at end of file
+from .DoubleStatement import *
+from .DependencyGraph import *
+from .LRUCache import *
\ No newline at end of file
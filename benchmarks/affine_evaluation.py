@@ -0,0 +1,153 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Benchmark of AffineCompiler against ParseTree.evaluate_all.
+# A workspace of independent clusters is generated, where most statements are
+# affine combinations of earlier statements of their cluster. All the statements
+# are evaluated once, then the affine statements are evaluated for a batch of
+# input vectors, which the parse tree can only do by redefining the leaf variables.
+# Workspaces without inputs or affine statements are checked first.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : affine_evaluation.py
+#
+# -----------------------------------------------------
+# To run: python benchmarks/affine_evaluation.py [clusters] [cluster_size] [batch]
+# -----------------------------------------------------
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ADT import BinaryTree
+from utils import ParseTree, ExpressionTokenizer
+from benchmarks.parallel_evaluation import variable_name
+
+def build_workspace(clusters, cluster_size, leaves=5, seed=0):
+    """
+    Builds a workspace of independent clusters. Each cluster starts with leaf variables, and every other
+    statement combines earlier statements of its cluster, with one statement in 20 that is not affine.
+
+    Parameters:
+        clusters (int): The number of clusters.
+        cluster_size (int): The number of statements in a cluster, including its leaf variables.
+        leaves (int, optional): The number of leaf variables in a cluster. Defaults to 5.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        ParseTree: The parse tree holding the statements.
+    """
+    rnd = random.Random(seed)
+    parse_tree = ParseTree()
+    parse_tree.begin_batch()
+    for cluster in range(clusters):
+        names = [variable_name(cluster * cluster_size + i) for i in range(cluster_size)]
+        for i, var in enumerate(names):
+            if i < leaves:
+                expression = f"({rnd.randint(1, 99)}+0)"
+            else:
+                left, right = rnd.choice(names[:i]), rnd.choice(names[:i])
+                expression = rnd.choice([f"({left}+{right})", f"({left}-{right})", f"({left}*{rnd.randint(2, 9)})",
+                                         f"({left}/{rnd.randint(2, 9)})", f"(({left}+{right})/2)"])
+                if rnd.random() < 0.05:
+                    expression = f"({left}*{right})"
+            parse_tree.add_statement(var, ExpressionTokenizer().tokenize_expression(expression))
+    parse_tree.commit()
+    return parse_tree
+
+def check_without_inputs():
+    """
+    Checks that workspaces without affine statements, or without inputs because their statements are
+    unresolved, are evaluated like ParseTree.evaluate_all, and that a batch gives one row per vector.
+    """
+    workspaces = [
+        [('A', '(2+3)')],
+        [('B', '(C+1)')],
+        [('B', '(C+1)'), ('D', '(B*2)')],
+    ]
+    for statements in workspaces:
+        parse_tree = ParseTree()
+        for var, expression in statements:
+            parse_tree.add_statement(var, ExpressionTokenizer().tokenize_expression(expression))
+        compiler = parse_tree.compile_affine()
+        program = compiler.get_program()
+        assert compiler.evaluate_all() == parse_tree.evaluate_all(), f"{statements} differs from evaluate_all"
+        assert compiler.evaluate().shape == (len(program['outputs']),)
+        batch = compiler.evaluate(np.empty((4, len(program['inputs']))))
+        assert batch.shape == (4, len(program['outputs']))
+        if not program['inputs']:
+            assert np.array_equal(batch, np.tile(program['offsets'], (4, 1)))
+    print(f"{len(workspaces)} workspaces without inputs or affine statements: same as evaluate_all")
+
+def main():
+    clusters = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cluster_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    check_without_inputs()
+
+    parse_tree = build_workspace(clusters, cluster_size)
+    print(f"{clusters * cluster_size} statements in {clusters} clusters of {cluster_size}")
+
+    start = time.perf_counter()
+    expected = parse_tree.evaluate_all()
+    baseline = time.perf_counter() - start
+    print(f"{'evaluate_all':>24}: {baseline:8.3f}s")
+
+    start = time.perf_counter()
+    compiler = parse_tree.compile_affine()
+    compiling = time.perf_counter() - start
+    program = compiler.get_program()
+    print(f"{'compile':>24}: {compiling:8.3f}s  {len(program['outputs'])} affine statements, "
+          f"{len(program['inputs'])} inputs, {len(program['data'])} matrix entries")
+
+    start = time.perf_counter()
+    results = compiler.evaluate_all()
+    elapsed = time.perf_counter() - start
+    print(f"{'affine evaluate_all':>24}: {elapsed:8.3f}s  {baseline / elapsed:8.1f}x evaluate_all")
+
+    start = time.perf_counter()
+    compiler.evaluate()
+    product = time.perf_counter() - start
+    print(f"{'one product':>24}: {product:8.4f}s  {baseline / product:8.1f}x evaluate_all")
+
+    # The affine rows are summed in another order, but the results that could round differently are left to the
+    # parse tree, so there should be no difference
+    differences = [abs(expected[var] - results[var]) / max(1, abs(expected[var]))
+                   for var in compiler.get_outputs() if expected[var] != 'None']
+    print(f"largest difference from evaluate_all, relative to the value: {max(differences, default=0):.2e}")
+
+    inputs = compiler.get_inputs()
+    rnd = np.random.default_rng(0)
+    vectors = rnd.integers(1, 100, size=(batch, len(inputs)))
+
+    start = time.perf_counter()
+    compiler.evaluate(vectors)
+    batched = time.perf_counter() - start
+    print(f"{'batch of ' + str(batch):>24}: {batched:8.3f}s  {batched / batch * 1000:8.3f}ms per vector")
+
+    # The parse tree evaluates a few vectors by redefining the leaf variables, the rest is extrapolated
+    samples = min(batch, 3)
+    start = time.perf_counter()
+    for vector in vectors[:samples]:
+        parse_tree.begin_batch()
+        for var, value in zip(inputs, vector.tolist()):
+            parse_tree.add_tree(var, BinaryTree(value))
+        # Committing the batch evaluates all the statements
+        parse_tree.commit()
+    redefined = (time.perf_counter() - start) / samples
+    print(f"{'redefine + commit':>24}: {redefined * batch:8.3f}s  {redefined * 1000:8.3f}ms per vector "
+          f"(estimated from {samples}), {redefined * batch / batched:8.1f}x batch")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Benchmark of ExternalMergeSort against BottomUpMergeSort. The statements are
+# generated one at a time, sorted and written to a file, and the time and the
+# peak memory allocated are measured for several run sizes. The in-memory sort
+# holds every statement in a dictionary, as Options.display_statements does.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : external_sort.py
+#
+# -----------------------------------------------------
+# To run: python benchmarks/external_sort.py [entries]
+# -----------------------------------------------------
+import filecmp
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import BottomUpMergeSort, ExternalMergeSort, FileHandler
+from benchmarks.parallel_evaluation import variable_name
+
+def generate_answers(entries, seed=0):
+    """
+    Generates statements with their values one at a time, with one value in 20 that is 'None'.
+
+    Parameters:
+        entries (int): The number of statements.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        Generator of (statement, value) pairs.
+    """
+    rnd = random.Random(seed)
+    for i in range(entries):
+        roll = rnd.random()
+        if roll < 0.05:
+            value = 'None'
+        elif roll < 0.5:
+            value = rnd.randint(-1000, 1000)
+        else:
+            value = round(rnd.uniform(-1000, 1000), 2)
+        yield f"{variable_name(i)}=(({rnd.randint(0, 9)}+{rnd.randint(0, 9)})*{rnd.randint(0, 9)})", value
+
+def sort_in_memory(pairs):
+    """
+    Sorts the pairs with BottomUpMergeSort, as Options.sorting_expressions does without a run size.
+
+    Parameters:
+        pairs (iterable): The (statement, value) pairs.
+
+    Returns:
+        Generator of the lines of the sorted sections.
+    """
+    sorter = BottomUpMergeSort(dict(pairs))
+    sorter.merge_sort()
+    for i, (answer, statements) in enumerate(sorter.get_sorted_dict().items()):
+        if i:
+            yield ""
+        yield f"*** Statements with value=> {answer}"
+        yield from statements
+
+def measure(sort, entries, output_file):
+    """
+    Sorts generated statements into a file and measures the time and the peak memory allocated.
+
+    Parameters:
+        sort (function): Turns the (statement, value) pairs into the lines of the sorted sections.
+        entries (int): The number of statements.
+        output_file (str): The file the lines are written to.
+
+    Returns:
+        tuple: The time in seconds and the peak memory in bytes.
+    """
+    # tracemalloc slows the sorts down, so the time is measured in a separate run without it
+    start = time.perf_counter()
+    FileHandler().write_lines(output_file, sort(generate_answers(entries)))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    FileHandler().write_lines(output_file, sort(generate_answers(entries)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{entries} entries")
+
+    with tempfile.TemporaryDirectory() as folder:
+        expected = os.path.join(folder, "in_memory.txt")
+        elapsed, peak = measure(sort_in_memory, entries, expected)
+        print(f"{'in memory':>18}: {elapsed:8.3f}s  peak {peak / 2 ** 20:8.1f} MiB")
+
+        for run_size in (100_000, 20_000, 5_000):
+            output_file = os.path.join(folder, f"external_{run_size}.txt")
+            sorter = ExternalMergeSort(run_size, temp_dir=folder)
+            elapsed, peak = measure(sorter.sections, entries, output_file)
+            print(f"{'run size ' + str(run_size):>18}: {elapsed:8.3f}s  peak {peak / 2 ** 20:8.1f} MiB  "
+                  f"same output: {filecmp.cmp(expected, output_file, shallow=False)}")
+
+if __name__ == '__main__':
+    main()
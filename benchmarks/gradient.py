@@ -0,0 +1,122 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Benchmark of the automatic differentiation of ParseTree against finite differences.
+# A workspace of many leaf variables feeding one output statement is generated.
+# The gradient of the output is computed with one backward pass (reverse mode),
+# one forward pass per leaf variable (forward mode), and central differences that
+# redefine every leaf variable and evaluate the output again in reactive mode.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : gradient.py
+#
+# -----------------------------------------------------
+# To run: python benchmarks/gradient.py [leaves] [statements] [step]
+# -----------------------------------------------------
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ADT import BinaryTree
+from utils import ParseTree, ExpressionTokenizer
+from benchmarks.parallel_evaluation import variable_name
+
+def build_workspace(leaves, statements, seed=0):
+    """
+    Builds a workspace where every statement is the arithmetic, geometric or harmonic mean of two earlier variables,
+    and the last statement is the output. The output is not linear, but it stays within the range of the leaf variables.
+
+    Parameters:
+        leaves (int): The number of leaf variables.
+        statements (int): The number of statements referring to other variables.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        tuple: The parse tree, in reactive mode, and the output variable.
+    """
+    rnd = random.Random(seed)
+    parse_tree = ParseTree()
+    parse_tree.begin_batch()
+    names = [variable_name(i) for i in range(leaves + statements)]
+    for var in names[:leaves]:
+        parse_tree.add_statement(var, ExpressionTokenizer().tokenize_expression(f"({rnd.randint(10, 99)}+0)"))
+    for i in range(leaves, leaves + statements):
+        # Every leaf variable is used at least once
+        left = names[i - leaves] if i < 2 * leaves else rnd.choice(names[:i])
+        right = rnd.choice(names[max(leaves, i - 20):i] or names[:leaves])
+        # Means of positive values stay between the smallest and the largest leaf variable
+        expression = rnd.choice([f"(({left}+{right})/2)", f"(({left}*{right})**0.5)", f"((2*({left}*{right}))/({left}+{right}))"])
+        parse_tree.add_statement(names[i], ExpressionTokenizer().tokenize_expression(expression))
+    parse_tree.commit()
+    parse_tree.set_reactive(True)
+    return parse_tree, names[-1]
+
+def finite_differences(parse_tree, var, leaves, step):
+    """
+    Estimates the partial derivatives of a statement with central differences,
+    by redefining each leaf variable to its value plus and minus the step.
+
+    Parameters:
+        parse_tree (ParseTree): The parse tree, in reactive mode.
+        var (str): The variable of the statement.
+        leaves (list): The leaf variables.
+        step (float): The step added to and subtracted from each leaf variable.
+
+    Returns:
+        dict: The leaf variables mapped to the estimated partial derivatives.
+    """
+    statements = parse_tree.get_statements()
+    estimates = {}
+    for leaf in leaves:
+        tree = statements[leaf]
+        value = parse_tree.evaluate(leaf, tree)
+        parse_tree.add_tree(leaf, BinaryTree(value + step))
+        above = parse_tree.evaluate(var, statements[var])
+        parse_tree.add_tree(leaf, BinaryTree(value - step))
+        below = parse_tree.evaluate(var, statements[var])
+        parse_tree.add_tree(leaf, tree)
+        estimates[leaf] = (above - below) / (2 * step)
+    return estimates
+
+def main():
+    leaves = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    # Statements are rounded to 2 decimal places, so the step cannot be much smaller than 1
+    step = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+
+    parse_tree, output = build_workspace(leaves, statements)
+    print(f"{leaves} leaf variables, {statements} statements, output {output}")
+
+    start = time.perf_counter()
+    gradient = parse_tree.gradient(output)
+    reverse = time.perf_counter() - start
+    print(f"{'reverse mode':>20}: {reverse:8.3f}s")
+
+    start = time.perf_counter()
+    forward_gradient = {leaf: parse_tree.derivative(output, leaf) for leaf in gradient}
+    forward = time.perf_counter() - start
+    print(f"{'forward mode':>20}: {forward:8.3f}s  {forward / reverse:8.1f}x reverse mode")
+
+    start = time.perf_counter()
+    estimates = finite_differences(parse_tree, output, list(gradient), step)
+    differences = time.perf_counter() - start
+    print(f"{'finite differences':>20}: {differences:8.3f}s  {differences / reverse:8.1f}x reverse mode")
+
+    scale = max(1.0, max(abs(partial) for partial in gradient.values()))
+    forward_error = max(abs(gradient[leaf] - forward_gradient[leaf]) for leaf in gradient) / scale
+    difference_error = max(abs(gradient[leaf] - estimates[leaf]) for leaf in gradient) / scale
+    print(f"largest difference from reverse mode, relative to the largest partial derivative:")
+    print(f"{'forward mode':>20}: {forward_error:.2e}")
+    print(f"{'finite differences':>20}: {difference_error:.2e}")
+
+if __name__ == '__main__':
+    main()
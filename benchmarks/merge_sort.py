@@ -0,0 +1,150 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Benchmark of BottomUpMergeSort against MergeSort on the kind of dictionary
+# returned by Options.display_statements: statements mapped to int, float or
+# 'None' values, with many equal values. Both the time and the peak memory
+# allocated while sorting are measured, and the results are compared.
+# Sorting again after 1% of the values changed is then timed with a full sort,
+# with merge_changes, and with a full sort of data that is already sorted.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : merge_sort.py
+#
+# -----------------------------------------------------
+# To run: python benchmarks/merge_sort.py [entries]
+# -----------------------------------------------------
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import MergeSort, BottomUpMergeSort
+from benchmarks.parallel_evaluation import variable_name
+
+def build_answers(entries, seed=0):
+    """
+    Builds statements mapped to their values, with one value in 20 that is 'None'.
+
+    Parameters:
+        entries (int): The number of statements.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        dict: The statements mapped to their values.
+    """
+    rnd = random.Random(seed)
+    answers = {}
+    for i in range(entries):
+        roll = rnd.random()
+        if roll < 0.05:
+            value = 'None'
+        elif roll < 0.5:
+            value = rnd.randint(-1000, 1000)
+        else:
+            value = round(rnd.uniform(-1000, 1000), 2)
+        answers[f"{variable_name(i)}=({rnd.randint(0, 9)}+{rnd.randint(0, 9)})"] = value
+    # The keys are whole statements, so MergeSort can read the second character of the 'None' entries
+    return answers
+
+def measure(sorter_class, answers):
+    """
+    Sorts the answers and measures the time and the peak memory allocated.
+
+    Parameters:
+        sorter_class (type): MergeSort or one of its subclasses.
+        answers (dict): The statements mapped to their values.
+
+    Returns:
+        tuple: The sorted dictionary, the time in seconds and the peak memory in bytes.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    sorter = sorter_class(answers)
+    sorter.merge_sort()
+    sorted_dict = sorter.get_sorted_dict()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return sorted_dict, elapsed, peak
+
+def edit_answers(answers, fraction, seed=1):
+    """
+    Changes the values of a fraction of the statements, as after editing a few statements.
+
+    Parameters:
+        answers (dict): The statements mapped to their values.
+        fraction (float): The fraction of the statements changed.
+        seed (int, optional): The seed of the random generator. Defaults to 1.
+
+    Returns:
+        tuple: The new answers and the changed statements mapped to their new values.
+    """
+    rnd = random.Random(seed)
+    changes = {}
+    for key in rnd.sample(list(answers), int(len(answers) * fraction)):
+        changes[key] = rnd.choice(['None', rnd.randint(-1000, 1000), round(rnd.uniform(-1000, 1000), 2)])
+    return {**answers, **changes}, changes
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    answers = build_answers(entries)
+    print(f"{entries} entries")
+
+    # tracemalloc slows both sorts down, so the times are measured again without it
+    expected, _, baseline_peak = measure(MergeSort, answers)
+    result, _, peak = measure(BottomUpMergeSort, answers)
+
+    start = time.perf_counter()
+    sorter = MergeSort(answers)
+    sorter.merge_sort()
+    sorter.get_sorted_dict()
+    baseline = time.perf_counter() - start
+    start = time.perf_counter()
+    sorter = BottomUpMergeSort(answers)
+    sorter.merge_sort()
+    sorter.get_sorted_dict()
+    elapsed = time.perf_counter() - start
+
+    print(f"{'MergeSort':>18}: {baseline:8.3f}s  peak {baseline_peak / 2 ** 20:8.1f} MiB")
+    print(f"{'BottomUpMergeSort':>18}: {elapsed:8.3f}s  peak {peak / 2 ** 20:8.1f} MiB  "
+          f"{baseline / elapsed:5.1f}x faster")
+
+    # MergeSort only orders the 'None' entries by their first letter, so they are compared as sets
+    expected_none, result_none = expected.pop('None'), result.pop('None')
+    same = list(expected.items()) == list(result.items()) and sorted(expected_none) == result_none
+    print(f"same order as MergeSort: {same}")
+
+    # Sort again after 1% of the values changed
+    edited, changes = edit_answers(answers, 0.01)
+    sorter = BottomUpMergeSort(answers)
+    sorter.merge_sort()
+    start = time.perf_counter()
+    full = BottomUpMergeSort(edited)
+    full.merge_sort()
+    full_sort = time.perf_counter() - start
+    start = time.perf_counter()
+    sorter.merge_changes(changes)
+    merged = time.perf_counter() - start
+    print(f"\n{len(changes)} values changed")
+    print(f"{'full sort':>18}: {full_sort:8.3f}s")
+    print(f"{'merge_changes':>18}: {merged:8.3f}s  {full_sort / merged:5.1f}x faster")
+    print(f"same order as a full sort: {sorter.get_sorted_dict() == full.get_sorted_dict()}")
+
+    # The natural runs make sorting data already in order a single scan
+    in_order = dict(full.get_data())
+    start = time.perf_counter()
+    BottomUpMergeSort(in_order).merge_sort()
+    print(f"{'already sorted':>18}: {time.perf_counter() - start:8.3f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Benchmark of ParallelEvaluator against ParseTree.evaluate_all.
+# A workspace made of many independent clusters of statements is generated,
+# then evaluated with 1, 2, 4 and 8 worker processes.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : parallel_evaluation.py
+#
+# -----------------------------------------------------
+# To run: python benchmarks/parallel_evaluation.py [clusters] [cluster_size] [chunk_size]
+# -----------------------------------------------------
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import ParseTree, ParallelEvaluator, ExpressionTokenizer
+
+def variable_name(index):
+    """
+    Returns a variable name made of letters only for an index.
+
+    Parameters:
+        index (int): The index of the variable.
+
+    Returns:
+        str: The variable name.
+    """
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord('a') + remainder) + name
+    return name
+
+def build_workspace(clusters, cluster_size, seed=0):
+    """
+    Builds a workspace of independent clusters, where each statement refers to earlier statements of its cluster.
+
+    Parameters:
+        clusters (int): The number of clusters.
+        cluster_size (int): The number of statements in a cluster.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        ParseTree: The parse tree holding the statements.
+    """
+    rnd = random.Random(seed)
+    parse_tree = ParseTree()
+    parse_tree.begin_batch()
+    for cluster in range(clusters):
+        names = [variable_name(cluster * cluster_size + i) for i in range(cluster_size)]
+        for i, var in enumerate(names):
+            operands = [rnd.choice(names[:i]) if i and rnd.random() < 0.7 else str(rnd.randint(1, 9)) for _ in range(4)]
+            expression = f"(({operands[0]}+{operands[1]})*({operands[2]}-{operands[3]}))"
+            parse_tree.add_statement(var, ExpressionTokenizer().tokenize_expression(expression))
+    parse_tree.commit()
+    return parse_tree
+
+def main():
+    clusters = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    cluster_size = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    chunk_size = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+
+    parse_tree = build_workspace(clusters, cluster_size)
+    print(f"{clusters * cluster_size} statements in {clusters} clusters, chunk size {chunk_size}, {os.cpu_count()} processors")
+
+    start = time.perf_counter()
+    expected = parse_tree.evaluate_all()
+    serial = time.perf_counter() - start
+    print(f"{'serial':>10}: {serial:8.3f}s")
+
+    for workers in (1, 2, 4, 8):
+        evaluator = ParallelEvaluator(parse_tree, max_workers=workers, chunk_size=chunk_size)
+        evaluator.chunks()  # Encode the statements once, as a long lived evaluator would
+        start = time.perf_counter()
+        results = evaluator.evaluate_all()
+        elapsed = time.perf_counter() - start
+        assert results == expected, 'Parallel results differ from ParseTree.evaluate_all'
+        print(f"{workers:>2} workers: {elapsed:8.3f}s  speedup {serial / elapsed:5.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Benchmark of ParallelMergeSort against BottomUpMergeSort. The same answers
+# are sorted with 1, 2, 4 and 8 worker processes, the throughput is reported
+# in entries per second, and the order is checked against the serial sort.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : parallel_merge_sort.py
+#
+# -----------------------------------------------------
+# To run: python benchmarks/parallel_merge_sort.py [entries] [chunk_size]
+# -----------------------------------------------------
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import BottomUpMergeSort, ParallelMergeSort
+from benchmarks.merge_sort import build_answers
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+
+    answers = build_answers(entries)
+    print(f"{entries} entries, chunk size {chunk_size}, {os.cpu_count()} processors")
+
+    start = time.perf_counter()
+    sorter = BottomUpMergeSort(answers)
+    sorter.merge_sort()
+    serial = time.perf_counter() - start
+    expected = sorter.get_data()
+    print(f"{'serial':>10}: {serial:8.3f}s  {entries / serial:12,.0f} entries/s")
+
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        sorter = ParallelMergeSort(answers, max_workers=workers, chunk_size=chunk_size)
+        sorter.merge_sort()
+        elapsed = time.perf_counter() - start
+        assert sorter.get_data() == expected, 'Parallel order differs from BottomUpMergeSort'
+        print(f"{workers:>2} workers: {elapsed:8.3f}s  {entries / elapsed:12,.0f} entries/s  "
+              f"speedup {serial / elapsed:5.2f}x")
+
+if __name__ == '__main__':
+    main()
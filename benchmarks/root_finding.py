@@ -0,0 +1,82 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Benchmark of RootFinder solving many equations in lockstep against solving
+# them one at a time. The equations are quadratics a*x**2 + b*x = c with a
+# single positive root, solved by Newton's method and by bisection.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : root_finding.py
+#
+# -----------------------------------------------------
+# To run: python benchmarks/root_finding.py [equations]
+# -----------------------------------------------------
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ADT import DoubleStatement
+from utils import EquationParseTree, RootFinder
+
+def build_equations(count, seed=0):
+    """
+    Builds equations a*x**2 + b*x = c with positive coefficients, so each has one positive root.
+
+    Parameters:
+        count (int): The number of equations.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        list: The equations as (tree, target) pairs.
+    """
+    rnd = random.Random(seed)
+    eqn_parse_tree = EquationParseTree()
+    equations = []
+    for _ in range(count):
+        equation = f"(({rnd.randint(1, 9)}*(x**2))+({rnd.randint(1, 9)}*x))=({rnd.randint(1, 999)}+0)"
+        tokens = DoubleStatement(equation, allow_alter=True).get_tokens()
+        equations.append((eqn_parse_tree.build_parse_tree(tokens), 'x'))
+    return equations
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    root_finder = RootFinder()
+    equations = build_equations(count)
+    print(f"{count} equations")
+
+    start = time.perf_counter()
+    program = root_finder.compile(equations)
+    print(f"{'compile':>22}: {time.perf_counter() - start:8.3f}s")
+
+    for method, solve in [('newton', lambda program: root_finder.newton(program, 1.0)),
+                          ('bisection', lambda program: root_finder.bisect(program, 0, 100))]:
+        start = time.perf_counter()
+        roots, converged = solve(program)
+        lockstep = time.perf_counter() - start
+
+        # Solving one equation at a time, with the same code, pays the NumPy overhead once per equation
+        programs = [root_finder.compile([equation]) for equation in equations]
+        start = time.perf_counter()
+        single_roots = np.concatenate([solve(single)[0] for single in programs])
+        one_at_a_time = time.perf_counter() - start
+
+        residuals, _ = root_finder.evaluate(program, roots)
+        print(f"{method + ' lockstep':>22}: {lockstep:8.3f}s  {int(converged.sum())}/{count} converged, "
+              f"largest |f| {np.nanmax(np.abs(residuals)):.1e}")
+        print(f"{method + ' one at a time':>22}: {one_at_a_time:8.3f}s  {one_at_a_time / lockstep:8.1f}x lockstep, "
+              f"same roots: {np.allclose(roots, single_roots, equal_nan=True)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Benchmark of VectorizedEvaluator against ParseTree.evaluate_all.
+# Workspaces of clustered statements are evaluated both ways, one whose values
+# stay small and one whose integers outgrow float64, then small random
+# workspaces with negative operands and every operator are checked, so the
+# values, their types and the sign of zero are the same as the parse tree's.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : vectorized_evaluation.py
+#
+# -----------------------------------------------------
+# To run: python benchmarks/vectorized_evaluation.py [clusters] [cluster_size] [workspaces]
+# -----------------------------------------------------
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import ParseTree, VectorizedEvaluator, ExpressionTokenizer
+from benchmarks.parallel_evaluation import build_workspace, variable_name
+
+def build_averaging_workspace(clusters, cluster_size, seed=0):
+    """
+    Builds a workspace of independent clusters, where each statement averages earlier statements of its cluster,
+    so the values stay small enough for float64.
+
+    Parameters:
+        clusters (int): The number of clusters.
+        cluster_size (int): The number of statements in a cluster.
+        seed (int, optional): The seed of the random generator. Defaults to 0.
+
+    Returns:
+        ParseTree: The parse tree holding the statements.
+    """
+    rnd = random.Random(seed)
+    parse_tree = ParseTree()
+    parse_tree.begin_batch()
+    for cluster in range(clusters):
+        names = [variable_name(cluster * cluster_size + i) for i in range(cluster_size)]
+        for i, var in enumerate(names):
+            operands = [rnd.choice(names[:i]) if i and rnd.random() < 0.7 else str(rnd.randint(1, 9)) for _ in range(4)]
+            expression = f"((({operands[0]}+{operands[1]})+({operands[2]}-{operands[3]}))/4)"
+            parse_tree.add_statement(var, ExpressionTokenizer().tokenize_expression(expression))
+    parse_tree.commit()
+    return parse_tree
+
+def time_workspace(label, parse_tree):
+    """
+    Times ParseTree.evaluate_all and VectorizedEvaluator on a workspace, and checks they give the same values.
+
+    Parameters:
+        label (str): The name of the workspace.
+        parse_tree (ParseTree): The parse tree holding the statements.
+    """
+    start = time.perf_counter()
+    expected = parse_tree.evaluate_all()
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    evaluator = VectorizedEvaluator(parse_tree).compile()
+    compiled = time.perf_counter() - start
+    start = time.perf_counter()
+    results = evaluator.evaluate_all()
+    elapsed = time.perf_counter() - start
+    assert results == expected, 'VectorizedEvaluator differs from evaluate_all'
+    print(f"{label:>12}: evaluate_all {serial:7.3f}s  compile {compiled:7.3f}s  "
+          f"vectorized {elapsed:7.3f}s  {serial / elapsed:6.1f}x evaluate_all")
+
+def build_signed_workspace(size, seed):
+    """
+    Builds a small workspace whose statements mix negative and positive operands, zeros and every operator.
+
+    Parameters:
+        size (int): The number of statements.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        ParseTree: The parse tree holding the statements.
+    """
+    rnd = random.Random(seed)
+    names = [variable_name(i) for i in range(size)]
+    parse_tree = ParseTree()
+
+    def operand(i):
+        roll = rnd.random()
+        if i and roll < 0.5:
+            return rnd.choice(names[:i])
+        if roll < 0.7:
+            # A negative constant, folded by the optimizer
+            return f"(0-{rnd.choice(['3', '1', '0', '2.5', '1.56'])})"
+        return rnd.choice(['0', '1', '2', '3', '0.5', '1.56', '2.25'])
+
+    for i, var in enumerate(names):
+        ops = [rnd.choice(['+', '-', '*', '/', '**']) if rnd.random() < 0.2 else rnd.choice(['+', '-', '*', '/'])
+               for _ in range(3)]
+        expression = f"(({operand(i)}{ops[0]}{operand(i)}){ops[1]}({operand(i)}{ops[2]}{operand(i)}))"
+        parse_tree.add_statement(var, ExpressionTokenizer().tokenize_expression(expression))
+    return parse_tree
+
+def outcome(evaluate):
+    """
+    Evaluates a workspace and describes the result, so results can be compared exactly.
+
+    Parameters:
+        evaluate (function): Evaluates every statement and returns the variables mapped to their values.
+
+    Returns:
+        tuple or str: The repr of every value, which tells 0 from 0.0 and 0.0 from -0.0, or the error raised.
+    """
+    try:
+        return tuple((var, repr(value)) for var, value in evaluate().items())
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+
+def main():
+    clusters = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    cluster_size = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    workspaces = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    print(f"{clusters * cluster_size} statements in {clusters} clusters")
+    time_workspace('averaging', build_averaging_workspace(clusters, cluster_size))
+    # Most integers outgrow float64 here, so most statements are evaluated again by the parse tree
+    time_workspace('growing', build_workspace(clusters, cluster_size))
+
+    # Differential check on random workspaces with negative operands
+    mismatches = 0
+    for seed in range(workspaces):
+        try:
+            workspace = build_signed_workspace(8, seed)
+        except (ZeroDivisionError, OverflowError):
+            continue  # A statement whose value raises an error is rejected when it is added
+        expected = outcome(workspace.evaluate_all)
+        if outcome(VectorizedEvaluator(workspace).evaluate_all) != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  workspace {seed} differs from evaluate_all: {expected}")
+    print(f"{workspaces} random workspaces with negative operands: {mismatches} differ from evaluate_all")
+    assert not mismatches, 'VectorizedEvaluator differs from evaluate_all'
+
+if __name__ == '__main__':
+    main()
@@ -21,14 +21,14 @@ options = Options()
 
 def handle_menu():
     choice = ''
-    while choice != '10':
+    while choice != '12':
         try:
             # Mark that the user is now in the main menu
             in_main_menu = True
 
             # Display the menu and prompt for user input
             choice = input(
-                "\nPlease select your choice: ('1','2','3','4','5','6','7','8','9','10'):\n"
+                "\nPlease select your choice: ('1','2','3','4','5','6','7','8','9','10','11','12'):\n"
                 '    1. Add/Modify assignment statement\n'
                 '    2. Display current assignment statements\n'
                 '    3. Evaluate a single variable\n'
@@ -38,7 +38,9 @@ def handle_menu():
                 '    7. Solve for a subject in an equation\n'
                 '    8. Display history log\n'
                 '    9. Visualize parse trees\n'
-                '    10. Exit\n'
+                '    10. Check equations from file\n'
+                '    11. Solve stored equations as a linear system\n'
+                '    12. Exit\n'
                 'Enter choice: '
             )
 
@@ -64,13 +66,17 @@ def handle_menu():
                 case '9':
                     options.visualize_parse_tree()
                 case '10':
+                    interface.option10(options.check_equations_file)
+                case '11':
+                    interface.option11(options.solve_linear_system)
+                case '12':
                     print('\nBye, thanks for using ST1507 DSAA: Assignment Statement Evaluator & Sorter')
-                    return  # Exit function when user chooses '10'
+                    return  # Exit function when user chooses '12'
         except Exception as e:
             print(f'\nAn error occurred: {e}')
         except KeyboardInterrupt:
             if in_main_menu:  # Check if the user is in the main menu before printing the message
-                print("\n\nUse menu choice '10' to exit.")
+                print("\n\nUse menu choice '12' to exit.")
             else:
                 print("\n")
 
@@ -161,9 +161,10 @@ class Interface:
         while True:
             try:
                 eqn = input('Enter the equation you want to equate:\nFor example, (x+2)=(y+3)\n')
-                if eval_equation(eqn) == 'None':
+                result = eval_equation(eqn)
+                if result == 'None':
                     print('\nThe equation is unknown')
-                elif eval_equation(eqn):
+                elif result:
                     print('\nThe equation is equal')
                 else:
                     print('\nThe equation is not equal')
@@ -190,4 +191,51 @@ class Interface:
                 self.pause()
                 break
             except Exception as e:
-                self.error_msg(e)
\ No newline at end of file
+                self.error_msg(e)
+
+    # Option 10
+    def option10(self, check_equations_file):
+        """
+        Executes the tenth option in the menu: check the equations of a file against the assignment statements.
+
+        Parameters:
+        - check_equations_file: Function to check the equations of a file and write the results to another file.
+        """
+        while True:
+            try:
+                input_file = input("Please enter input file of equations: ")
+                output_file = input("Please enter output file for the results (overwritten without asking): ")
+                counts = check_equations_file(input_file, output_file)
+
+                print(f"\nChecked {sum(counts.values())} equations:")
+                for outcome, count in counts.items():
+                    print(f"  {outcome}: {count}")
+
+                self.pause()
+                break
+            except Exception as e:
+                self.error_msg(e)
+
+    # Option 11
+    def option11(self, solve_linear_system):
+        """
+        Executes the eleventh option in the menu: solve the stored linear equations as one system.
+
+        Parameters:
+        - solve_linear_system: Function to solve the stored linear equations together.
+        """
+        report = solve_linear_system()
+        if not report['systems']:
+            print('\nNo stored equation is linear in unknown variables.')
+        for system in report['systems']:
+            print(f"\n{', '.join(system['equations'])}: {system['status']} "
+                  f"({len(system['equations'])} equations, {len(system['unknowns'])} unknowns, rank {system['rank']})")
+            if system['status'] == 'overdetermined':
+                print('  The equations contradict each other, least-squares values:')
+            for var in system['unknowns']:
+                value = system['values'].get(var)
+                print(f"  {var} = {'undetermined' if value is None else round(value, 2)}")
+        for id, reason in report['skipped'].items():
+            print(f"\n{id} skipped: {reason}")
+
+        self.pause()
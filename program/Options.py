@@ -21,11 +21,16 @@ from utils import (
     ParseTree,
     EquationParseTree,
     FileHandler,
-    MergeSort,
+    ExternalMergeSort,
+    ParallelMergeSort,
+    ParallelEvaluator,
+    EvaluationBudget,
+    LinearSystemSolver,
+    RootFinder,
 )  # Import utilities for parsing, file handling, and sorting
-import re
 
 # Import the necessary libraries
+import os
 import networkx as nx
 import matplotlib.pyplot as plt
 
@@ -39,9 +44,20 @@ class Options:
         Initializes an Options object with an empty parse tree.
         """
         self.__parse_tree = ParseTree()  # Initialize a ParseTree object to store assignment statements
+        # Keep a single statement from freezing the menu, integers stay below the 4300 digits Python can print
+        self.__parse_tree.set_budget(EvaluationBudget(max_bit_length=14000, max_nodes=10_000_000, timeout=10))
+        self.__parse_tree.set_reactive(True)  # Keep the values up to date, so edits only evaluate their dependents
         self.historyLog = [] # Initialize an empty list to store all the user's history logs
 
         self.__eqn_parse_tree = EquationParseTree()  # Initialize an EquationParseTree object
+        # Evaluates all the statements on worker processes, evaluated in this process while it has 1 worker
+        self.__parallel_evaluator = ParallelEvaluator(self.__parse_tree, max_workers=1)
+
+        # The last sort and the answers it sorted, so the next sort only merges the statements that changed
+        self.__sorter = None
+        self.__sorted_answers = None
+        # Sorts the statements through temporary files when set, so large workspaces are sorted in bounded memory
+        self.__external_sorter = None
 
     def get_parse_tree(self):
         """
@@ -57,6 +73,7 @@ class Options:
         new_parse_tree (ParseTree): The new parse tree object.
         """
         self.__parse_tree = new_parse_tree  # Set a new parse tree object
+        self.__parallel_evaluator.set_parse_tree(new_parse_tree)
 
     def get_eqn_parse_tree(self):
         """
@@ -73,6 +90,62 @@ class Options:
         """
         self.__eqn_parse_tree = eqn_parse_tree  # Set a new equation parse tree object
 
+    def get_workers(self):
+        """
+        Returns the number of worker processes used to evaluate all the statements.
+        """
+        return self.__parallel_evaluator.get_max_workers()
+
+    def set_workers(self, workers):
+        """
+        Sets the number of worker processes used to evaluate all the statements.
+
+        Parameters:
+        workers (int): The number of worker processes, 1 to evaluate in this process, None to use the number of processors.
+        """
+        self.__parallel_evaluator.set_max_workers(workers)
+
+    def get_sort_run_size(self):
+        """
+        Returns the number of statements sorted in memory at once, None if all the statements are sorted in memory.
+        """
+        return self.__external_sorter.get_run_size() if self.__external_sorter else None
+
+    def set_sort_run_size(self, run_size):
+        """
+        Sets the number of statements sorted in memory at once.
+
+        Parameters:
+        run_size (int): The number of statements in each sorted run written to a temporary file, None to sort all the statements in memory.
+
+        Raises:
+        ValueError: If the run size is not a positive integer.
+        """
+        self.__external_sorter = ExternalMergeSort(run_size) if run_size is not None else None
+
+    def is_reactive(self):
+        """
+        Returns True if the values of the statements are kept up to date after every change.
+        """
+        return self.__parse_tree.is_reactive()
+
+    def set_reactive(self, reactive):
+        """
+        Turns the reactive mode of the parse tree on or off.
+
+        Parameters:
+        reactive (bool): True to evaluate only the statements depending on a change, False to evaluate on demand.
+        """
+        self.__parse_tree.set_reactive(reactive)
+
+    def __start_operation(self):
+        """
+        Clears the cancellation of a previous operation, so the evaluations of a new one are not cancelled.
+        """
+        budget = self.__parse_tree.get_budget()
+        if budget is not None:
+            budget.start(reset_cancel=True)
+
     def add_or_modify(self, statement: Statement):
         """
         Adds or modifies an assignment statement in the parse tree.
@@ -80,35 +153,59 @@ class Options:
         Parameters:
             statement (Statement): The statement object to be added or modified.
         """
+        self.__start_operation()
         statement = Statement(statement)  # Convert the input statement into a Statement object
         self.__parse_tree.add_statement(
             statement.get_var(), statement.get_tokens()
         )  # Add the statement to the parse tree
         # Log the history entry
         self.historyLog.append(("Add/Modify Assignment Statements - Input:", statement))
+        if self.__parse_tree.is_reactive() and not self.__parse_tree.in_batch():
+            # Log how many statements were evaluated again because of the change
+            self.historyLog.append(("Recomputed Statements - Count:", self.__parse_tree.get_touched()))
 
-    def display_statements(self):
+    def display_statements(self, answers=None):
         """
         Displays the assignment statements and their evaluated answers.
 
+        Parameters:
+            answers (dict, optional): The evaluated answers of the variables. All the statements are evaluated if not given.
+
         Returns:
             dict: A dictionary containing assignment statements as keys and their evaluated answers as values.
         """
-        statement_and_answers = {}  # Initialize an empty dictionary to store statement-answer pairs
-
-        # Iterate through the parse tree statements in inorder traversal
-        for key, expression in self.__parse_tree.get_statements().getitem_inorder():
-            # Create a formatted assignment statement
-            statement = f"{key}={expression.shallow_tree()}"
-            # Evaluate the assignment and store the result
-            answer = self.__parse_tree.evaluate(key, expression)
-            statement_and_answers[statement] = (answer)  # Add the statement-answer pair to the dictionary
+        statement_and_answers = dict(self.__statement_answers(answers))
 
         # Log the history entry
         self.historyLog.append(("Displayed Current Statements - Output:", statement_and_answers))
 
         return statement_and_answers  # Return the dictionary containing statement-answer pairs
 
+    def __statement_answers(self, answers=None):
+        """
+        Generates the assignment statements and their evaluated answers, in alphabetical order of their variables.
+        The statements are formatted one at a time, so they are not all held in memory.
+
+        Parameters:
+            answers (dict, optional): The evaluated answers of the variables. All the statements are evaluated if not given.
+
+        Returns:
+            Generator of (statement, answer) pairs.
+        """
+        if answers is None:
+            self.__start_operation()
+            if self.get_workers() == 1:
+                # Evaluate all the statements in a single pass
+                answers = self.__parse_tree.evaluate_all()
+            else:
+                # Evaluate the independent groups of statements in parallel
+                answers = self.__parallel_evaluator.evaluate_all()
+
+        # Iterate through the parse tree statements in inorder traversal
+        for key, expression in self.__parse_tree.get_statements().getitem_inorder():
+            # Create a formatted assignment statement
+            yield f"{key}={expression.shallow_tree()}", answers[key]
+
     def eval_one_var(self, var: str):
         """
         Evaluate and return the parse tree and result for a specific variable.
@@ -127,6 +224,7 @@ class Options:
         ]  # Get the expression corresponding to the variable
 
         if expression:
+            self.__start_operation()
             # Generate the parse tree string
             expression_tree_str = expression.print_in_order(0)
             # Evaluate the variable using the parse tree
@@ -156,21 +254,30 @@ class Options:
         statements = file_handler.read(
             file, read_mode="line"
         )  # Read assignment statements from the file
-        for statement in statements:
-            self.add_or_modify(
-                statement
-            )  # Add each statement to the parse tree
-            
+        # Stage all the statements and add them at once, none of them are added if one fails
+        self.__start_operation()
+        self.__parse_tree.begin_batch()
+        try:
+            for statement in statements:
+                self.add_or_modify(
+                    statement
+                )  # Add each statement to the parse tree
+            answers = self.__parse_tree.commit()  # Check and evaluate all the statements in a single pass
+        finally:
+            self.__parse_tree.rollback()  # Discard the batch if it was not committed
+
         # Log the history entry
         self.historyLog.append(("Read and Sort Assignment Statements from File - Input file:", file))
 
         return (
-            self.display_statements()
+            self.display_statements(answers)
         )  # Return the dictionary containing statement-answer pairs
 
     def sorting_expressions(self, output_file):
         """
         Sorts assignment statements by their evaluated values and writes them to an output file.
+        When a sort run size is set, the statements are sorted in runs on temporary files and the sorted
+        sections are written as the runs are merged, without asking before overwriting the output file.
 
         Parameters:
             output_file (str): The path to the output file.
@@ -178,15 +285,40 @@ class Options:
         Raises:
             ValueError: If there are no statements to sort.
         """
-        if (
-            str(self.display_statements()) == "{}"
-        ):  # Check if there are any statements to sort
+        if self.__external_sorter is not None:
+            if not len(self.__parse_tree.get_statements()):
+                raise ValueError("No statements to sort.")
+            # Stream the statements through sorted runs on temporary files and write the sections as they are merged
+            lines = self.__external_sorter.sections(self.__statement_answers())
+            FileHandler().write_lines(output_file, lines)
+            self.historyLog.append(("Sorted Expressions - Output File:", output_file))
+            return
+
+        # Evaluate the statements once, both to check there are statements and to sort them
+        statement_and_answers = self.display_statements()
+        if not statement_and_answers:  # Check if there are any statements to sort
             raise ValueError("No statements to sort.")
 
-        sorter = MergeSort(
-            self.display_statements()
-        )  # Create a MergeSort object for sorting
-        sorter.merge_sort()  # Sort the assignment statements
+        if self.__sorter is None:
+            sorter = ParallelMergeSort(
+                statement_and_answers, max_workers=self.get_workers()
+            )  # Create a ParallelMergeSort object, sorting in this process while there is 1 worker
+            sorter.merge_sort()  # Sort the assignment statements
+        else:
+            # Only the statements added, removed or whose value changed are merged into the previous sort
+            previous = self.__sorted_answers
+            changes = {
+                statement: answer
+                for statement, answer in statement_and_answers.items()
+                if statement not in previous
+                or type(previous[statement]) is not type(answer)
+                or previous[statement] != answer
+            }
+            removed = [statement for statement in previous if statement not in statement_and_answers]
+            sorter = self.__sorter
+            sorter.merge_changes(changes, removed)  # Merge the changed statements into the previous sort
+        self.__sorter = sorter
+        self.__sorted_answers = statement_and_answers
         sorted_dict = (
             sorter.get_sorted_dict()
         )  # Get the sorted dictionary of statements
@@ -307,29 +439,109 @@ class Options:
         """
         # Get the parse tree of the equation using the get_equation_tree method
         equation_tree = self.get_equation_tree(equation)
+        self.__start_operation()
         # Evaluate the equation parse tree and return the result
-        return self.__eqn_parse_tree.evaluate_equation(
-            equation_tree, self.__parse_tree.get_statements()
-        )
+        return self.__eqn_parse_tree.evaluate_equation(equation_tree, self.__parse_tree)
+
+    def check_equations_file(self, input_file, output_file):
+        """
+        Checks every equation of a file against the current assignment statements, without prompting.
+
+        The equations are read and the results written one line at a time, and the statements are
+        evaluated once into a snapshot shared by all the equations, so memory does not grow with the file.
+        Each output line holds the equation and its result: equal, not equal, unknown or error.
+        The output file is overwritten without asking.
+
+        Parameters:
+            input_file (str): The path to the file of equations, one per line.
+            output_file (str): The path to the file the results are written to.
+
+        Returns:
+            dict: The number of equations for each result.
+
+        Raises:
+            ValueError: If the output file is the input file, which would be emptied before it is read.
+        """
+        file_handler = FileHandler()
+        equations = file_handler.read_lines(input_file)
+        if os.path.exists(output_file) and os.path.samefile(input_file, output_file):
+            raise ValueError("The output file cannot be the input file.")
+        self.__start_operation()
+        snapshot = self.__parse_tree.snapshot()
+        counts = {"equal": 0, "not equal": 0, "unknown": 0, "error": 0}
+
+        def results():
+            for equation in equations:
+                try:
+                    # Single values such as (x) are altered to (x+0) without asking
+                    tokens = DoubleStatement(equation, allow_alter=True).get_tokens()
+                    # The equation is not stored, so the equation store does not grow with the file
+                    equation_tree = self.__eqn_parse_tree.build_parse_tree(tokens)
+                    result = self.__eqn_parse_tree.evaluate_equation(equation_tree, self.__parse_tree, snapshot)
+                    if result == "None":
+                        outcome = "unknown"
+                    elif result:
+                        outcome = "equal"
+                    else:
+                        outcome = "not equal"
+                    counts[outcome] += 1
+                    yield f"{equation} : {outcome}"
+                except Exception as e:
+                    counts["error"] += 1
+                    yield f"{equation} : error: {e}"
+
+        file_handler.write_lines(output_file, results())
+
+        # Log the history entry
+        self.historyLog.append(("Checked Equations from File - Input file:", input_file))
+        return counts
 
     def make_subject_of_eqn(self, equation, target):
         """
         Rearrange an equation to make a specified variable the subject.
+        If the variable appears more than once or under a power that cannot be inverted,
+        its values are found numerically instead.
 
         Parameters:
             equation (str): The equation string.
             target (str): The variable to make the subject.
 
         Returns:
-            str: The rearranged equation.
+            str: The rearranged equation, or the values of the variable rounded to 2 decimal places.
+
+        Raises:
+            ValueError: If the variable is not in the equation, or no value of the variable solves it.
         """
-        regex_pattern = r"^\([a-zA-Z0-9]+(?:[*/+-][a-zA-Z0-9]+)*\)=\([a-zA-Z0-9]+(?:[*/+-][a-zA-Z0-9]+)*\)$"
-        if re.match(regex_pattern, equation):
-            # Get the parse tree of the equation using the get_equation_tree method
-            equation_tree = self.get_equation_tree(equation)
-            # Rearrange the equation parse tree to make the target variable the subject
+        # Get the parse tree of the equation using the get_equation_tree method
+        equation_tree = self.get_equation_tree(equation)
+        # Rearrange the equation parse tree to make the target variable the subject,
+        # a new tree is built so the stored tree is left unchanged
+        try:
             rearranged_tree = self.__eqn_parse_tree.rearrange_tree(target, equation_tree)
-            # Convert the rearranged equation parse tree back to bracket notation
-            return rearranged_tree.bracket_inorder_traversal(string=True)
-        else:
-            raise ValueError('Equation format not supported.')
\ No newline at end of file
+        except ValueError:
+            if target not in self.__eqn_parse_tree.collect_variables(equation_tree):
+                raise
+            # The other variables take their values from the assignment statements
+            self.__start_operation()
+            roots = RootFinder(self.__parse_tree).solve(equation_tree, target)
+            if not roots:
+                raise ValueError(f"Variable {target} cannot be made the subject, and no value of it solves the equation.")
+            return ' or '.join(f"{target}={round(root, 2)}" for root in roots)
+        # Convert the rearranged equation parse tree back to bracket notation
+        return rearranged_tree.bracket_inorder_traversal(string=True)
+
+    def solve_linear_system(self):
+        """
+        Solve all the stored equations that are linear in the unknowns together, as one system.
+        Variables with an assignment statement are replaced by their value, the others are the unknowns.
+
+        Returns:
+            dict: The report of LinearSystemSolver.solve, with the solution, the blocks of unknowns
+                  solved together and their status, and the equations that were skipped.
+        """
+        self.__start_operation()
+        report = LinearSystemSolver(self.__eqn_parse_tree, self.__parse_tree).solve()
+
+        # Log the history entry
+        self.historyLog.append(("Solved Linear System - Unknowns solved:", len(report["solution"])))
+        return report
\ No newline at end of file
@@ -0,0 +1,323 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Compiles the affine statements of a ParseTree, such as Lemon=(Pear+Tangerine)
+# and Pear=(Apple+1), into a sparse matrix and an offset vector over the leaf
+# variables. Evaluating all the affine statements is then one sparse
+# matrix-vector product, or one matrix-matrix product for a batch of inputs.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : AffineCompiler.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import math
+
+import numpy as np
+
+from utils.LinearSystemSolver import LinearSystemSolver
+
+class AffineCompiler:
+    """
+    Evaluates the affine statements of a ParseTree with a sparse matrix-vector product.
+
+    The inputs are the leaf variables, the defined variables whose statement does not refer to any other
+    variable, such as Apple=(15). A statement is affine if it is a sum of inputs and integer affine statements
+    multiplied by constants, plus a constant, as LinearSystemSolver.combine defines it. Substituting the
+    affine statements it refers to gives every affine statement as a combination of the inputs only:
+        value = sum(coefficient * input) + offset
+
+    The coefficients are stored in compressed sparse rows, one row per affine statement, so the product
+    is a gather of the inputs, a multiplication and one np.add.reduceat over the rows. A row holds one entry
+    per input the statement depends on, directly or through other statements.
+    Statements that are not affine, and the statements depending on them, are evaluated by the parse tree.
+
+    ParseTree.evaluate rounds the value of every statement to 2 decimal places before the statements referring
+    to it use it, so only the affine statements with an integer value, whose value is never rounded, are
+    substituted. A statement referring to an affine statement whose value can be a float is not affine, so it
+    reads the rounded value from the parse tree. Integer results are exact as long as they fit in a float64
+    without loss; the larger ones are evaluated by the parse tree.
+
+    The other results are sums in another order than the one of the expression, so they can differ from
+    ParseTree.evaluate in the last bits, such as 330.315 and 330.31500000000005, which round to different
+    cents. The difference is bounded by ROUNDING_TOLERANCE times the sum of the magnitudes of the terms,
+    so a result that close to a half cent is evaluated by the parse tree instead, and evaluate_all gives
+    the values of ParseTree.evaluate.
+
+    Attributes:
+        parse_tree (ParseTree): The parse tree holding the assignment statements.
+        program (dict): The compiled matrix and offsets, or None if not compiled yet.
+    """
+
+    # Largest magnitude up to which every integer is exactly representable in float64
+    MAX_EXACT_INT = 2 ** 53
+
+    # Largest number of products computed at once, so a batch does not hold one product per entry and vector
+    CHUNK_PRODUCTS = 2 ** 22
+
+    # Bound of the difference between a float result and ParseTree.evaluate, relative to the sum of the
+    # magnitudes of its terms, far above the few ulps that reordering a sum of floats can change
+    ROUNDING_TOLERANCE = 2 ** -40
+
+    def __init__(self, parse_tree):
+        """
+        Initializes the compiler for the given parse tree.
+
+        Parameters:
+            parse_tree (ParseTree): The parse tree holding the assignment statements.
+        """
+        self.__parse_tree = parse_tree
+        self.__program = None
+
+    def get_parse_tree(self):
+        """Returns the parse tree being compiled."""
+        return self.__parse_tree
+
+    def set_parse_tree(self, parse_tree):
+        """Sets the parse tree to compile and discards the compiled program."""
+        self.__parse_tree = parse_tree
+        self.__program = None
+
+    def get_program(self):
+        """Returns the compiled program."""
+        return self.__program
+
+    def get_inputs(self):
+        """
+        Returns the inputs of the compiled program, in the order of the columns of the matrix.
+        """
+        if self.__program is None:
+            self.compile()
+        return list(self.__program['inputs'])
+
+    def get_outputs(self):
+        """
+        Returns the affine statements of the compiled program, in the order of the rows of the matrix.
+        """
+        if self.__program is None:
+            self.compile()
+        return list(self.__program['outputs'])
+
+    def compile(self):
+        """
+        Detects the affine statements and compiles them into a sparse matrix and an offset vector.
+
+        The program has to be compiled again whenever the statements of the parse tree change.
+
+        Returns:
+            AffineCompiler: The compiler itself, to allow chaining with evaluate_all.
+        """
+        parse_tree = self.__parse_tree
+        optimized_statements = parse_tree.get_optimized_statements()
+        dependency_graph = parse_tree.get_dependency_graph()
+
+        inputs = {}  # Inputs mapped to their column
+        input_values = []
+        forms = {}  # Inputs and integer affine statements mapped to their coefficients and offset
+        rows = {}  # Affine statements mapped to their coefficients, offset and whether their value is an integer
+        outputs = []
+        for var in dependency_graph.topological_order():
+            if not dependency_graph.is_resolved(var):
+                continue
+            if not dependency_graph.get_dependencies(var):
+                try:
+                    value = parse_tree.get_value(var)
+                except (ZeroDivisionError, RuntimeError, OverflowError):
+                    continue
+                if (isinstance(value, int) or isinstance(value, float)) and abs(value) <= self.MAX_EXACT_INT:
+                    inputs[var] = len(inputs)
+                    input_values.append(value)
+                    forms[var] = ({var: 1}, 0)
+                continue
+            try:
+                terms, offset = self.__affine_form(optimized_statements[var], forms)
+            except (ValueError, ZeroDivisionError, OverflowError, RuntimeError):
+                continue
+            try:
+                # Complex numbers and integers too large for a float cannot be put in the matrix
+                if not all(math.isfinite(float(c)) for c in terms.values()) or not math.isfinite(float(offset)):
+                    continue
+            except (TypeError, OverflowError):
+                continue
+            # Additions, subtractions and products of integers give an integer, like ParseTree.evaluate
+            integer = (isinstance(offset, int) and all(isinstance(c, int) for c in terms.values())
+                       and all(isinstance(input_values[inputs[input]], int) for input in terms))
+            rows[var] = (terms, offset, integer)
+            outputs.append(var)
+            if integer:
+                # Other values are rounded before the statements referring to them read them
+                forms[var] = (terms, offset)
+
+        # Compressed sparse rows: the entries of row i are data[indptr[i]:indptr[i + 1]]
+        indptr = [0]
+        columns, data, offsets, is_int = [], [], [], []
+        for var in outputs:
+            terms, offset, integer = rows[var]
+            for input, coefficient in terms.items():
+                if coefficient != 0:
+                    columns.append(inputs[input])
+                    data.append(coefficient)
+            indptr.append(len(columns))
+            offsets.append(offset)
+            is_int.append(integer)
+
+        self.__program = {
+            'inputs': list(inputs),
+            'input_values': np.array(input_values, dtype=np.float64),
+            'input_is_int': [isinstance(value, int) for value in input_values],
+            'outputs': outputs,
+            'indptr': np.array(indptr, dtype=np.int64),
+            'columns': np.array(columns, dtype=np.int64),
+            'data': np.array(data, dtype=np.float64),
+            'offsets': np.array(offsets, dtype=np.float64),
+            'is_int': np.array(is_int, dtype=bool),
+        }
+        return self
+
+    def evaluate(self, inputs=None):
+        """
+        Evaluates the affine statements for one or many input vectors, with one sparse product.
+        The values are not rounded.
+
+        Parameters:
+            inputs (array_like, optional): The values of the inputs in the order of get_inputs, either one
+                                           vector or a batch of vectors with one vector per row.
+                                           Defaults to the current values of the inputs.
+
+        Returns:
+            numpy.ndarray: The values of the affine statements in the order of get_outputs, one row per
+                           input vector for a batch.
+
+        Raises:
+            ValueError: If the number of input values does not match the number of inputs.
+        """
+        if self.__program is None:
+            self.compile()
+        program = self.__program
+
+        x = program['input_values'] if inputs is None else np.asarray(inputs, dtype=np.float64)
+        if x.shape[-1] != len(program['inputs']):
+            raise ValueError(f"Expected {len(program['inputs'])} input values, got {x.shape[-1]}.")
+        # The number of vectors is given explicitly, since reshape cannot infer it when there are no inputs
+        batch = x.reshape(math.prod(x.shape[:-1]), x.shape[-1])
+        results = self.__product(batch, program['data'], program['offsets'])
+        return results if x.ndim > 1 else results[0]
+
+    def __product(self, batch, data, offsets):
+        """
+        Multiplies a batch of input vectors by the compiled sparse matrix and adds the offsets.
+
+        Parameters:
+            batch (numpy.ndarray): The input vectors, one per row.
+            data (numpy.ndarray): The entries of the matrix, in compressed sparse row order.
+            offsets (numpy.ndarray): The offset of each row of the matrix.
+
+        Returns:
+            numpy.ndarray: The results, one row per input vector.
+        """
+        indptr = self.__program['indptr']
+        columns = self.__program['columns']
+        results = np.tile(offsets, (len(batch), 1))
+        # np.add.reduceat cannot reduce an empty row, so only the rows with entries are reduced
+        filled = np.flatnonzero(indptr[1:] > indptr[:-1])
+        if len(filled):
+            chunk = max(1, self.CHUNK_PRODUCTS // len(data))
+            for start in range(0, len(batch), chunk):
+                products = batch[start:start + chunk, columns] * data
+                results[start:start + chunk, filled] += np.add.reduceat(products, indptr[filled], axis=1)
+        return results
+
+    def evaluate_all(self):
+        """
+        Evaluates every assignment statement of the parse tree, the affine ones with one sparse product
+        and the others with the parse tree.
+
+        Returns:
+            dict: The variables, in alphabetical order, mapped to their evaluated values
+                  (int, float or 'None' if the statement depends on an undefined variable),
+                  the same as ParseTree.evaluate_all, including the rounding to 2 decimal places.
+
+        Raises:
+            ZeroDivisionError: If an expression that is not affine includes division by zero.
+            EvaluationBudgetExceeded: If the evaluation of a statement that is not affine exceeds the budget.
+        """
+        if self.__program is None:
+            self.compile()
+        program = self.__program
+
+        values = {}
+        for var, value, integer in zip(program['inputs'], program['input_values'].tolist(), program['input_is_int']):
+            values[var] = int(value) if integer else value
+        with np.errstate(all='ignore'):
+            results = self.evaluate()
+            # The sums of integers are exact if the sum of their magnitudes fits in a float64 without loss
+            bounds = self.__product(np.abs(program['input_values'])[None, :], np.abs(program['data']),
+                                    np.abs(program['offsets']))[0]
+            # Float results this close to a half cent may round the other way than ParseTree.evaluate
+            cents = results * 100
+            ambiguous = np.abs(cents - np.floor(cents) - 0.5) <= bounds * 100 * self.ROUNDING_TOLERANCE
+        for var, value, bound, integer, near_half in zip(program['outputs'], results.tolist(), bounds.tolist(),
+                                                         program['is_int'].tolist(), ambiguous.tolist()):
+            # Values that float64 cannot hold exactly, or cannot round safely, are left to the parse tree
+            if not np.isfinite(value):
+                continue
+            if integer and bound <= self.MAX_EXACT_INT:
+                values[var] = int(value)
+            elif not integer and not near_half:
+                values[var] = round(value, 2)
+
+        parse_tree = self.__parse_tree
+        return {var: values[var] if var in values else parse_tree.get_value(var)
+                for var, _ in parse_tree.get_statements().getitem_inorder()}
+
+    def __affine_form(self, tree, forms):
+        """
+        Writes an expression as a combination of the inputs plus an offset, without recursion.
+
+        Parameters:
+            tree (BinaryTree): The root of the expression tree.
+            forms (dict): The inputs and integer affine statements mapped to their coefficients and offset.
+
+        Returns:
+            tuple: The inputs mapped to their coefficients, and the offset.
+
+        Raises:
+            ValueError: If the expression is not affine, or refers to a statement that is not in the forms.
+            ZeroDivisionError: If the expression includes division by zero.
+            RuntimeError: If the expression has a missing operand or operator.
+        """
+        results = []
+        # Tasks are a tree to visit, or an operator to apply to the last two results
+        tasks = [tree]
+        while tasks:
+            item = tasks.pop()
+            if isinstance(item, str):
+                right = results.pop()
+                left = results.pop()
+                results.append(LinearSystemSolver.combine(item, left, right))
+                continue
+
+            left_tree, right_tree = item.get_left_tree(), item.get_right_tree()
+            if left_tree and right_tree:
+                tasks.append(item.get_key())
+                tasks.append(right_tree)
+                tasks.append(left_tree)
+                continue
+
+            key = item.get_key()
+            if key == '?':
+                raise RuntimeError('Error evaluating expression due to missing operand or operator.')
+            if isinstance(key, int) or isinstance(key, float):
+                results.append(({}, key))
+            elif key in forms:
+                results.append(forms[key])
+            else:
+                raise ValueError(f"Variable {key} is not affine.")
+        return results.pop()
@@ -0,0 +1,300 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# An iterative, bottom-up version of MergeSort. The runs already in order in
+# the data are detected, and adjacent runs are merged with galloping, back and
+# forth between two preallocated lists, as in Timsort. The sort key of every
+# entry is computed once before sorting, so no list is allocated per merge and
+# no type check is done per comparison. A sorted result can also be updated
+# with a few changed entries without sorting the others again.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : BottomUpMergeSort.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+from bisect import bisect_left, bisect_right, insort
+
+from utils.MergeSort import MergeSort
+
+class BottomUpMergeSort(MergeSort):
+    """
+    A merge sort giving the same order as MergeSort, without recursion and with a single auxiliary list.
+
+    Every entry (key, value) is sorted by the precomputed key (-value, key), so the values are in
+    descending order and equal values in alphabetical order of their keys, as in MergeSort.merge.
+    Keys are unique, so this order is total and the result is exactly the one of MergeSort.
+    If a value is a string other than 'None', MergeSort.merge only compares keys for that pair,
+    which is not a total order, so the entries are sorted by MergeSort itself.
+
+    The 'None' entries are sorted alphabetically by their full name.
+
+    The sort adapts to the order already in the data: sorted data is only scanned, and data made of
+    r sorted runs takes O(n log r) comparisons. After a few entries change, merge_changes merges them
+    back into the previous result instead of sorting everything again.
+    """
+
+    # Shortest run merged, shorter runs are extended by binary insertion
+    RUN = 32
+
+    # Number of consecutive items taken from the same run before galloping
+    MIN_GALLOP = 7
+
+    def merge_sort(self):
+        """
+        Performs the merge sort on the numeric part of the data.
+        """
+        data = self.get_data()
+        if any(isinstance(value, str) for _, value in data):
+            super().merge_sort()
+            return
+        # The entry is kept after its sort key, it is never compared since the keys are unique
+        entries = self.sort([(-entry[1], entry[0], entry) for entry in data])
+        self.set_data([entry for _, _, entry in entries])
+
+    def get_sorted_dict(self):
+        """
+        Converts the sorted array back into a dictionary, grouping keys by their values, and adds the sorted 'None' entries.
+
+        Returns:
+        - dict: The sorted dictionary.
+        """
+        sorted_dict = {}
+        for key, value in self.get_data():
+            if value not in sorted_dict:
+                sorted_dict[value] = []
+            sorted_dict[value].append(key)
+
+        # Add 'None' entries at the end, sorted alphabetically
+        sorted_dict['None'] = self.sort(list(self.get_none_entries()))
+        return sorted_dict
+
+    def merge_changes(self, changes, removed=()):
+        """
+        Updates the sorted data after entries were added, changed or removed, without sorting the others again.
+
+        The entries that did not change are still in order, so only the changed entries are sorted, and each
+        of them is placed by a binary search from the position of the previous one. When k of n entries change,
+        this takes O(k log n) comparisons, and the unchanged entries are copied in slices.
+        merge_sort must have been called before.
+
+        Parameters:
+        - changes (dict): The keys added or whose value changed, mapped to their new values (numeric or 'None').
+        - removed (iterable, optional): The keys removed. Defaults to no key.
+        """
+        dropped = set(removed)
+        dropped.update(changes)
+        data = [entry for entry in self.get_data() if entry[0] not in dropped]
+        none_entries = [key for key in self.get_none_entries() if key not in dropped]
+        new_data = [(key, value) for key, value in changes.items() if value != 'None']
+        new_none_entries = [key for key, value in changes.items() if value == 'None']
+
+        if any(isinstance(value, str) for _, value in new_data) or any(isinstance(value, str) for _, value in data):
+            # Without a total order, the entries are sorted again by MergeSort
+            self.set_data(data + new_data)
+            self.set_none_entries(none_entries + new_none_entries)
+            super().merge_sort()
+            return
+
+        new_data = [entry for _, _, entry in self.sort([(-entry[1], entry[0], entry) for entry in new_data])]
+        self.set_data(self.__insert(data, new_data, lambda entry: (-entry[1], entry[0])))
+        self.set_none_entries(self.__insert(none_entries, self.sort(new_none_entries), None))
+
+    @staticmethod
+    def __insert(items, new_items, key):
+        """
+        Merges a few sorted items into many sorted items, with one binary search per new item.
+
+        Parameters:
+        - items (list): The sorted items.
+        - new_items (list): The sorted items to insert, with keys different from the keys of items.
+        - key (function): The sort key of an item, or None to compare the items themselves.
+
+        Returns:
+        - list: The merged items.
+        """
+        merged = []
+        position = 0
+        for item in new_items:
+            # The items before the previous position are smaller, so the search starts from it
+            end = bisect_left(items, key(item) if key else item, position, key=key)
+            merged.extend(items[position:end])
+            merged.append(item)
+            position = end
+        merged.extend(items[position:])
+        return merged
+
+    @classmethod
+    def sort(cls, items):
+        """
+        Sorts a list in ascending order by merging its runs, as in Timsort.
+
+        The list is split into runs already in order: non-descending runs are kept, strictly descending runs
+        are reversed, and runs shorter than RUN are extended by binary insertion. Each pass then merges pairs
+        of adjacent runs from one list into the other, and the lists swap roles, so the only allocation is
+        the second list. Equal items keep their order, so the sort is stable.
+
+        Parameters:
+        - items (list): The items to sort, compared with <. The list is reused by the sort.
+
+        Returns:
+        - list: The sorted items, either the list given or the auxiliary list.
+        """
+        n = len(items)
+        bounds = [0]
+        while bounds[-1] < n:
+            low = bounds[-1]
+            end = low + 1
+            if end < n and items[end] < items[low]:
+                # A strictly descending run is reversed, which keeps equal items in order
+                while end < n and items[end] < items[end - 1]:
+                    end += 1
+                items[low:end] = items[low:end][::-1]
+            else:
+                while end < n and not items[end] < items[end - 1]:
+                    end += 1
+            # Extend a short run by binary insertion
+            high = min(low + cls.RUN, n)
+            if end < high:
+                run = items[low:end]
+                for item in items[end:high]:
+                    insort(run, item)
+                items[low:high] = run
+                end = high
+            bounds.append(end)
+
+        source, target = items, [None] * n if len(bounds) > 2 else items
+        while len(bounds) > 2:
+            merged_bounds = [0]
+            for run in range(0, len(bounds) - 1, 2):
+                low, middle = bounds[run], bounds[run + 1]
+                if run + 2 < len(bounds):
+                    high = bounds[run + 2]
+                    cls.__merge(source, target, low, middle, high)
+                else:
+                    # The last run has no pair in this pass
+                    high = middle
+                    target[low:high] = source[low:high]
+                merged_bounds.append(high)
+            bounds = merged_bounds
+            source, target = target, source
+        return source
+
+    @classmethod
+    def __merge(cls, source, target, low, middle, high):
+        """
+        Merges source[low:middle] and source[middle:high] into target[low:high], with galloping.
+
+        The items of the left run that are not larger than the first item of the right run, and the items
+        of the right run that are not smaller than the last item of the left run, are found by binary search
+        and copied as they are. While one run keeps winning, its winning items are also found by galloping,
+        an exponential then binary search, and copied in one slice.
+
+        Parameters:
+        - source (list): The list holding the two runs.
+        - target (list): The list receiving the merged run.
+        - low (int): The start of the left run.
+        - middle (int): The end of the left run and the start of the right run.
+        - high (int): The end of the right run.
+        """
+        # Items already in place at both ends
+        i = bisect_right(source, source[middle], low, middle)
+        target[low:i] = source[low:i]
+        end = bisect_left(source, source[middle - 1], middle, high)
+        j, k = middle, i
+        if i == middle:
+            target[middle:high] = source[middle:high]
+            return
+
+        # The runs take turns: after the trimming the right run wins first, and each turn ends when
+        # the other run wins, so the winner is always known without comparing again.
+        # A turn that does not reach its limit ended on a comparison, so its run is not exhausted
+        gallop = cls.MIN_GALLOP
+        left, right = source[i], source[j]
+        while True:
+            # Take items of the right run until the left run wins, or MIN_GALLOP items were taken
+            limit = j + gallop if j + gallop < end else end
+            while True:
+                target[k] = right
+                k += 1
+                j += 1
+                if j == limit:
+                    break
+                right = source[j]
+                if not right < left:
+                    break
+            if j == limit:
+                if j == end:
+                    break
+                # Take every item of the right run smaller than the current left item at once
+                stop = cls.__gallop(source, left, j, end, bisect_left)
+                target[k:k + stop - j] = source[j:stop]
+                k += stop - j
+                j = stop
+                if j == end:
+                    break
+                right = source[j]
+
+            # Take items of the left run until the right run wins, or MIN_GALLOP items were taken
+            limit = i + gallop if i + gallop < middle else middle
+            while True:
+                target[k] = left
+                k += 1
+                i += 1
+                if i == limit:
+                    break
+                left = source[i]
+                if right < left:
+                    break
+            if i == limit:
+                if i == middle:
+                    break
+                # Take every item of the left run not larger than the current right item at once
+                stop = cls.__gallop(source, right, i, middle, bisect_right)
+                target[k:k + stop - i] = source[i:stop]
+                k += stop - i
+                i = stop
+                if i == middle:
+                    break
+                left = source[i]
+
+        # One run is exhausted, the rest of the left run goes before the rest of the right run
+        target[k:k + middle - i] = source[i:middle]
+        k += middle - i
+        target[k:high] = source[j:high]
+
+    @staticmethod
+    def __gallop(items, item, low, high, search):
+        """
+        Finds where an item goes in items[low:high] by an exponential search from low, then a binary search.
+        This takes O(log d) comparisons, where d is the distance from low to the result.
+
+        Parameters:
+        - items (list): The list holding the sorted run.
+        - item: The item to place.
+        - low (int): The start of the run.
+        - high (int): The end of the run.
+        - search (function): bisect_left to go before equal items, or bisect_right to go after them.
+
+        Returns:
+        - int: The position of the item in items[low:high].
+        """
+        last, offset = low, 1
+        # Every item before last goes before the item
+        while low + offset - 1 < high and search(items, item, low + offset - 1, low + offset) == low + offset:
+            last = low + offset
+            offset *= 2
+        return search(items, item, last, min(low + offset - 1, high))
+
+    def __str__(self) -> str:
+        return "BottomUpMergeSort class"
+
+    def __repr__(self) -> str:
+        return "BottomUpMergeSort class"
@@ -0,0 +1,318 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Automatic differentiation of the assignment statements of a ParseTree.
+# The expression trees of a statement and of every variable it refers to are
+# recorded once on a tape. A backward pass over the tape gives the partial
+# derivatives with respect to all the leaf variables (reverse mode), and a
+# forward pass gives the derivative with respect to one of them (forward mode).
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : Differentiator.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import math
+
+class Differentiator:
+    """
+    Computes derivatives of assignment statements with respect to their leaf variables.
+
+    A leaf variable is a defined variable whose statement does not refer to any other variable,
+    such as Apple=(15), and it is the input of the statements referring to it. The tape holds one
+    entry per operator, constant and leaf variable, in the order they are evaluated. A variable referred
+    to several times is recorded once, so its partial derivatives are accumulated from all its uses.
+
+    Values on the tape are evaluated like ParseTree.evaluate, including the rounding of every statement
+    to 2 decimal places, but the rounding is treated as the identity when differentiating.
+    Partial derivatives that are not defined, such as the exponent of a negative base, are nan.
+    Statements waiting on an undefined variable evaluate to 'None', and so do their derivatives.
+
+    Attributes:
+        parse_tree (ParseTree): The parse tree holding the assignment statements.
+    """
+
+    # Tape entries of the leaf variables and of the constants
+    INPUT = 'input'
+    CONSTANT = 'constant'
+
+    def __init__(self, parse_tree):
+        """
+        Initializes the differentiator for the given parse tree.
+
+        Parameters:
+            parse_tree (ParseTree): The parse tree holding the assignment statements.
+        """
+        self.__parse_tree = parse_tree
+
+    def get_parse_tree(self):
+        """Returns the parse tree being differentiated."""
+        return self.__parse_tree
+
+    def set_parse_tree(self, parse_tree):
+        """Sets the parse tree to differentiate."""
+        self.__parse_tree = parse_tree
+
+    def leaf_variables(self, var):
+        """
+        Finds the leaf variables a statement depends on, directly or through other variables.
+
+        Parameters:
+            var (str): The variable of the statement.
+
+        Returns:
+            list: The leaf variables in alphabetical order. A leaf variable depends on itself.
+
+        Raises:
+            ValueError: If the variable is not defined.
+        """
+        optimized_statements = self.__parse_tree.get_optimized_statements()
+        dependency_graph = self.__parse_tree.get_dependency_graph()
+        if var not in optimized_statements:
+            raise ValueError(f"Variable {var} is not defined.")
+
+        leaves = []
+        visited = {var}
+        stack = [var]
+        while stack:
+            current = stack.pop()
+            dependencies = dependency_graph.get_dependencies(current)
+            if not dependencies:
+                leaves.append(current)
+            for dep in dependencies:
+                # Undefined variables have no statement, so they are not leaf variables
+                if dep not in visited and dep in optimized_statements:
+                    visited.add(dep)
+                    stack.append(dep)
+        return sorted(leaves)
+
+    def gradient(self, var):
+        """
+        Computes the partial derivatives of a statement with respect to all its leaf variables,
+        with one backward pass over the tape (reverse mode).
+        The partial derivative with respect to any other variable is 0.
+
+        Parameters:
+            var (str): The variable of the statement.
+
+        Returns:
+            dict: The leaf variables, in alphabetical order, mapped to the partial derivatives,
+                  or to 'None' if the statement evaluates to 'None'.
+
+        Raises:
+            ValueError: If the variable is not defined.
+            ZeroDivisionError: If an expression includes division by zero.
+            RuntimeError: If an expression has a missing operand or operator.
+        """
+        leaves = self.leaf_variables(var)
+        tape = self.record(var)
+        if tape is None:
+            return {leaf: 'None' for leaf in leaves}
+        ops, lefts, rights, values, active, inputs = tape
+
+        adjoints = [0] * len(ops)
+        adjoints[-1] = 1
+        for i in range(len(ops) - 1, -1, -1):
+            adjoint = adjoints[i]
+            if adjoint == 0 or ops[i] == self.INPUT or ops[i] == self.CONSTANT:
+                continue
+            left, right = lefts[i], rights[i]
+            d_left, d_right = self.partials(ops[i], values[left], values[right], active[left], active[right])
+            if active[left]:
+                adjoints[left] += adjoint * d_left
+            if active[right]:
+                adjoints[right] += adjoint * d_right
+
+        return {leaf: adjoints[inputs[leaf]] for leaf in leaves}
+
+    def derivative(self, var, wrt):
+        """
+        Computes the derivative of a statement with respect to one leaf variable,
+        with one forward pass over the tape (forward mode).
+
+        Parameters:
+            var (str): The variable of the statement.
+            wrt (str): The leaf variable to differentiate with respect to.
+
+        Returns:
+            float or int or 'None': The derivative, 0 if the statement does not depend on wrt,
+                                    or 'None' if the statement evaluates to 'None'.
+
+        Raises:
+            ValueError: If the variable is not defined.
+            ZeroDivisionError: If an expression includes division by zero.
+            RuntimeError: If an expression has a missing operand or operator.
+        """
+        leaves = self.leaf_variables(var)
+        tape = self.record(var)
+        if tape is None:
+            return 'None'
+        if wrt not in leaves:
+            return 0
+        ops, lefts, rights, values, active, inputs = tape
+
+        tangents = [0] * len(ops)
+        tangents[inputs[wrt]] = 1
+        for i in range(inputs[wrt] + 1, len(ops)):
+            if ops[i] == self.INPUT or ops[i] == self.CONSTANT:
+                continue
+            left, right = lefts[i], rights[i]
+            if tangents[left] == 0 and tangents[right] == 0:
+                continue
+            d_left, d_right = self.partials(ops[i], values[left], values[right], active[left], active[right])
+            tangent = 0
+            if tangents[left] != 0:
+                tangent += d_left * tangents[left]
+            if tangents[right] != 0:
+                tangent += d_right * tangents[right]
+            tangents[i] = tangent
+
+        return tangents[-1]
+
+    def record(self, var):
+        """
+        Evaluates a statement without recursion and records its evaluation on a tape.
+        The last entry of the tape is the value of the statement.
+
+        Parameters:
+            var (str): The variable of the statement.
+
+        Returns:
+            tuple: The lists (ops, lefts, rights, values, active) holding one item per entry, where active
+                   tells if the entry depends on a leaf variable, and the leaf variables mapped to their entry.
+                   None if the statement evaluates to 'None'.
+
+        Raises:
+            ValueError: If the variable is not defined.
+            ZeroDivisionError: If an expression includes division by zero.
+            RuntimeError: If an expression has a missing operand or operator.
+        """
+        optimized_statements = self.__parse_tree.get_optimized_statements()
+        dependency_graph = self.__parse_tree.get_dependency_graph()
+        if var not in optimized_statements:
+            raise ValueError(f"Variable {var} is not defined.")
+        if not dependency_graph.is_resolved(var):
+            # The statement is 'None', unless another part of its tree raises an error
+            self.__parse_tree.get_value(var)
+            return None
+
+        apply_operator = self.__parse_tree.apply_operator
+        budget = self.__parse_tree.get_budget()
+        if budget is not None:
+            budget.start()
+
+        ops, lefts, rights, values, active = [], [], [], [], []
+        inputs = {}
+        entries = {}  # Variables mapped to the entry holding their value
+
+        def append(op, left, right, value, is_active):
+            ops.append(op)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            active.append(is_active)
+            return len(ops) - 1
+
+        # Tasks are (tree, None) to visit a node, (tree, op) to apply an operator,
+        # and (None, var) to finish the statement of a variable
+        tasks = [(None, var), (optimized_statements[var], None)]
+        results = []  # Entries of the subtrees evaluated so far
+        while tasks:
+            tree, item = tasks.pop()
+            if tree is None:
+                entry = results.pop()
+                value = values[entry]
+                # Round off floating-point calculations, like ParseTree.evaluate
+                if isinstance(value, float):
+                    values[entry] = round(value, 2)
+                if not dependency_graph.get_dependencies(item):
+                    # The statement of a leaf variable is an input of the tape
+                    entry = append(self.INPUT, None, None, values[entry], True)
+                    inputs[item] = entry
+                entries[item] = entry
+                results.append(entry)
+                continue
+
+            if item is not None:
+                right = results.pop()
+                left = results.pop()
+                if budget is not None:
+                    budget.check_operation(item, values[left], values[right])
+                value = apply_operator(item, values[left], values[right])
+                if budget is not None:
+                    budget.check_value(value)
+                results.append(append(item, left, right, value, active[left] or active[right]))
+                continue
+
+            if budget is not None:
+                budget.visit()
+            left_tree, right_tree = tree.get_left_tree(), tree.get_right_tree()
+            if left_tree and right_tree:
+                tasks.append((tree, tree.get_key()))
+                tasks.append((right_tree, None))
+                tasks.append((left_tree, None))
+                continue
+
+            key = tree.get_key()
+            if key == '?':
+                raise RuntimeError('Error evaluating expression due to missing operand or operator.')
+            if isinstance(key, int) or isinstance(key, float):
+                results.append(append(self.CONSTANT, None, None, key, False))
+            elif key in entries:
+                results.append(entries[key])
+            else:
+                # Resolved statements only refer to defined variables
+                tasks.append((None, key))
+                tasks.append((optimized_statements[key], None))
+
+        # The statement is recorded last, since it is the first variable visited
+        return ops, lefts, rights, values, active, inputs
+
+    @staticmethod
+    def partials(op, left, right, left_active=True, right_active=True):
+        """
+        Computes the partial derivatives of an operator with respect to its operands.
+
+        Parameters:
+            op (str): The operator.
+            left (float or int): The evaluated left operand.
+            right (float or int): The evaluated right operand.
+            left_active (bool, optional): Whether the left partial derivative is needed. Defaults to True.
+            right_active (bool, optional): Whether the right partial derivative is needed. Defaults to True.
+
+        Returns:
+            tuple: The partial derivatives with respect to the left and right operands.
+                   A partial derivative that is not needed is 0.
+        """
+        if op == '+':
+            return 1, 1
+        if op == '-':
+            return 1, -1
+        if op == '*':
+            return right, left
+        if op == '/':
+            return 1 / right, (-left / (right * right) if right_active else 0)
+        if op == '**':
+            d_left = d_right = 0
+            if left_active:
+                try:
+                    d_left = right * left ** (right - 1)
+                except ZeroDivisionError:
+                    # Infinite slope of a root of zero
+                    d_left = math.nan
+            if right_active:
+                if left > 0:
+                    d_right = left ** right * math.log(left)
+                elif left == 0 and right > 0:
+                    d_right = 0
+                else:
+                    d_right = math.nan
+            return d_left, d_right
+        return math.nan, math.nan
@@ -15,7 +15,10 @@
 # -----------------------------------------------------
 # To run: python main.py
 # -----------------------------------------------------
+import hashlib
+import math
 from ADT import Stack, BinaryTree, Hashtable
+from ADT.LRUCache import LRUCache
 from utils import ParseTree
 
 class EquationParseTree(ParseTree):
@@ -24,29 +27,60 @@ class EquationParseTree(ParseTree):
 
     The EquationParseTree class supports building a binary tree from a mathematical equation,
     evaluating that expression, and handling variable assignments and references within expressions.
-    It uses a hashtable for memoization to optimize repeated evaluations and to handle 
-    circular dependencies inherited from ParseTree.
+    Equations are stored once per distinct structure: adding an equation already stored returns
+    its id and counts one more reference to it, so the store grows with the number of distinct equations.
+    Results are memoized in a least recently used cache, keyed by the structure of the equation
+    and the version stamps of the variables it refers to, so an equation is only evaluated again
+    once one of those variables, or a variable they depend on, changes.
 
     Attributes:
-        equations (Hashtable): Stores variable assignments and their corresponding expression trees.
-        memoization_cache (Hashtable): Cache used to store previously computed results for optimization.
+        equations (Hashtable): Stores the ids of the equations and their corresponding expression trees.
+        addresses (Hashtable): Maps the structural hash of every equation stored to its id.
+        reference_counts (dict): The number of times each equation id was added and not removed.
+        next_id (int): The number of the next equation id, ids are never reused.
+        memoization_cache (LRUCache): Cache of the results of the equations evaluated.
         active_evaluations (set): Tracks variables currently being evaluated to detect circular dependencies.
     """
 
-    def __init__(self):
+    # Marks a result missing from the cache, since None is a possible result
+    __MISSING = object()
+
+    def __init__(self, cache_capacity=256):
+        """
+        Initializes an empty equation parse tree.
+
+        Parameters:
+            cache_capacity (int, optional): The largest number of results memoized. Defaults to 256.
+        """
         super().__init__()
         self.__equations = Hashtable()
-        self.__memoization_cache = Hashtable()
+        self.__addresses = Hashtable()
+        self.__reference_counts = {}
+        self.__next_id = 1
+        self.__memoization_cache = LRUCache(cache_capacity)
         self.__active_evaluations = set()
-        self.__supported_operators = ['+', '-', '*', '/']
+        self.__supported_operators = ['+', '-', '*', '/', '**']
+        self.__inverse_operators = {'+': '-', '-': '+', '*': '/', '/': '*'}
 
     # Getter method for __equations
     def get_equations(self):
         return self.__equations
 
-    # Setter method for __equations
+    # Setter method for __equations, the equations are indexed again with one reference each
     def set_equations(self, equations):
         self.__equations = equations
+        self.__addresses = Hashtable()
+        self.__reference_counts = {}
+        for id, tree in equations.getitem_inorder():
+            self.__addresses[self.structure_hash(tree)] = id
+            self.__reference_counts[id] = 1
+            number = id.rsplit(' ', 1)[-1]
+            if number.isnumeric():
+                self.__next_id = max(self.__next_id, int(number) + 1)
+
+    # Getter method for the number of references to an equation
+    def get_reference_count(self, id):
+        return self.__reference_counts.get(id, 0)
 
     # Getter method for __memoization_cache
     def get_memoization_cache(self):
@@ -69,8 +103,8 @@ class EquationParseTree(ParseTree):
         Constructs a Equation parse tree for the given expression tokens.
         An equation parse tree is a tree representation of a DoubleStatement e.g. (x+2)=(y+3)
 
-        This method constructs a binary tree based on the tokens of a mathematical expression. It follows
-        specific rules to place tokens in the tree, handling operators, numbers, variables, and parentheses.
+        The tokens are split on the '=' token, and each side is parsed as an expression by the
+        ParseTree rules, so both sides can be nested to any depth. The root of the tree is '='.
 
         Parameters:
             eqn_tokens (list of str): Tokens of the mathematical statement to be parsed.
@@ -79,77 +113,60 @@ class EquationParseTree(ParseTree):
             BinaryTree: The root node of the constructed parse tree.
 
         Raises:
-            ValueError: If an unexpected token is encountered.
+            ValueError: If the equation does not have exactly one '=', or an unexpected token is encountered.
         """
-        stack = Stack()
-        tree = BinaryTree('?')
-        stack.push(tree)
-        current_tree = tree
-            
-        for index, t in enumerate(eqn_tokens):
-            # RULE 1: If token is '(' and the previous token is '='
-            # insert a node to the left and descend into that node
-            if t == '(' and eqn_tokens[index-1] == '=':
-                current_tree.insert_left('?')
-                stack.push(current_tree)
-                current_tree = current_tree.get_left_tree()
-
-            # RULE 2: If token is '(' add a new node as left child
-            # and descend into that node
-            elif t == '(':
-                current_tree.insert_left('?')
-                stack.push(current_tree)
-                current_tree = current_tree.get_left_tree()
-                current_tree.insert_left('?')
-                stack.push(current_tree)
-                current_tree = current_tree.get_left_tree()
-
-            # RULE 3: If token is operator set key of current node
-            # to that operator and add a new node as right child
-            # and descend into that node
-            elif t in ['+', '-', '*', '/', '**']:
-                current_tree.set_key(t)
-                current_tree.insert_right('?')
-                stack.push(current_tree)
-                current_tree = current_tree.get_right_tree()
-
-            # RULE 4: If token is number, set key of the current node
-            # to that number and return to parent
-            elif t.isnumeric():
-                current_tree.set_key(int(t))
-                parent = stack.pop()
-                current_tree = parent
-
-            # RULE 4: If token is a letter, set key of the current node
-            # to that letter and return to parent
-            elif t.isalpha():
-                current_tree.set_key(t)
-                parent = stack.pop()
-                current_tree = parent
-
-            # RULE 5: If token is a float, set key of the current node
-            # to that float and return to parent
-            elif t.replace(".", "").isnumeric():
-                current_tree.set_key(float(t))
-                parent = stack.pop()
-                current_tree = parent
-
-            # RULE 6: If token is ')' go to parent of current node
-            elif t == ')':
-                current_tree = stack.pop()
-
-            # RULE 7: If token is '=', set key to '=', insert a node on the right
-            # and descend into that node
-            elif t == '=':
-                current_tree.set_key(t)
-                current_tree.insert_right('?')
-                stack.push(current_tree)
-                current_tree = current_tree.get_right_tree()
-            else:
-                raise ValueError
+        if eqn_tokens.count('=') != 1:
+            raise ValueError("An equation must have exactly one '='.")
+        index = eqn_tokens.index('=')
+
+        tree = BinaryTree('=')
+        tree.set_left_tree(super().build_parse_tree(eqn_tokens[:index]))
+        tree.set_right_tree(super().build_parse_tree(eqn_tokens[index + 1:]))
         return tree
-    
-    def evaluate_equation(self, tree: BinaryTree, past_statements):
+
+    def structure_hash(self, tree: BinaryTree):
+        """
+        Computes a hash of the structure of an equation tree, without recursion.
+
+        The nodes are encoded in preorder, with a marker for every missing subtree, so the encoding
+        does not depend on how the equation was typed and two different trees never share it.
+        Numbers are tagged with their type, since 1 and 1.0 do not always give the same result.
+
+        Parameters:
+            tree (BinaryTree): The root of the equation parse tree.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest of the structure.
+        """
+        encoded = []
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                encoded.append('.')
+                continue
+            key = node.get_key()
+            encoded.append(f"{type(key).__name__}:{key}")
+            stack.append(node.get_right_tree())
+            stack.append(node.get_left_tree())
+        return hashlib.sha256(' '.join(encoded).encode()).hexdigest()
+
+    def equation_key(self, tree: BinaryTree, parse_tree: ParseTree):
+        """
+        Builds the key of an equation in the memoization cache.
+
+        Parameters:
+            tree (BinaryTree): The root of the equation parse tree.
+            parse_tree (ParseTree): The workspace holding the assignment statements.
+
+        Returns:
+            tuple: The structural hash of the equation, and the variables it refers to paired with
+                   their version stamps in the workspace.
+        """
+        versions = tuple((var, parse_tree.get_version(var)) for var in sorted(self.collect_variables(tree)))
+        return self.structure_hash(tree), versions
+
+    def evaluate_equation(self, tree: BinaryTree, parse_tree: ParseTree, snapshot=None):
         """
         Evaluates the expression represented by the parse tree for a given variable.
 
@@ -160,7 +177,9 @@ class EquationParseTree(ParseTree):
 
         Parameters:
             tree (BinaryTree): The root of the expression parse tree.
-            past_statements (dict): Dictionary containing variable assignments and their evaluated values from ParseTree.
+            parse_tree (ParseTree): The workspace holding the assignment statements the equation refers to.
+            snapshot (dict, optional): Values of the workspace from ParseTree.snapshot, read instead of
+                                       evaluating the variables. Defaults to None.
 
         Returns:
             float or int: The evaluated result of the expression.
@@ -168,17 +187,37 @@ class EquationParseTree(ParseTree):
         Raises:
             ValueError: If a circular dependency is detected.
         """
-        
+        key = self.equation_key(tree, parse_tree)
+        result = self.__memoization_cache.get(key, self.__MISSING)
+        if result is not self.__MISSING:
+            return result
+
+        tracer = self.get_tracer()
+        # The equation is recorded like a statement, labelled by its structural hash after an '=',
+        # which no variable name holds, so each equation gets its own record and collapsed stack file
+        label = '=' + key[0][:12]
+        if tracer is not None:
+            # The variables it refers to are nested in it
+            tracer.enter(label)
+
         # Evaluate the expression tree
-        result = self.__evaluate_equation(tree, past_statements)
+        try:
+            result = self.__evaluate_equation(tree, parse_tree, snapshot)
+        except Exception as error:
+            if tracer is not None:
+                tracer.unwind(error)
+            raise
+        if tracer is not None:
+            tracer.exit(label)
 
         # Round off floating-point calculations
         if isinstance(result, float):
             result = round(result, 2)
 
+        self.__memoization_cache[key] = result
         return result
         
-    def __evaluate_equation(self, tree: BinaryTree, past_statements):
+    def __evaluate_equation(self, tree: BinaryTree, parse_tree: ParseTree, snapshot):
         """
         Recursively evaluates the given equation tree.
 
@@ -188,7 +227,8 @@ class EquationParseTree(ParseTree):
 
         Parameters:
             tree (BinaryTree): The root of the expression tree to evaluate.
-            past_statements (dict): Dictionary containing variable assignments and their evaluated values.
+            parse_tree (ParseTree): The workspace holding the assignment statements.
+            snapshot (dict): Values of the workspace read instead of evaluating the variables, or None.
 
         Returns:
             bool or None: True if the equation is equal, False if not equal, or None if a variable is undefined.
@@ -199,11 +239,13 @@ class EquationParseTree(ParseTree):
         """
         # Check if the tree is not empty
         if tree:
+            if self.get_tracer() is not None:
+                self.get_tracer().node()
             # Check if both left and right subtrees exist
             if tree.get_left_tree() and tree.get_right_tree():
                 op = tree.get_key()  # Get the operator
-                left = self.__evaluate_equation(tree.get_left_tree(), past_statements)  # Evaluate left subtree
-                right = self.__evaluate_equation(tree.get_right_tree(), past_statements)  # Evaluate right subtree
+                left = self.__evaluate_equation(tree.get_left_tree(), parse_tree, snapshot)  # Evaluate left subtree
+                right = self.__evaluate_equation(tree.get_right_tree(), parse_tree, snapshot)  # Evaluate right subtree
                 
                 # Return 'None' if either operand is 'None'
                 if left == 'None' or right == 'None':
@@ -218,6 +260,8 @@ class EquationParseTree(ParseTree):
                         raise ZeroDivisionError('Division by zero error')
                     return left / right
                 elif op == '**': return left ** right
+                # The logarithm of the left operand in the base of the right one, built by rearrange_tree
+                elif op == 'log': return math.log(left, right)
                 elif op == '=': return left == right  # Evaluate equality of two expressions
             else:
                 # Handle leaf nodes (operands or variables)
@@ -228,25 +272,36 @@ class EquationParseTree(ParseTree):
                 # Return the operand if it's a number
                 if isinstance(key, int) or isinstance(key, float):
                     return key
+                # Read the variable from the snapshot, where the statements that failed hold their error
+                elif snapshot is not None:
+                    if key not in snapshot:
+                        return 'None'
+                    if self.get_tracer() is not None:
+                        self.get_tracer().dereference(key, True)
+                    if isinstance(snapshot[key], Exception):
+                        # A new exception is raised, since raising the stored one again would grow its traceback
+                        raise type(snapshot[key])(*snapshot[key].args)
+                    return snapshot[key]
                 # Evaluate variable reference
-                elif key in past_statements:
-                    # Try to evaluate variables from ParseTree class
-                    # evaluate and statements inherited from ParseTree
-                    return self.evaluate(key, past_statements[key])
+                elif key in parse_tree.get_statements():
+                    if self.get_tracer() is not None:
+                        self.get_tracer().dereference(key, False)
+                    # Read the value kept or cached by the workspace, so only the statements
+                    # that changed since they were last read are evaluated
+                    return parse_tree.get_value(key)
                 # Return 'None' for undefined variables
                 else:
                     return 'None'
 
     def add_statement(self, eqn_tokens):
         """
-        Adds a new variable assignment statement to the parse tree.
+        Adds an equation to the store, or counts one more reference to it if it is already stored.
 
-        This method constructs a parse tree for the given expression tokens and associates it
-        with a variable name. It checks for circular dependencies before adding the statement.
+        This method constructs a parse tree for the given equation tokens and looks up its structural hash.
+        An equation already stored keeps its tree and id, so its cached results are reused.
 
         Parameters:
-            var (str): The variable name for the assignment.
-            eqn_tokens (list of str): Tokens of the mathematical expression to be assigned to the variable.
+            eqn_tokens (list of str): Tokens of the equation.
 
         Returns:
             str: The unique identifier of the equation.
@@ -254,125 +309,205 @@ class EquationParseTree(ParseTree):
         Raises:
             None (No circular dependency possible)
         """
-        # Give the equation a unique id
-        id = f"Equation {len(self.__equations)+1}"
         # Build the parse tree from the expression tokens
         tree = self.build_parse_tree(eqn_tokens)
-        
-        # Remove cached result if the expression has changed
-        if id in self.__memoization_cache:
-            del self.__memoization_cache[id]
-        
-        # Associate the parse tree with the variable
+
+        # Reuse the equation if it is already stored
+        address = self.structure_hash(tree)
+        if address in self.__addresses:
+            id = self.__addresses[address]
+            self.__reference_counts[id] += 1
+            return id
+
+        # Give the equation a unique id, never given before even if equations were removed
+        id = f"Equation {self.__next_id}"
+        self.__next_id += 1
+
+        # Associate the parse tree with the id
         self.__equations[id] = tree
+        self.__addresses[address] = id
+        self.__reference_counts[id] = 1
         return id
+
+    def remove_statement(self, id):
+        """
+        Removes one reference to an equation. The equation is deleted once no reference is left.
+
+        Parameters:
+            id (str): The unique identifier of the equation.
+
+        Raises:
+            ValueError: If no equation has the id.
+        """
+        if id not in self.__reference_counts:
+            raise ValueError(f"No equation found with the id: {id}")
+
+        self.__reference_counts[id] -= 1
+        if self.__reference_counts[id] == 0:
+            tree = self.__equations[id]
+            del self.__addresses[self.structure_hash(tree)]
+            del self.__equations[id]
+            del self.__reference_counts[id]
         
     def rearrange_tree(self, target_variable, equation_tree:BinaryTree):
         """
-        Rearranges an equation to make a specified variable the subject.
+        Rearranges an equation to make a specified variable the subject, without changing the equation tree.
+
+        The path from '=' down to the target variable is found, then every operator along it is inverted
+        and applied to the other side of the equation, from the top of the path down:
+        - x+b=R gives x=R-b, and a+x=R gives x=R-a
+        - x-b=R gives x=R+b, and a-x=R gives x=a-R
+        - x*b=R gives x=R/b, and a*x=R gives x=R/a
+        - x/b=R gives x=R*b, and a/x=R gives x=a/R
+        - x**b=R gives x=R**(1/b), the principal root, and a**x=R gives x=(R log a), the logarithm of R in base a
+        The path is walked without recursion, so equations nested to any depth can be rearranged.
+        Powers whose inverse is not a single value are not rearranged: x**b=R when b is 0 or an even
+        integer, which has two real solutions, and a**x=R when a is a number that is not positive or is 1.
 
         Parameters:
             target_variable (str): The variable to make the subject.
             equation_tree (BinaryTree): The equation represented as a binary tree.
 
         Returns:
-            BinaryTree: The rearranged equation represented as a binary tree.
+            BinaryTree: The rearranged equation represented as a new binary tree.
+
+        Raises:
+            ValueError: If the variable does not appear exactly once, is under a power that cannot be inverted,
+                        or an operator cannot be inverted.
         """
-        rearranged_tree = BinaryTree('=') # Initialize binary tree
-
-        # Case for (x+2)=(y+3)
-        if target_variable == equation_tree._BinaryTree__left_tree._BinaryTree__left_tree.get_key():
-            # Invert the operator of the left subtree to isolate the target variable
-            self.__invert_operator(equation_tree._BinaryTree__left_tree)
-            # Insert the target variable as the left child of the rearranged tree
-            rearranged_tree.insert_left(target_variable)
-            # Remove the target variable from the left subtree of the original tree
-            equation_tree._BinaryTree__left_tree._BinaryTree__left_tree.set_key(None)
-            # Save the left subtree of the original tree as the right subtree of the rearranged tree
-            tree_no_subject = equation_tree._BinaryTree__left_tree
-            rearranged_tree._BinaryTree__right_tree = tree_no_subject
-            # Set the right subtree of the rearranged tree to be the right subtree of the original tree
-            rearranged_tree._BinaryTree__right_tree._BinaryTree__left_tree = equation_tree._BinaryTree__right_tree
-
-        # Case for (2+x)=(y+3)
-        elif target_variable == equation_tree._BinaryTree__left_tree._BinaryTree__right_tree.get_key():
-            # Invert the operator of the left subtree to isolate the target variable
-            self.__invert_operator(equation_tree._BinaryTree__left_tree)
-            # Insert the target variable as the left child of the rearranged tree
-            rearranged_tree.insert_left(target_variable)
-            # Remove the target variable from the right subtree of the original tree
-            equation_tree._BinaryTree__left_tree._BinaryTree__right_tree.set_key(None)
-            # Save the left subtree of the original tree as the right subtree of the rearranged tree
-            tree_no_subject = equation_tree._BinaryTree__left_tree
-            rearranged_tree._BinaryTree__right_tree = tree_no_subject
-            # Set the right subtree of the rearranged tree to be the right subtree of the original tree
-            rearranged_tree._BinaryTree__right_tree._BinaryTree__right_tree = equation_tree._BinaryTree__right_tree
-            # Invert right binary tree to keep the original right tree on the left
-            self.__shallow_invert_binary_tree(rearranged_tree._BinaryTree__right_tree)
-
-        # Case for (y+3)=(x+2)
-        elif target_variable == equation_tree._BinaryTree__right_tree._BinaryTree__left_tree.get_key():
-            # Invert the operator of the right subtree to isolate the target variable
-            self.__invert_operator(equation_tree._BinaryTree__right_tree)
-            # Insert the target variable as the left child of the rearranged tree
-            rearranged_tree.insert_left(target_variable)
-            # Remove the target variable from the left subtree of the original tree
-            equation_tree._BinaryTree__right_tree._BinaryTree__left_tree.set_key(None)
-            # Save the right subtree of the original tree as the right subtree of the rearranged tree
-            tree_no_subject = equation_tree._BinaryTree__right_tree
-            rearranged_tree._BinaryTree__right_tree = tree_no_subject
-            # Set the left subtree of the rearranged tree to be the left subtree of the original tree
-            rearranged_tree._BinaryTree__right_tree._BinaryTree__left_tree = equation_tree._BinaryTree__left_tree
-
-        # Case for (y+3)=(2+x)
-        elif target_variable == equation_tree._BinaryTree__right_tree._BinaryTree__right_tree.get_key():
-            # Invert the operator of the right subtree to isolate the target variable
-            self.__invert_operator(equation_tree._BinaryTree__right_tree)
-            # Insert the target variable as the left child of the rearranged tree
-            rearranged_tree.insert_left(target_variable)
-            # Remove the target variable from the right subtree of the original tree
-            equation_tree._BinaryTree__right_tree._BinaryTree__right_tree.set_key(None)
-            # Save the right subtree of the original tree as the right subtree of the rearranged tree
-            tree_no_subject = equation_tree._BinaryTree__right_tree
-            rearranged_tree._BinaryTree__right_tree = tree_no_subject
-            # Set the right subtree of the rearranged tree to be the left subtree of the original tree
-            rearranged_tree._BinaryTree__right_tree._BinaryTree__right_tree = equation_tree._BinaryTree__left_tree
-            # Invert right binary tree to keep the original right tree on the left
-            self.__shallow_invert_binary_tree(rearranged_tree._BinaryTree__right_tree)
+        if equation_tree.get_key() != '=' or not (equation_tree.get_left_tree() and equation_tree.get_right_tree()):
+            raise ValueError('Equation format not supported.')
+
+        # Find the target variable, remembering the parent of every node and the side it hangs from
+        parents = {}
+        target = None
+        stack = [equation_tree]
+        while stack:
+            node = stack.pop()
+            left_tree, right_tree = node.get_left_tree(), node.get_right_tree()
+            if left_tree and right_tree:
+                parents[left_tree] = (node, 'left')
+                parents[right_tree] = (node, 'right')
+                stack.append(left_tree)
+                stack.append(right_tree)
+            elif node.get_key() == target_variable:
+                if target is not None:
+                    raise ValueError(f'Variable {target_variable} appears more than once, so it cannot be made the subject.')
+                target = node
+        if target is None:
+            raise ValueError(f'Variable {target_variable} not found in the equation.')
+
+        # Path from '=' down to the target, as the nodes and the side taken at each of them
+        path = []
+        node = target
+        while node is not equation_tree:
+            parent, side = parents[node]
+            path.append((parent, side))
+            node = parent
+        path.reverse()
+
+        # The side holding the target is unwound, the other side accumulates the inverted operators
+        root, side = path[0]
+        other = (root.get_right_tree() if side == 'left' else root.get_left_tree()).copy()
+        for node, side in path[1:]:
+            op = node.get_key()
+            if side == 'left':
+                sibling = node.get_right_tree().copy()
+                if op == '**':
+                    self.__check_root(target_variable, sibling)
+                    exponent = self.__combine('/', BinaryTree(1), sibling)
+                    other = self.__combine('**', other, exponent)
+                elif op in self.__inverse_operators:
+                    other = self.__combine(self.__inverse_operators[op], other, sibling)
+                else:
+                    raise ValueError(f'Only {self.__supported_operators} are supported')
+            else:
+                sibling = node.get_left_tree().copy()
+                if op in ('+', '*'):
+                    other = self.__combine(self.__inverse_operators[op], other, sibling)
+                elif op in ('-', '/'):
+                    other = self.__combine(op, sibling, other)
+                elif op == '**':
+                    self.__check_logarithm(target_variable, sibling)
+                    other = self.__combine('log', other, sibling)
+                else:
+                    raise ValueError(f'Only {self.__supported_operators} are supported')
 
+        rearranged_tree = BinaryTree('=')
+        rearranged_tree.insert_left(target_variable)
+        rearranged_tree.set_right_tree(other)
         return rearranged_tree
-    
-    def __invert_operator(self, node: BinaryTree):
-            """
-            Inverts the operator of a given node.
-
-            Parameters:
-                node (BinaryTree): The node containing the operator to be inverted.
-            """
-            match node.get_key():
-                case '+':
-                    node.set_key('-')
-                case '-':
-                    node.set_key('+')
-                case '*':
-                    node.set_key('/')
-                case '/':
-                    node.set_key('*')
-                case _:
-                    raise ValueError(f'Only {self.__supported_operators} are supported')
-    
-    def __shallow_invert_binary_tree(self, node:BinaryTree):
+
+    def __check_root(self, target_variable, exponent: BinaryTree):
+        """
+        Checks that x**b=R has a single solution x=R**(1/b) when the exponent b is a number.
+
+        Parameters:
+            target_variable (str): The variable to make the subject.
+            exponent (BinaryTree): The exponent b.
+
+        Raises:
+            ValueError: If the exponent is 0, or an even integer which gives two real solutions.
         """
-        Inverts the binary tree only at the given node.
+        key = self.__constant(exponent)
+        if key is None:
+            return
+        if key == 0:
+            raise ValueError(f'Variable {target_variable} is raised to the power 0, so it cannot be made the subject.')
+        if float(key).is_integer() and key % 2 == 0:
+            raise ValueError(f'Variable {target_variable} is raised to an even power, which has two solutions, '
+                             'so it cannot be made the subject.')
+
+    def __check_logarithm(self, target_variable, base: BinaryTree):
+        """
+        Checks that a**x=R has a single solution x=(R log a) when the base a is a number.
 
         Parameters:
-            node (BinaryTree): The node containing the binary tree to be inverted.
+            target_variable (str): The variable to make the subject.
+            base (BinaryTree): The base a.
+
+        Raises:
+            ValueError: If the base is not positive or is 1.
         """
-        if (node == None): 
+        key = self.__constant(base)
+        if key is None:
             return
-        else:
-            temp = node  
-            # swap the pointers in this node
-            temp = node._BinaryTree__left_tree
-            node._BinaryTree__left_tree = node._BinaryTree__right_tree  
-            node._BinaryTree__right_tree = temp
\ No newline at end of file
+        if key <= 0 or key == 1:
+            raise ValueError(f'Variable {target_variable} is in the exponent of {key}, which must be positive and not 1, '
+                             'so it cannot be made the subject.')
+
+    def __constant(self, tree: BinaryTree):
+        """
+        Evaluates a subtree that does not refer to any variable.
+
+        Parameters:
+            tree (BinaryTree): The root of the subtree.
+
+        Returns:
+            int or float: The value of the subtree, or None if it refers to a variable or its value is not real.
+
+        Raises:
+            ZeroDivisionError: If the subtree includes division by zero.
+        """
+        if self.collect_variables(tree):
+            return None
+        # Without variables, the workspace is never read
+        value = self.__evaluate_equation(tree, self, None)
+        return value if type(value) in (int, float) else None
+
+    def __combine(self, op, left: BinaryTree, right: BinaryTree):
+        """
+        Builds an operator node over two subtrees.
+
+        Parameters:
+            op (str): The operator.
+            left (BinaryTree): The left subtree.
+            right (BinaryTree): The right subtree.
+
+        Returns:
+            BinaryTree: The operator node.
+        """
+        node = BinaryTree(op)
+        node.set_left_tree(left)
+        node.set_right_tree(right)
+        return node
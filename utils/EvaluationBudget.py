@@ -0,0 +1,218 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Limits on the cost of evaluating expressions.
+# An EvaluationBudget bounds the bit length of the integers computed, the number
+# of nodes visited and the wall-clock time of an evaluation, and lets another
+# thread cancel an evaluation in progress.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : EvaluationBudget.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import threading
+import time
+
+class EvaluationBudgetExceeded(RuntimeError):
+    """
+    Raised when an expression needs a larger integer or more nodes than its budget allows.
+    """
+
+class EvaluationCancelled(RuntimeError):
+    """
+    Raised when an evaluation is cancelled or runs past its deadline.
+    """
+
+class EvaluationBudget:
+    """
+    Limits on the cost of evaluating expressions.
+
+    A limit set to None is not checked. The node count and the deadline start again every time
+    start is called, which the ParseTree does once per statement it evaluates, so the limits apply to
+    each statement and not to the whole workspace. A cancellation lasts until start is called with
+    reset_cancel set to True, which Options does at the start of every operation.
+    The deadline and the cancellation are checked every CHECK_INTERVAL nodes.
+
+    Attributes:
+        max_bit_length (int): The largest bit length of an integer operand or result.
+        max_nodes (int): The largest number of nodes visited per statement.
+        timeout (float): The largest number of seconds a statement can take.
+    """
+
+    # Number of nodes visited between two checks of the deadline and the cancellation
+    CHECK_INTERVAL = 256
+
+    def __init__(self, max_bit_length=None, max_nodes=None, timeout=None):
+        """
+        Initializes the budget.
+
+        Parameters:
+            max_bit_length (int, optional): The largest bit length of an integer. Defaults to None.
+            max_nodes (int, optional): The largest number of nodes visited per statement. Defaults to None.
+            timeout (float, optional): The largest number of seconds a statement can take. Defaults to None.
+        """
+        self.__max_bit_length = max_bit_length
+        self.__max_nodes = max_nodes
+        self.__timeout = timeout
+        self.__cancel_event = threading.Event()
+        self.__nodes = 0
+        self.__deadline = None
+
+    # Getter methods
+    def get_max_bit_length(self):
+        return self.__max_bit_length
+
+    def get_max_nodes(self):
+        return self.__max_nodes
+
+    def get_timeout(self):
+        return self.__timeout
+
+    def get_nodes(self):
+        return self.__nodes
+
+    # Setter methods
+    def set_max_bit_length(self, max_bit_length):
+        self.__max_bit_length = max_bit_length
+
+    def set_max_nodes(self, max_nodes):
+        self.__max_nodes = max_nodes
+
+    def set_timeout(self, timeout):
+        self.__timeout = timeout
+
+    def cancel(self):
+        """
+        Cancels the evaluation in progress. It is safe to call from another thread.
+        Evaluations keep being cancelled until start is called with reset_cancel set to True.
+        """
+        self.__cancel_event.set()
+
+    def is_cancelled(self):
+        """
+        Checks if the evaluations are cancelled.
+
+        Returns:
+            bool: True if cancel was called, False otherwise.
+        """
+        return self.__cancel_event.is_set()
+
+    def start(self, reset_cancel=False):
+        """
+        Starts the node count and the deadline of the evaluation of a new statement.
+
+        Parameters:
+            reset_cancel (bool, optional): Whether to clear a previous cancellation. Defaults to False.
+        """
+        if reset_cancel:
+            self.__cancel_event.clear()
+        self.__nodes = 0
+        self.__deadline = None if self.__timeout is None else time.monotonic() + self.__timeout
+
+    def visit(self):
+        """
+        Counts a visited node, and checks the node limit, the deadline and the cancellation.
+
+        Raises:
+            EvaluationBudgetExceeded: If too many nodes were visited.
+            EvaluationCancelled: If the evaluation was cancelled or ran past its deadline.
+        """
+        self.__nodes += 1
+        if self.__max_nodes is not None and self.__nodes > self.__max_nodes:
+            raise EvaluationBudgetExceeded(f'Evaluation exceeded the limit of {self.__max_nodes} nodes.')
+        if self.__nodes % self.CHECK_INTERVAL == 0:
+            self.check_time()
+
+    def check_time(self):
+        """
+        Checks the deadline and the cancellation.
+
+        Raises:
+            EvaluationCancelled: If the evaluation was cancelled or ran past its deadline.
+        """
+        if self.__cancel_event.is_set():
+            raise EvaluationCancelled('Evaluation cancelled.')
+        if self.__deadline is not None and time.monotonic() > self.__deadline:
+            raise EvaluationCancelled(f'Evaluation cancelled after exceeding the time limit of {self.__timeout} seconds.')
+
+    def check_operation(self, op, left, right):
+        """
+        Checks that an operation does not produce an integer larger than the budget, before computing it.
+        The size of integer powers and products is estimated from their operands, since they can take long to compute.
+
+        Parameters:
+            op (str): The operator.
+            left: The evaluated left operand.
+            right: The evaluated right operand.
+
+        Raises:
+            EvaluationBudgetExceeded: If the result would exceed the bit length limit.
+        """
+        if self.__max_bit_length is None:
+            return
+        if op == '**' and type(left) is int and type(right) is int and right > 0 and abs(left) > 1:
+            # The result of left ** right has at least (bit_length - 1) * right + 1 bits
+            if (left.bit_length() - 1) * right + 1 > self.__max_bit_length:
+                raise EvaluationBudgetExceeded(f'Integer power exceeds the limit of {self.__max_bit_length} bits.')
+        elif op == '*' and type(left) is int and type(right) is int:
+            if left.bit_length() + right.bit_length() - 1 > self.__max_bit_length:
+                raise EvaluationBudgetExceeded(f'Integer product exceeds the limit of {self.__max_bit_length} bits.')
+
+    def check_value(self, value):
+        """
+        Checks that an integer is not larger than the budget.
+
+        Parameters:
+            value: The value to check.
+
+        Raises:
+            EvaluationBudgetExceeded: If the value exceeds the bit length limit.
+        """
+        if self.__max_bit_length is not None and type(value) is int and value.bit_length() > self.__max_bit_length:
+            raise EvaluationBudgetExceeded(f'Integer exceeds the limit of {self.__max_bit_length} bits.')
+
+    def admit(self, tree):
+        """
+        Checks at insertion that the constants of a simplified expression tree fit in the budget.
+        Constant operations that the optimizer did not fold, such as huge powers, are checked as well.
+
+        Parameters:
+            tree (BinaryTree): The root of the simplified expression tree.
+
+        Raises:
+            EvaluationBudgetExceeded: If a constant or a constant operation exceeds the bit length limit.
+        """
+        if self.__max_bit_length is None:
+            return
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            left_tree, right_tree = node.get_left_tree(), node.get_right_tree()
+            if left_tree and right_tree:
+                # Operations between two constants are checked before their operands
+                if self.__is_leaf(left_tree) and self.__is_leaf(right_tree):
+                    self.check_operation(node.get_key(), left_tree.get_key(), right_tree.get_key())
+                stack.append(left_tree)
+                stack.append(right_tree)
+            else:
+                self.check_value(node.get_key())
+
+    def __is_leaf(self, tree):
+        """
+        Checks if a node is evaluated as a leaf, i.e. it does not have both subtrees.
+
+        Parameters:
+            tree (BinaryTree): The node.
+
+        Returns:
+            bool: True if the node is a leaf, False otherwise.
+        """
+        return not (tree.get_left_tree() and tree.get_right_tree())
@@ -0,0 +1,177 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# An opt-in tracer for the evaluation of statements and equations.
+# It records, for every statement evaluated, the wall time, the nodes visited,
+# the variable dereferences, the cache hits and misses and the deepest chain of
+# nested variables, and exports the time spent in each chain of variables as
+# collapsed stacks that flame graph tools can read.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : EvaluationTracer.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import os
+import time
+
+class EvaluationTracer:
+    """
+    Records where the time of evaluations goes.
+
+    The evaluator calls enter and exit around every variable it evaluates, so the tracer keeps
+    a stack of the variables being evaluated. The outermost variable of the stack is the statement
+    being evaluated, and a record is added for it once it exits. Time is charged to the chain of
+    variables on the stack (its own time, without the nested variables), which gives one collapsed
+    stack per chain, e.g. "Mango;Durian;Pear 1200", with the time in nanoseconds.
+
+    Attributes:
+        records (list): One dictionary per statement evaluated, with the keys var, time (seconds),
+                        nodes, derefs, hits, misses, max_depth and error.
+        stacks (dict): The statements mapped to the nanoseconds spent in each chain of variables.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty tracer.
+        """
+        self.__records = []
+        self.__stacks = {}
+        self.__frames = []  # Variables being evaluated, outermost first
+        self.__current = None  # Record of the statement being evaluated
+        self.__mark = 0  # Time at which the innermost frame started being charged
+
+    def get_records(self):
+        """Returns the records of the statements evaluated."""
+        return self.__records
+
+    def get_stacks(self):
+        """Returns the statements mapped to the time spent in each chain of variables."""
+        return self.__stacks
+
+    def clear(self):
+        """
+        Discards the records and the stacks.
+        """
+        self.__records = []
+        self.__stacks = {}
+        self.__frames = []
+        self.__current = None
+
+    def enter(self, var):
+        """
+        Starts the evaluation of a variable. The first variable entered starts a new record.
+
+        Parameters:
+            var (str): The variable being evaluated.
+        """
+        now = time.perf_counter_ns()
+        if self.__frames:
+            self.__charge(now)
+        else:
+            self.__current = {'var': var, 'time': 0.0, 'nodes': 0, 'derefs': 0,
+                              'hits': 0, 'misses': 0, 'max_depth': 0, 'error': None, 'start': now}
+        self.__frames.append(var)
+        self.__current['max_depth'] = max(self.__current['max_depth'], len(self.__frames))
+        self.__mark = now
+
+    def exit(self, var):
+        """
+        Ends the evaluation of a variable. The record is added once the outermost variable exits.
+
+        Parameters:
+            var (str): The variable that was evaluated.
+        """
+        now = time.perf_counter_ns()
+        self.__charge(now)
+        self.__frames.pop()
+        self.__mark = now
+        if not self.__frames:
+            self.__finish(now)
+
+    def unwind(self, error=None):
+        """
+        Closes the variables left open when an evaluation stops with an error.
+
+        Parameters:
+            error (Exception, optional): The error that stopped the evaluation. Defaults to None.
+        """
+        if not self.__frames:
+            return
+        now = time.perf_counter_ns()
+        self.__charge(now)
+        self.__frames = []
+        self.__current['error'] = error
+        self.__finish(now)
+
+    def node(self):
+        """
+        Counts a node visited by the statement being evaluated.
+        """
+        self.__current['nodes'] += 1
+
+    def dereference(self, var, cached):
+        """
+        Counts a reference to a variable.
+
+        Parameters:
+            var (str): The variable referred to.
+            cached (bool): True if its value was already evaluated, False if it had to be looked up.
+        """
+        self.__current['derefs'] += 1
+        if cached:
+            self.__current['hits'] += 1
+        else:
+            self.__current['misses'] += 1
+
+    def export_collapsed_stacks(self, directory='.'):
+        """
+        Writes one collapsed stack file per statement evaluated, named <var>_stacks.txt.
+        Equations are named '=' followed by the start of their structural hash.
+        Every line holds a chain of variables separated by ';' and the nanoseconds spent in it.
+
+        Parameters:
+            directory (str, optional): The directory to write the files to. Defaults to the current directory.
+
+        Returns:
+            list: The paths of the files written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for var, stacks in self.__stacks.items():
+            path = os.path.join(directory, f"{var}_stacks.txt")
+            with open(path, 'w') as file:
+                for stack, nanoseconds in stacks.items():
+                    file.write(f"{stack} {nanoseconds}\n")
+            paths.append(path)
+        return paths
+
+    def __charge(self, now):
+        """
+        Charges the time since the last mark to the chain of variables currently on the stack.
+
+        Parameters:
+            now (int): The current time in nanoseconds.
+        """
+        stack = ';'.join(self.__frames)
+        stacks = self.__stacks.setdefault(self.__frames[0], {})
+        stacks[stack] = stacks.get(stack, 0) + now - self.__mark
+
+    def __finish(self, now):
+        """
+        Adds the record of the statement that was evaluated.
+
+        Parameters:
+            now (int): The current time in nanoseconds.
+        """
+        record = self.__current
+        record['time'] = (now - record.pop('start')) / 1e9
+        self.__records.append(record)
+        self.__current = None
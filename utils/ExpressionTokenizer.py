@@ -17,12 +17,17 @@
 # To run: python main.py
 # -----------------------------------------------------
 class ExpressionTokenizer:
-    def __init__(self):
+    def __init__(self, allow_alter=None):
         """
         Initializes an ExpressionTokenizer object with an empty list of tokens and a set of valid special characters.
+
+        Parameters:
+        allow_alter (bool, optional): Whether expressions may be altered to the operand, operator, operand format
+                                      without asking. Defaults to None, which prompts the user.
         """
         self.valid_special_chars = {'+', '-', '*', '/', '**', '(', ')'}  # Set of valid special characters
         self.__tokens = []  # List to store tokens extracted from the expression
+        self.__allow_alter = allow_alter  # Answer to the alteration prompt, None to ask the user
 
     def get_tokens(self):
         """
@@ -42,6 +47,24 @@ class ExpressionTokenizer:
         """
         self.__tokens = tokens
 
+    def get_allow_alter(self):
+        """
+        Gets the answer to the alteration prompt.
+
+        Returns:
+        bool or None: The answer, or None if the user is prompted.
+        """
+        return self.__allow_alter
+
+    def set_allow_alter(self, allow_alter):
+        """
+        Sets the answer to the alteration prompt.
+
+        Parameters:
+        allow_alter (bool or None): The answer, or None to prompt the user.
+        """
+        self.__allow_alter = allow_alter
+
     def __is_valid_special_char(self, char):
         """
         Checks if a character is a valid special character.
@@ -125,6 +148,9 @@ class ExpressionTokenizer:
         Returns:
         bool: True if the user agrees to alter the expression, False otherwise.
         """
+        # Answer without prompting when running non-interactively
+        if self.__allow_alter is not None:
+            return self.__allow_alter
         allow_alter = input('\nExpressions must follow operand, operator, operand format.\
                             \nBy proceeding you agree to altering the expression to this format.\
                             \nProceed?(Y/N): ').upper()
@@ -0,0 +1,241 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Sorts assignment statements that do not fit in memory. The statements are
+# read in runs of a fixed size, each run is sorted and written to a temporary
+# file, and the runs are merged with a heap while the sorted statements are
+# written out, so memory is set by the run size and not by the statements.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : ExternalMergeSort.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+
+from utils.BottomUpMergeSort import BottomUpMergeSort
+
+class ExternalMergeSort:
+    """
+    An external merge sort of (statement, value) pairs, giving the same order as BottomUpMergeSort:
+    the values in descending order, equal values in alphabetical order of their statements,
+    then the statements whose value is 'None' in alphabetical order.
+
+    At most run_size pairs are held in memory while the runs are written, and about as many while they
+    are merged, since each of the MAX_FAN_IN runs merged at once is read run_size / MAX_FAN_IN pairs
+    at a time. If all the pairs fit in a single run, nothing is written.
+    """
+
+    # Number of runs merged at once, more runs are merged in several passes so few files are open
+    MAX_FAN_IN = 64
+
+    # Largest number of pairs written and read at once in a run file
+    CHUNK = 1024
+
+    def __init__(self, run_size=100_000, temp_dir=None):
+        """
+        Initializes the sort.
+
+        Parameters:
+        - run_size (int, optional): The number of pairs sorted in memory at once. Defaults to 100000.
+        - temp_dir (str, optional): The folder of the temporary files. Defaults to the system temporary folder.
+
+        Raises:
+        - ValueError: If the run size is not a positive integer.
+        """
+        self.set_run_size(run_size)
+        self.__temp_dir = temp_dir
+
+    def get_run_size(self):
+        """
+        Returns the number of pairs sorted in memory at once.
+        """
+        return self.__run_size
+
+    def set_run_size(self, run_size):
+        """
+        Sets the number of pairs sorted in memory at once.
+
+        Parameters:
+        - run_size (int): The number of pairs, at least 1.
+
+        Raises:
+        - ValueError: If the run size is not a positive integer.
+        """
+        if not isinstance(run_size, int) or run_size < 1:
+            raise ValueError("The run size must be a positive integer.")
+        self.__run_size = run_size
+
+    def get_temp_dir(self):
+        """
+        Returns the folder of the temporary files, None for the system temporary folder.
+        """
+        return self.__temp_dir
+
+    def set_temp_dir(self, temp_dir):
+        """
+        Sets the folder of the temporary files.
+
+        Parameters:
+        - temp_dir (str): The folder, None for the system temporary folder.
+        """
+        self.__temp_dir = temp_dir
+
+    def sort(self, pairs):
+        """
+        Sorts (statement, value) pairs. The statements must be unique, and the values numeric or 'None'.
+
+        Parameters:
+        - pairs (iterable): The (statement, value) pairs, read once.
+
+        Returns:
+        - Generator of the sorted (statement, value) pairs. The temporary files are removed when it is exhausted or closed.
+
+        Raises:
+        - ValueError: If a value is a string other than 'None'.
+        """
+        folder = tempfile.mkdtemp(prefix="sort-", dir=self.__temp_dir)
+        try:
+            runs = []
+            run = []
+            for statement, value in pairs:
+                run.append(self.__record(statement, value))
+                if len(run) == self.__run_size:
+                    runs.append(self.__write_run(folder, BottomUpMergeSort.sort(run)))
+                    run = []
+
+            if not runs:
+                # Everything fits in one run, which is sorted in memory
+                for record in BottomUpMergeSort.sort(run):
+                    yield record[2], record[3]
+                return
+            if run:
+                runs.append(self.__write_run(folder, BottomUpMergeSort.sort(run)))
+            run = None
+
+            # Merge groups of runs into longer runs until they can all be merged at once
+            while len(runs) > self.MAX_FAN_IN:
+                merged_runs = []
+                for start in range(0, len(runs), self.MAX_FAN_IN):
+                    group = runs[start:start + self.MAX_FAN_IN]
+                    merged_runs.append(self.__write_run(folder, heapq.merge(*map(self.__read_run, group))))
+                    for path in group:
+                        os.remove(path)
+                runs = merged_runs
+
+            for record in heapq.merge(*map(self.__read_run, runs)):
+                yield record[2], record[3]
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def sections(self, pairs):
+        """
+        Sorts (statement, value) pairs and formats them as the sections written by Options.sorting_expressions.
+
+        Each section starts with "*** Statements with value=> " and its value, followed by its statements,
+        and the sections are separated by an empty line. The 'None' section is always the last one, even if empty.
+
+        Parameters:
+        - pairs (iterable): The (statement, value) pairs, read once.
+
+        Returns:
+        - Generator of the lines, without line breaks.
+        """
+        first = True
+        current = None
+        for statement, value in self.sort(pairs):
+            if first or value != current:
+                # Equal values such as 1 and 1.0 share the section of the first one, as in a dictionary
+                if not first:
+                    yield ""
+                yield f"*** Statements with value=> {value}"
+                first = False
+                current = value
+            yield statement
+
+        if first or current != 'None':
+            if not first:
+                yield ""
+            yield "*** Statements with value=> None"
+
+    @staticmethod
+    def __record(statement, value):
+        """
+        Builds the record of a pair, compared by its first three items.
+
+        Parameters:
+        - statement (str): The statement.
+        - value (int, float or str): The value of the statement.
+
+        Returns:
+        - tuple: The record (group, negated value, statement, value), with group 1 for 'None' values.
+
+        Raises:
+        - ValueError: If the value is a string other than 'None'.
+        """
+        if value == 'None':
+            return (1, 0, statement, value)
+        if isinstance(value, str):
+            raise ValueError(f"Cannot sort the value {value} of {statement}.")
+        return (0, -value, statement, value)
+
+    def __write_run(self, folder, records):
+        """
+        Writes sorted records to a new file, in chunks of at most CHUNK records.
+
+        Parameters:
+        - folder (str): The folder of the file.
+        - records (iterable): The sorted records.
+
+        Returns:
+        - str: The path of the file.
+        """
+        # The runs merged at once are read a chunk at a time, so their chunks fit in one run together
+        chunk_size = max(1, min(self.CHUNK, self.__run_size // self.MAX_FAN_IN))
+        handle, path = tempfile.mkstemp(suffix=".run", dir=folder)
+        with os.fdopen(handle, "wb") as f:
+            chunk = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) == chunk_size:
+                    pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                    chunk = []
+            if chunk:
+                pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def __read_run(path):
+        """
+        Reads the records of a run file, one chunk at a time.
+
+        Parameters:
+        - path (str): The path of the file.
+
+        Returns:
+        - Generator of the records.
+        """
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                yield from chunk
+
+    def __str__(self) -> str:
+        return "ExternalMergeSort class"
+
+    def __repr__(self) -> str:
+        return "ExternalMergeSort class"
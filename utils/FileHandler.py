@@ -99,6 +99,52 @@ class FileHandler:
             with open(filename, "w") as f:
                 f.write(content)
 
+    def read_lines(self, filename: str):
+        """
+        Reads the lines of a file one at a time, so memory does not grow with the size of the file.
+
+        Parameters:
+        - filename (str): The name of the file to read.
+
+        Returns:
+        - Generator of the lines of the file, without the line breaks. Blank lines are skipped.
+        """
+        if not filename.lower().endswith((".txt")):  # Check if the file type is valid
+            raise ValueError("File type invalid!")
+        if not os.path.isfile(filename):  # Check if the file exists
+            raise FileNotFoundError("File does not exist!")
+
+        def lines():
+            with open(filename) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield line
+
+        return lines()
+
+    def write_lines(self, filename: str, lines):
+        """
+        Writes lines to a file as they are produced, without asking before overwriting an existing file,
+        so it can run unattended and memory does not grow with the number of lines.
+
+        Parameters:
+        - filename (str): The name of the file to write to.
+        - lines (iterable): The lines to write, without line breaks.
+
+        Returns:
+        - The number of lines written.
+        """
+        if not filename.lower().endswith((".txt")):  # Check if the file type is valid
+            raise ValueError("File type invalid!")
+
+        count = 0
+        with open(filename, "w") as f:
+            for line in lines:
+                f.write(line + "\n")
+                count += 1
+        return count
+
     def read_folder(self, folder: str):
         """
         Lists all the files in a folder.
@@ -0,0 +1,362 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Solves the stored equations of an EquationParseTree together as a system of
+# linear equations. Every equation that is linear in the unknowns becomes a row
+# of a coefficient matrix, the unknowns are split into independent blocks that
+# share no equation, and each block is solved with one NumPy call.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : LinearSystemSolver.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import math
+
+import numpy as np
+
+class LinearSystemSolver:
+    """
+    Solves the linear equations stored in an EquationParseTree.
+
+    The unknowns are the variables that have no assignment statement in the workspace. Variables that do
+    have one are replaced by their value, so (x*Apple)=(10) is linear in x. An equation is linear if both
+    sides are sums of unknowns multiplied by constants, where a product needs a constant factor, a division
+    a constant divisor and a power a constant base and exponent.
+
+    The coefficients are kept as (row, column, value) triplets, so memory grows with the number of terms
+    rather than with the size of the matrix. Unknowns linked by an equation are grouped into blocks with a
+    union-find, and only the matrix of each block is built, so a thousand independent equations are a
+    thousand 1x1 systems instead of one 1000x1000 system. A square block is solved by LU factorization with
+    numpy.linalg.solve, without forming its inverse. Any other block, and any square block that is singular
+    or too ill-conditioned to trust, is solved with a singular value decomposition, which gives its rank and
+    its least-squares solution, so a singular block is reported as underdetermined if its equations are
+    consistent and as overdetermined if they contradict each other.
+
+    Each block gets one of the statuses:
+        unique: The equations are consistent and determine every unknown of the block.
+        underdetermined: The equations are consistent, but have fewer independent equations than unknowns.
+                         The unknowns that are still determined are reported with their values.
+        overdetermined: The equations contradict each other, so the least-squares solution is reported.
+
+    Attributes:
+        eqn_parse_tree (EquationParseTree): The equation parse tree holding the equations.
+        parse_tree (ParseTree): The workspace giving the values of the known variables, or None if every
+                                variable is unknown.
+    """
+
+    UNIQUE = 'unique'
+    UNDERDETERMINED = 'underdetermined'
+    OVERDETERMINED = 'overdetermined'
+
+    # Relative size of the residual up to which a solution satisfies its equations
+    TOLERANCE = 1e-9
+
+    # Largest condition number for which the solution of a square matrix is trusted
+    MAX_CONDITION = 1e12
+
+    def __init__(self, eqn_parse_tree, parse_tree=None):
+        """
+        Initializes the solver for the given equations.
+
+        Parameters:
+            eqn_parse_tree (EquationParseTree): The equation parse tree holding the equations.
+            parse_tree (ParseTree, optional): The workspace giving the values of the known variables.
+                                              Defaults to None.
+        """
+        self.__eqn_parse_tree = eqn_parse_tree
+        self.__parse_tree = parse_tree
+
+    # Getter methods
+    def get_eqn_parse_tree(self):
+        return self.__eqn_parse_tree
+
+    def get_parse_tree(self):
+        return self.__parse_tree
+
+    # Setter methods
+    def set_eqn_parse_tree(self, eqn_parse_tree):
+        self.__eqn_parse_tree = eqn_parse_tree
+
+    def set_parse_tree(self, parse_tree):
+        self.__parse_tree = parse_tree
+
+    def affine_form(self, tree):
+        """
+        Writes an expression as a linear combination of the unknowns plus a constant, without recursion.
+
+        Parameters:
+            tree (BinaryTree): The root of the expression tree.
+
+        Returns:
+            tuple: The unknowns mapped to their coefficients, and the constant.
+
+        Raises:
+            ValueError: If the expression is not linear in the unknowns, or refers to a variable without a value.
+            ZeroDivisionError: If the expression includes division by zero.
+        """
+        results = []
+        # Tasks are a tree to visit, or an operator to apply to the last two results
+        tasks = [tree]
+        while tasks:
+            item = tasks.pop()
+            if isinstance(item, str):
+                right = results.pop()
+                left = results.pop()
+                results.append(self.combine(item, left, right))
+                continue
+
+            left_tree, right_tree = item.get_left_tree(), item.get_right_tree()
+            if left_tree and right_tree:
+                tasks.append(item.get_key())
+                tasks.append(right_tree)
+                tasks.append(left_tree)
+                continue
+
+            key = item.get_key()
+            if key == '?':
+                raise ValueError('Equation has a missing operand or operator.')
+            if isinstance(key, int) or isinstance(key, float):
+                results.append(({}, key))
+            elif self.__parse_tree is not None and key in self.__parse_tree.get_optimized_statements():
+                value = self.__parse_tree.get_value(key)
+                if value == 'None':
+                    raise ValueError(f"Variable {key} has no value.")
+                results.append(({}, value))
+            else:
+                results.append(({key: 1}, 0))
+        return results.pop()
+
+    @staticmethod
+    def combine(op, left, right):
+        """
+        Applies an operator to two linear combinations.
+
+        Parameters:
+            op (str): The operator.
+            left (tuple): The coefficients and constant of the left operand.
+            right (tuple): The coefficients and constant of the right operand.
+
+        Returns:
+            tuple: The coefficients and constant of the result.
+
+        Raises:
+            ValueError: If the result is not linear in the unknowns.
+            ZeroDivisionError: If the right operand of a division is zero.
+        """
+        left_terms, left_constant = left
+        right_terms, right_constant = right
+        if op == '+' or op == '-':
+            sign = 1 if op == '+' else -1
+            terms = dict(left_terms)
+            for var, coefficient in right_terms.items():
+                terms[var] = terms.get(var, 0) + sign * coefficient
+            return terms, left_constant + sign * right_constant
+        if op == '*':
+            if left_terms and right_terms:
+                raise ValueError('Equation multiplies unknowns together.')
+            if left_terms:
+                return {var: c * right_constant for var, c in left_terms.items()}, left_constant * right_constant
+            return {var: c * left_constant for var, c in right_terms.items()}, left_constant * right_constant
+        if op == '/':
+            if right_terms:
+                raise ValueError('Equation divides by an unknown.')
+            if right_constant == 0:
+                raise ZeroDivisionError('Division by zero error')
+            return {var: c / right_constant for var, c in left_terms.items()}, left_constant / right_constant
+        if op == '**':
+            if left_terms or right_terms:
+                raise ValueError('Equation raises an unknown to a power, or to the power of an unknown.')
+            return {}, left_constant ** right_constant
+        raise ValueError(f"Unsupported operator: {op}")
+
+    def solve(self):
+        """
+        Solves the linear equations stored in the equation parse tree.
+
+        Returns:
+            dict: The report of the solution, with the keys:
+                solution (dict): The unknowns determined by consistent equations mapped to their values.
+                systems (list): One dict per block of unknowns, holding its 'unknowns', its 'equations' (ids),
+                                its 'rank', its 'status', its 'residual' and the 'values' of its unknowns
+                                (least-squares values for an overdetermined block, and only the determined
+                                unknowns for an underdetermined block).
+                skipped (dict): The ids of the equations that were not used, mapped to the reason.
+        """
+        columns = {}  # Unknowns mapped to their column
+        rows = []  # Ids of the equations used, in the order of the rows
+        triplet_rows, triplet_columns, triplet_values = [], [], []
+        constants = []
+        skipped = {}
+
+        for id, tree in self.__eqn_parse_tree.get_equations().getitem_inorder():
+            try:
+                left_terms, left_constant = self.affine_form(tree.get_left_tree())
+                right_terms, right_constant = self.affine_form(tree.get_right_tree())
+            except (ValueError, ZeroDivisionError, OverflowError) as error:
+                skipped[id] = str(error)
+                continue
+
+            # Move the unknowns to the left side and the constants to the right side
+            terms = dict(left_terms)
+            for var, coefficient in right_terms.items():
+                terms[var] = terms.get(var, 0) - coefficient
+            terms = {var: coefficient for var, coefficient in terms.items() if coefficient != 0}
+            if not terms:
+                skipped[id] = 'Equation has no unknowns.'
+                continue
+            try:
+                # Complex numbers and integers too large for a float cannot be put in the matrix
+                terms = {var: float(coefficient) for var, coefficient in terms.items()}
+                constant = float(right_constant - left_constant)
+            except (TypeError, OverflowError):
+                constant = math.nan
+            if not math.isfinite(constant) or not all(math.isfinite(c) for c in terms.values()):
+                skipped[id] = 'Equation has a coefficient that is not a finite real number.'
+                continue
+
+            row = len(rows)
+            rows.append(id)
+            constants.append(constant)
+            for var, coefficient in terms.items():
+                triplet_rows.append(row)
+                triplet_columns.append(columns.setdefault(var, len(columns)))
+                triplet_values.append(coefficient)
+
+        report = {'solution': {}, 'systems': [], 'skipped': skipped}
+        if not rows:
+            return report
+
+        unknowns = sorted(columns, key=columns.get)
+        triplet_rows = np.array(triplet_rows, dtype=np.int64)
+        triplet_columns = np.array(triplet_columns, dtype=np.int64)
+        triplet_values = np.array(triplet_values, dtype=np.float64)
+        constants = np.array(constants, dtype=np.float64)
+
+        # Every row belongs to the block of its unknowns, and the triplets are grouped by block
+        blocks = self.__blocks(triplet_rows, triplet_columns, len(rows), len(columns))
+        row_blocks = blocks[triplet_columns[np.unique(triplet_rows, return_index=True)[1]]]
+        triplet_order = np.argsort(blocks[triplet_columns], kind='stable')
+        triplet_bounds = np.searchsorted(blocks[triplet_columns][triplet_order], np.arange(blocks.max() + 2))
+        row_order = np.argsort(row_blocks, kind='stable')
+        row_bounds = np.searchsorted(row_blocks[row_order], np.arange(blocks.max() + 2))
+        column_order = np.argsort(blocks, kind='stable')
+        column_bounds = np.searchsorted(blocks[column_order], np.arange(blocks.max() + 2))
+        # Number the rows and columns of every block from 0
+        local_rows = np.empty(len(rows), dtype=np.int64)
+        local_rows[row_order] = np.arange(len(rows)) - row_bounds[row_blocks[row_order]]
+        local_columns = np.empty(len(columns), dtype=np.int64)
+        local_columns[column_order] = np.arange(len(columns)) - column_bounds[blocks[column_order]]
+
+        for block in range(blocks.max() + 1):
+            block_rows = row_order[row_bounds[block]:row_bounds[block + 1]]
+            block_columns = column_order[column_bounds[block]:column_bounds[block + 1]]
+            triplets = triplet_order[triplet_bounds[block]:triplet_bounds[block + 1]]
+
+            matrix = np.zeros((len(block_rows), len(block_columns)))
+            np.add.at(matrix, (local_rows[triplet_rows[triplets]], local_columns[triplet_columns[triplets]]),
+                      triplet_values[triplets])
+
+            values, rank, determined = self.__solve_block(matrix, constants[block_rows])
+            residual = float(np.linalg.norm(matrix @ values - constants[block_rows]))
+            scale = max(1.0, float(np.linalg.norm(constants[block_rows])), float(np.linalg.norm(matrix @ values)))
+            if residual > self.TOLERANCE * scale:
+                status = self.OVERDETERMINED
+            elif rank < len(block_columns):
+                status = self.UNDERDETERMINED
+            else:
+                status = self.UNIQUE
+
+            names = [unknowns[column] for column in block_columns]
+            block_values = {name: float(value) for name, value, known in zip(names, values, determined)
+                            if known or status == self.OVERDETERMINED}
+            if status != self.OVERDETERMINED:
+                report['solution'].update(block_values)
+            report['systems'].append({
+                'unknowns': names,
+                'equations': [rows[row] for row in block_rows],
+                'rank': rank,
+                'status': status,
+                'residual': residual,
+                'values': block_values,
+            })
+
+        return report
+
+    def __solve_block(self, matrix, constants):
+        """
+        Solves one block of the system.
+
+        Parameters:
+            matrix (numpy.ndarray): The coefficients of the block.
+            constants (numpy.ndarray): The right side of the equations of the block.
+
+        Returns:
+            tuple: The values of the unknowns (least-squares, of minimum norm), the rank of the matrix,
+                   and a boolean array telling which unknowns are determined by the equations.
+        """
+        rows, columns = matrix.shape
+        if rows == columns:
+            try:
+                values = np.linalg.solve(matrix, constants)
+            except np.linalg.LinAlgError:
+                # An exactly singular matrix, left to the decomposition below
+                values = None
+            # A 1x1 block always has a nonzero coefficient, so only larger blocks can be ill-conditioned
+            if values is not None and np.all(np.isfinite(values)) and \
+                    (columns == 1 or np.linalg.cond(matrix) <= self.MAX_CONDITION):
+                return values, columns, np.ones(columns, dtype=bool)
+
+        # With fewer rows than columns, the full decomposition is needed to span the null space
+        u, singular_values, vt = np.linalg.svd(matrix, full_matrices=rows < columns)
+        cutoff = np.finfo(np.float64).eps * max(rows, columns) * singular_values[0]
+        rank = int(np.count_nonzero(singular_values > cutoff))
+        values = vt[:rank].T @ ((u[:, :rank].T @ constants) / singular_values[:rank])
+        # An unknown is determined if it does not move along the null space of the matrix
+        determined = np.linalg.norm(vt[rank:], axis=0) <= math.sqrt(self.TOLERANCE)
+        return values, rank, determined
+
+    @staticmethod
+    def __blocks(triplet_rows, triplet_columns, row_count, column_count):
+        """
+        Groups the unknowns that are linked, directly or through other unknowns, by an equation.
+
+        Parameters:
+            triplet_rows (numpy.ndarray): The row of each coefficient.
+            triplet_columns (numpy.ndarray): The column of each coefficient.
+            row_count (int): The number of rows.
+            column_count (int): The number of columns.
+
+        Returns:
+            numpy.ndarray: The block of each column, numbered from 0 in the order of their first column.
+        """
+        parents = list(range(column_count))
+
+        def find(column):
+            root = column
+            while parents[root] != root:
+                root = parents[root]
+            # Point the path straight to the root, so later lookups are short
+            while parents[column] != root:
+                parents[column], column = root, parents[column]
+            return root
+
+        # Link every column to the first column of its row
+        first_columns = [-1] * row_count
+        for row, column in zip(triplet_rows.tolist(), triplet_columns.tolist()):
+            if first_columns[row] < 0:
+                first_columns[row] = column
+            else:
+                a, b = find(first_columns[row]), find(column)
+                if a != b:
+                    parents[max(a, b)] = min(a, b)
+
+        roots = {}
+        return np.array([roots.setdefault(find(column), len(roots)) for column in range(column_count)], dtype=np.int64)
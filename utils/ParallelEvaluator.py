@@ -0,0 +1,208 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# An evaluator that evaluates the independent parts of a workspace in parallel.
+# The statements of a ParseTree are split into weakly connected components of
+# their dependency graph. Components never refer to each other, so they are
+# packed into chunks and evaluated by a pool of worker processes.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : ParallelEvaluator.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor
+from utils.ParseTree import ParseTree
+
+class ParallelEvaluator:
+    """
+    Evaluates all the assignment statements of a ParseTree on a pool of worker processes.
+
+    The statements are split into weakly connected components of the dependency graph,
+    so a component holds every defined variable its statements refer to. Components are
+    packed into chunks of about chunk_size statements, and each chunk is sent to a worker
+    as a list of simplified expression trees encoded in postfix order, which the worker
+    evaluates with a stack. The results are merged back in alphabetical order, like ParseTree.evaluate_all.
+
+    Attributes:
+        parse_tree (ParseTree): The parse tree holding the assignment statements.
+        max_workers (int): The number of worker processes, None to use the number of processors.
+        chunk_size (int): The approximate number of statements sent to a worker at once.
+    """
+
+    def __init__(self, parse_tree, max_workers=None, chunk_size=1000):
+        """
+        Initializes the evaluator for the given parse tree.
+
+        Parameters:
+            parse_tree (ParseTree): The parse tree holding the assignment statements.
+            max_workers (int, optional): The number of worker processes. Defaults to the number of processors.
+            chunk_size (int, optional): The approximate number of statements sent to a worker at once. Defaults to 1000.
+
+        Raises:
+            ValueError: If the chunk size is not positive.
+        """
+        self.__parse_tree = parse_tree
+        self.__max_workers = max_workers
+        self.__encoded = {}  # Postfix encodings of the statements, reused while their tree is unchanged
+        self.set_chunk_size(chunk_size)
+
+    def get_parse_tree(self):
+        """Returns the parse tree being evaluated."""
+        return self.__parse_tree
+
+    def set_parse_tree(self, parse_tree):
+        """Sets the parse tree to evaluate."""
+        self.__parse_tree = parse_tree
+        self.__encoded = {}
+
+    def get_max_workers(self):
+        """Returns the number of worker processes."""
+        return self.__max_workers
+
+    def set_max_workers(self, max_workers):
+        """Sets the number of worker processes, None to use the number of processors."""
+        self.__max_workers = max_workers
+
+    def get_chunk_size(self):
+        """Returns the approximate number of statements sent to a worker at once."""
+        return self.__chunk_size
+
+    def set_chunk_size(self, chunk_size):
+        """
+        Sets the approximate number of statements sent to a worker at once.
+
+        Raises:
+            ValueError: If the chunk size is not positive.
+        """
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be at least 1.')
+        self.__chunk_size = chunk_size
+
+    def components(self):
+        """
+        Splits the defined variables into weakly connected components of the dependency graph.
+
+        Returns:
+            list: The components, each a list of variables in topological order.
+        """
+        dependency_graph = self.__parse_tree.get_dependency_graph()
+        optimized_statements = self.__parse_tree.get_optimized_statements()
+
+        # Union-find with path halving
+        parents = {var: var for var in optimized_statements}
+
+        def find(var):
+            while parents[var] != var:
+                parents[var] = parents[parents[var]]
+                var = parents[var]
+            return var
+
+        for var in optimized_statements:
+            for dep in dependency_graph.get_dependencies(var):
+                if dep in parents:
+                    root, dep_root = find(var), find(dep)
+                    if root != dep_root:
+                        parents[root] = dep_root
+
+        components = {}
+        for var in dependency_graph.topological_order(optimized_statements):
+            components.setdefault(find(var), []).append(var)
+        return list(components.values())
+
+    def chunks(self):
+        """
+        Packs the components into chunks of about chunk_size statements.
+        A component is never split, so a chunk can hold more statements when a component is larger.
+
+        Returns:
+            list: The chunks, each a list of (variable, postfix encoded tree) pairs.
+        """
+        optimized_statements = self.__parse_tree.get_optimized_statements()
+        chunks = []
+        chunk = []
+        for component in sorted(self.components(), key=len, reverse=True):
+            for var in component:
+                tree = optimized_statements[var]
+                encoded = self.__encoded.get(var)
+                if encoded is None or encoded[0] is not tree:
+                    encoded = (tree, tree.to_postfix())
+                    self.__encoded[var] = encoded
+                chunk.append((var, encoded[1]))
+            if len(chunk) >= self.__chunk_size:
+                chunks.append(chunk)
+                chunk = []
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def evaluate_all(self):
+        """
+        Evaluates every assignment statement on the pool of worker processes.
+
+        Returns:
+            dict: The variables, in alphabetical order, mapped to their evaluated values.
+
+        Raises:
+            ZeroDivisionError: If an expression includes division by zero.
+        """
+        chunks = self.chunks()
+        results = {}
+        if len(chunks) > 1 and self.__max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.__max_workers) as executor:
+                for chunk_results in executor.map(ParallelEvaluator.evaluate_chunk, chunks):
+                    results.update(chunk_results)
+        else:
+            # A single chunk or worker is evaluated in this process
+            for chunk in chunks:
+                results.update(ParallelEvaluator.evaluate_chunk(chunk))
+
+        return {var: results[var] for var, _ in self.__parse_tree.get_statements().getitem_inorder()}
+
+    @staticmethod
+    def evaluate_chunk(chunk):
+        """
+        Evaluates a chunk of statements in a worker process.
+
+        The postfix encoded trees are evaluated directly with a stack, without building the trees again.
+        Statements come in topological order, so the variables they refer to are already evaluated.
+
+        Parameters:
+            chunk (list): The (variable, postfix encoded tree) pairs of whole components, in topological order.
+
+        Returns:
+            dict: The variables of the chunk mapped to their evaluated values.
+
+        Raises:
+            ZeroDivisionError: If an expression includes division by zero.
+            RuntimeError: If an expression has a missing operand or operator.
+        """
+        apply_operator = ParseTree.apply_operator
+        evaluated = {}
+        for var, postfix in chunk:
+            values = []
+            for item in postfix:
+                if isinstance(item, tuple):
+                    right = values.pop()
+                    values.append(apply_operator(item[0], values.pop(), right))
+                elif item == '?':
+                    raise RuntimeError('Error evaluating expression due to missing operand or operator.')
+                elif isinstance(item, int) or isinstance(item, float):
+                    values.append(item)
+                else:
+                    # Variables outside the component are undefined
+                    values.append(evaluated.get(item, 'None'))
+
+            # Round off floating-point calculations
+            result = values.pop()
+            if isinstance(result, float):
+                result = round(result, 2)
+            evaluated[var] = result
+        return evaluated
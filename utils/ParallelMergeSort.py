@@ -0,0 +1,120 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# A merge sort that sorts chunks of the data on a pool of worker processes.
+# Each chunk is sent as two flat lists of values and keys, the workers send
+# back the sorted positions as a compact array, and the sorted chunks are
+# merged with a heap in this process.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : ParallelMergeSort.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import heapq
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.BottomUpMergeSort import BottomUpMergeSort
+
+class ParallelMergeSort(BottomUpMergeSort):
+    """
+    A merge sort giving the same order as MergeSort, with the chunks of the data sorted in parallel.
+
+    The numeric entries are split into chunks of chunk_size entries. A chunk is sent to a worker as a list
+    of values and a list of keys, which pickle more compactly than a list of entries, and the worker sorts
+    them by (-value, key) with BottomUpMergeSort.sort and sends back the sorted positions as an array.
+    The sorted chunks are then merged by heapq.merge. The keys are unique, so the order is the one of
+    MergeSort, whatever the chunks. Data that fits in one chunk, or a single worker, is sorted in this process.
+
+    Attributes:
+        max_workers (int): The number of worker processes, None to use the number of processors.
+        chunk_size (int): The number of entries sorted by a worker at once.
+    """
+
+    def __init__(self, data, max_workers=None, chunk_size=50_000):
+        """
+        Initializes the sort with the data to be sorted.
+
+        Parameters:
+        - data (dict): The dictionary to be sorted. The values can be numeric or 'None'.
+        - max_workers (int, optional): The number of worker processes. Defaults to the number of processors.
+        - chunk_size (int, optional): The number of entries sorted by a worker at once. Defaults to 50000.
+
+        Raises:
+        - ValueError: If the chunk size is not positive.
+        """
+        super().__init__(data)
+        self.__max_workers = max_workers
+        self.set_chunk_size(chunk_size)
+
+    def get_max_workers(self):
+        """Returns the number of worker processes."""
+        return self.__max_workers
+
+    def set_max_workers(self, max_workers):
+        """Sets the number of worker processes, None to use the number of processors."""
+        self.__max_workers = max_workers
+
+    def get_chunk_size(self):
+        """Returns the number of entries sorted by a worker at once."""
+        return self.__chunk_size
+
+    def set_chunk_size(self, chunk_size):
+        """
+        Sets the number of entries sorted by a worker at once.
+
+        Raises:
+        - ValueError: If the chunk size is not positive.
+        """
+        if chunk_size < 1:
+            raise ValueError('Chunk size must be at least 1.')
+        self.__chunk_size = chunk_size
+
+    def merge_sort(self):
+        """
+        Performs the merge sort on the numeric part of the data, sorting its chunks on the worker processes.
+        """
+        data = self.get_data()
+        size = self.__chunk_size
+        if len(data) <= size or self.__max_workers == 1 or any(isinstance(value, str) for _, value in data):
+            # Not worth the processes, or not a total order, which BottomUpMergeSort handles
+            super().merge_sort()
+            return
+
+        chunks = [data[start:start + size] for start in range(0, len(data), size)]
+        encoded = [([value for _, value in chunk], [key for key, _ in chunk]) for chunk in chunks]
+        with ProcessPoolExecutor(max_workers=self.__max_workers) as executor:
+            orders = list(executor.map(ParallelMergeSort.sort_chunk, encoded))
+
+        # The sort key of every entry is built again to merge the sorted chunks
+        runs = [[(-chunk[i][1], chunk[i][0], chunk[i]) for i in order] for chunk, order in zip(chunks, orders)]
+        self.set_data([entry for _, _, entry in heapq.merge(*runs)])
+
+    @staticmethod
+    def sort_chunk(encoded):
+        """
+        Sorts a chunk of entries in a worker process.
+
+        Parameters:
+        - encoded (tuple): The list of numeric values and the list of their keys.
+
+        Returns:
+        - array: The positions of the entries in the chunk, sorted by descending value, then key.
+        """
+        values, keys = encoded
+        entries = BottomUpMergeSort.sort([(-value, key, i) for i, (value, key) in enumerate(zip(values, keys))])
+        return array('q', [i for _, _, i in entries])
+
+    def __str__(self) -> str:
+        return "ParallelMergeSort class"
+
+    def __repr__(self) -> str:
+        return "ParallelMergeSort class"
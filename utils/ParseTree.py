@@ -9,6 +9,16 @@
 # Attributes:
 #     statements (Hashtable): Stores variable assignments and their corresponding expression trees.
 #     active_evaluations (set): Tracks variables currently being evaluated to detect circular dependencies.
+#     dependency_graph (DependencyGraph): Tracks the variables each statement refers to, to detect circular dependencies on insertion.
+#     batch (dict): Statements staged by begin_batch until they are committed, or None.
+#     optimized_statements (dict): Simplified copies of the expression trees, used for evaluation.
+#     reactive (bool): Whether the values of the statements are kept up to date after every change.
+#     values (dict): The materialized values of the statements in reactive mode.
+#     failures (dict): The errors raised by the statements that could not be evaluated in reactive mode.
+#     touched (int): The number of statements evaluated again by the last change in reactive mode.
+#     budget (EvaluationBudget): Limits on the cost of evaluations, or None for no limits.
+#     tracer (EvaluationTracer): Records where the time of evaluations goes, or None when not tracing.
+#     versions (dict): Stamps of the last change of each variable, or of a variable it depends on.
 #
 # -----------------------------------------------------
 #
@@ -21,7 +31,14 @@
 # -----------------------------------------------------
 # To run: python main.py
 # -----------------------------------------------------
+import heapq
+import itertools
 from ADT import Stack, BinaryTree, Hashtable
+from ADT.DependencyGraph import DependencyGraph
+from utils.TreeOptimizer import TreeOptimizer
+from utils.EvaluationBudget import EvaluationCancelled, EvaluationBudgetExceeded
+from utils.Differentiator import Differentiator
+from utils.AffineCompiler import AffineCompiler
 
 class ParseTree:
     """
@@ -34,12 +51,41 @@ class ParseTree:
     Attributes:
         statements (Hashtable): Stores variable assignments and their corresponding expression trees.
         active_evaluations (set): Tracks variables currently being evaluated to detect circular dependencies.
+        dependency_graph (DependencyGraph): Tracks the variables each statement refers to, to detect circular dependencies on insertion.
+        batch (dict): Statements staged by begin_batch until they are committed, or None.
+        optimized_statements (dict): Simplified copies of the expression trees, used for evaluation.
+        reactive (bool): Whether the values of the statements are kept up to date after every change.
+        values (dict): The materialized values of the statements in reactive mode.
+        failures (dict): The errors raised by the statements that could not be evaluated in reactive mode.
+        touched (int): The number of statements evaluated again by the last change in reactive mode.
+        budget (EvaluationBudget): Limits on the cost of evaluations, or None for no limits.
+        tracer (EvaluationTracer): Records where the time of evaluations goes, or None when not tracing.
+        versions (dict): Stamps of the last change of each variable, or of a variable it depends on.
+        cached_values (dict): Values of the statements read by get_value, dropped when their stamp changes.
+        cached_failures (dict): Errors of the statements read by get_value, dropped when their stamp changes.
     """
 
+    # Version stamps are shared by all the parse trees, so a stamp never identifies two different states
+    __clock = itertools.count(1)
+
     def __init__(self):
         """Initialize the ParseTree with empty statements."""
         self.__statements = Hashtable()  # Stores statements and their expression trees
         self.__active_evaluations = set() # Storage for catching circular dependencies
+        self.__dependency_graph = DependencyGraph() # Variables referred to by each statement
+        self.__batch = None # Statements staged by begin_batch, None when no batch is in progress
+        self.__optimizer = TreeOptimizer() # Simplifies expression trees before they are stored
+        self.__optimized_statements = {} # Simplified expression trees used for evaluation
+        self.__reactive = False # Keep the values of the statements up to date after every change
+        self.__values = {} # Materialized values of the statements in reactive mode
+        self.__failures = {} # Errors of the statements that could not be evaluated in reactive mode
+        self.__touched = 0 # Number of statements evaluated again by the last change
+        self.__stale = False # Whether a cancelled change left the materialized values out of date
+        self.__budget = None # Limits on the cost of evaluations
+        self.__tracer = None # Records where the time of evaluations goes
+        self.__versions = {} # Stamps of the last change of each variable or of its dependencies
+        self.__cached_values = {} # Values of the statements read by get_value outside of reactive mode
+        self.__cached_failures = {} # Errors of the statements read by get_value outside of reactive mode
 
     def get_statements(self):
         """
@@ -52,12 +98,28 @@ class ParseTree:
     
     def set_statements(self, statements):
         """
-        Sets the statements of the ParseTree.
+        Sets the statements of the ParseTree and rebuilds the dependency graph from them.
 
         Parameters:
             statements (Hashtable): A hashtable containing the statements and their associated expression trees.
+
+        Raises:
+            ValueError: If a circular dependency is detected.
         """
+        dependency_graph = DependencyGraph()
+        optimized_statements = {}
+        for var, tree in statements.getitem_inorder():
+            dependency_graph.set_dependencies(var, self.collect_variables(tree))
+            optimized_statements[var] = self.__optimizer.optimize(tree)
         self.__statements = statements
+        self.__dependency_graph = dependency_graph
+        self.__optimized_statements = optimized_statements
+        # Statements that are no longer defined are not stamped, so nothing cached is kept
+        self.__cached_values = {}
+        self.__cached_failures = {}
+        self.__stamp(optimized_statements)
+        if self.__reactive:
+            self.__materialize_all()
     
     def get_active_evaluations(self):
         """
@@ -77,6 +139,110 @@ class ParseTree:
         """
         self.__active_evaluations = active_evaluations
 
+    def get_dependency_graph(self):
+        """
+        Retrieves the dependency graph of the statements stored in the ParseTree.
+
+        Returns:
+            DependencyGraph: The graph of the variables each statement refers to.
+        """
+        return self.__dependency_graph
+
+    def is_reactive(self):
+        """
+        Checks if the values of the statements are kept up to date after every change.
+
+        Returns:
+            bool: True if the ParseTree is in reactive mode, False otherwise.
+        """
+        return self.__reactive
+
+    def set_reactive(self, reactive):
+        """
+        Turns the reactive mode on or off.
+
+        In reactive mode, the value of every statement is kept. When a statement is added or modified,
+        only the statements depending on it are evaluated again, and evaluating reads the kept values.
+        Turning the mode on evaluates every statement once.
+
+        Parameters:
+            reactive (bool): True to turn the reactive mode on, False to turn it off.
+        """
+        self.__reactive = reactive
+        if reactive:
+            self.__materialize_all()
+        else:
+            self.__values = {}
+            self.__failures = {}
+
+    def get_touched(self):
+        """
+        Retrieves the number of statements evaluated again by the last change in reactive mode.
+
+        Returns:
+            int: The number of statements evaluated again.
+        """
+        return self.__touched
+
+    def get_budget(self):
+        """
+        Retrieves the limits on the cost of evaluations.
+
+        Returns:
+            EvaluationBudget: The budget, or None if evaluations are not limited.
+        """
+        return self.__budget
+
+    def set_budget(self, budget):
+        """
+        Sets the limits on the cost of evaluations.
+
+        Parameters:
+            budget (EvaluationBudget): The budget, or None to remove the limits.
+        """
+        self.__budget = budget
+
+    def get_tracer(self):
+        """
+        Retrieves the tracer recording the evaluations.
+
+        Returns:
+            EvaluationTracer: The tracer, or None if evaluations are not traced.
+        """
+        return self.__tracer
+
+    def set_tracer(self, tracer):
+        """
+        Sets the tracer recording the evaluations. Evaluations are only slowed down while a tracer is set.
+
+        Parameters:
+            tracer (EvaluationTracer): The tracer, or None to stop tracing.
+        """
+        self.__tracer = tracer
+
+    def get_version(self, var):
+        """
+        Retrieves the version stamp of a variable. The stamp changes whenever the statement of the variable,
+        or of a variable it depends on, is added or modified, so a value computed from it is still valid
+        as long as the stamp is unchanged.
+
+        Parameters:
+            var (str): The variable.
+
+        Returns:
+            int: The stamp, 0 if the variable was never defined.
+        """
+        return self.__versions.get(var, 0)
+
+    def get_optimized_statements(self):
+        """
+        Retrieves the simplified expression trees used to evaluate the statements.
+
+        Returns:
+            dict: The variables mapped to their simplified expression trees.
+        """
+        return self.__optimized_statements
+
     def build_parse_tree(self, exp_tokens):
         """
         Constructs a parse tree for the given expression tokens.
@@ -149,6 +315,10 @@ class ParseTree:
 
         This method computes the value of the expression tree, handling variables,
         operators, and function calls. It checks for circular dependencies.
+        The tree is walked with an explicit stack instead of recursion, so chains of variables
+        and trees of any depth can be evaluated without reaching Python's recursion limit.
+        Each variable referenced is evaluated only once per call.
+        Stored statements are evaluated from their simplified expression trees.
 
         Parameters:
             var (str): The variable name associated with the expression being evaluated.
@@ -159,88 +329,479 @@ class ParseTree:
 
         Raises:
             ValueError: If a circular dependency is detected.
+            EvaluationBudgetExceeded: If the evaluation exceeds the budget.
+            EvaluationCancelled: If the evaluation is cancelled or runs past its deadline.
         """
         # Check for circular dependency
         if var in self.__active_evaluations:
             self.__active_evaluations.clear()  # Clear active evaluations to avoid infinite recursion
             raise ValueError(f"Circular dependency detected for variable: {var}")
-        
+
         # Add variable to active evaluations to track circular dependencies
         self.__active_evaluations.add(var)
-        
-        # Evaluate the expression tree
-        result = self.__evaluate_expression(tree)
-
-        # Round off floating-point calculations
-        if isinstance(result, float):
-            result = round(result, 2)
-        
-        # Clear active evaluations if the result is 'None', otherwise remove variable from active evaluations
-        if result == 'None':
+
+        # Evaluate the simplified tree of a stored statement
+        optimized = self.__optimized_statements.get(var)
+        if optimized is not None and var in self.__statements and self.__statements[var] is tree:
+            tree = optimized
+
+            # Read the kept value in reactive mode
+            if self.__reactive:
+                self.__active_evaluations.clear()
+                if self.__stale:
+                    self.__materialize_all()
+                tracer = self.__tracer
+                if tracer is not None:
+                    tracer.enter(var)
+                    tracer.dereference(var, True)
+                if var in self.__failures:
+                    if tracer is not None:
+                        tracer.unwind(self.__failures[var])
+                    # A new error is raised, since raising the kept one again would grow its traceback
+                    failure = self.__failures[var]
+                    raise type(failure)(*failure.args)
+                if tracer is not None:
+                    tracer.exit(var)
+                return self.__values[var]
+
+        if self.__budget is not None:
+            self.__budget.start()
+
+        try:
+            # Evaluate the expression tree
+            return self.__evaluate_expression(var, tree, {})
+        except Exception as error:
+            if self.__tracer is not None:
+                self.__tracer.unwind(error)
+            raise
+        finally:
+            # Active evaluations only hold the variables of the chain currently being evaluated
+            self.__active_evaluations.clear()
+
+    def get_value(self, var):
+        """
+        Retrieves the value of a stored statement, evaluating it only if it changed since it was last read.
+
+        In reactive mode the kept value is read. Otherwise the values of the statement and of every variable
+        evaluated along the way are cached, and __stamp drops the cached values of a changed statement and
+        of its dependents, so reading a variable again costs O(1) until its version stamp changes.
+
+        Parameters:
+            var (str): The variable of the statement.
+
+        Returns:
+            float or int or 'None': The value of the statement, or 'None' if the variable is not defined.
+
+        Raises:
+            ZeroDivisionError: If the expression includes division by zero.
+            RuntimeError: If the expression has a missing operand or operator.
+            EvaluationBudgetExceeded: If the evaluation exceeds the budget.
+            EvaluationCancelled: If the evaluation is cancelled or runs past its deadline.
+        """
+        if var not in self.__optimized_statements:
+            return 'None'
+        if self.__reactive:
+            return self.evaluate(var, self.__statements[var])
+
+        tracer = self.__tracer
+        if var in self.__cached_values or var in self.__cached_failures:
+            if tracer is not None:
+                tracer.enter(var)
+                tracer.dereference(var, True)
+            if var in self.__cached_failures:
+                failure = self.__cached_failures[var]
+                if tracer is not None:
+                    tracer.unwind(failure)
+                raise type(failure)(*failure.args)
+            if tracer is not None:
+                tracer.exit(var)
+            return self.__cached_values[var]
+
+        if self.__budget is not None:
+            self.__budget.start()
+
+        self.__active_evaluations.add(var)
+        try:
+            # The cached values act as the evaluated variables, and the new values are stored in them
+            return self.__evaluate_expression(var, self.__optimized_statements[var], self.__cached_values)
+        except (EvaluationCancelled, EvaluationBudgetExceeded) as error:
+            # The statement may fit in another budget, so the error is not kept
+            if tracer is not None:
+                tracer.unwind(error)
+            raise
+        except (ZeroDivisionError, RuntimeError, OverflowError) as error:
+            if tracer is not None:
+                tracer.unwind(error)
+            self.__cached_failures[var] = error
+            raise
+        except Exception as error:
+            if tracer is not None:
+                tracer.unwind(error)
+            raise
+        finally:
             self.__active_evaluations.clear()
-        else:
-            self.__active_evaluations.remove(var)  # Remove variable from active evaluations
-        return result
-        
-    def __evaluate_expression(self, tree: BinaryTree):
+
+    def evaluate_all(self):
+        """
+        Evaluates every assignment statement in a single pass.
+
+        The statements are evaluated in the topological order of the dependency graph and share
+        the results of the variables already evaluated, so every statement is evaluated only once.
+
+        Returns:
+            dict: The variables, in alphabetical order, mapped to their evaluated values.
+
+        Raises:
+            ZeroDivisionError: If an expression includes division by zero.
+            EvaluationBudgetExceeded: If the evaluation exceeds the budget.
+            EvaluationCancelled: If the evaluation is cancelled or runs past its deadline.
+        """
+        if self.__reactive:
+            if self.__stale:
+                self.__materialize_all()
+            # Raise the error of the first statement that failed, as a single pass would
+            if self.__failures:
+                raise self.__failures[min(self.__failures, key=self.__dependency_graph.get_order)]
+            return {var: self.__values[var] for var, _ in self.__statements.getitem_inorder()}
+
+        evaluated = {}
+        try:
+            for var in self.__dependency_graph.topological_order():
+                # Each statement has its own budget, its dependencies are already evaluated
+                if self.__budget is not None:
+                    self.__budget.start()
+                self.__active_evaluations.add(var)
+                self.__evaluate_expression(var, self.__optimized_statements[var], evaluated)
+        except Exception as error:
+            if self.__tracer is not None:
+                self.__tracer.unwind(error)
+            raise
+        finally:
+            self.__active_evaluations.clear()
+
+        return {var: evaluated[var] for var, _ in self.__statements.getitem_inorder()}
+
+    def snapshot(self):
+        """
+        Evaluates every assignment statement once, keeping the errors of the statements that cannot be evaluated,
+        so many readers can share the values without evaluating the statements again.
+
+        A statement depending on a statement that failed keeps the same error, as evaluating it would raise it.
+
+        Returns:
+            dict: The variables mapped to their evaluated values, or to the errors raised by their evaluation.
+
+        Raises:
+            EvaluationCancelled: If the evaluation is cancelled or runs past its deadline.
         """
-        Recursively evaluates the given expression tree.
+        if self.__reactive:
+            if self.__stale:
+                self.__materialize_all()
+            snapshot = dict(self.__values)
+            snapshot.update(self.__failures)
+            return snapshot
+
+        evaluated = {}
+        snapshot = {}
+        for var in self.__dependency_graph.topological_order():
+            failures = [snapshot[dep] for dep in self.__dependency_graph.get_dependencies(var)
+                        if isinstance(snapshot.get(dep), Exception)]
+            if failures:
+                snapshot[var] = failures[0]
+                continue
+            if self.__budget is not None:
+                self.__budget.start()
+            self.__active_evaluations.add(var)
+            try:
+                snapshot[var] = self.__evaluate_expression(var, self.__optimized_statements[var], evaluated)
+            except EvaluationCancelled as error:
+                if self.__tracer is not None:
+                    self.__tracer.unwind(error)
+                raise
+            except (ZeroDivisionError, RuntimeError, OverflowError) as error:
+                if self.__tracer is not None:
+                    self.__tracer.unwind(error)
+                snapshot[var] = error
+            finally:
+                self.__active_evaluations.clear()
+        return snapshot
+
+    def __evaluate_expression(self, var, tree: BinaryTree, evaluated):
+        """
+        Iteratively evaluates the given expression tree.
 
         This method traverses the tree, evaluating the expression based on the operators and operands
         defined in the tree nodes. It handles arithmetic operations and variable references.
+        Pending work is kept on a stack of tasks and intermediate results on a stack of values.
+        Entering a variable pushes an exit task, so the variable is rounded, cached and removed
+        from the active evaluations once its own tree has been evaluated.
+        Statements waiting on an undefined variable are walked like any other, since another part
+        of their tree can still raise an error, such as a division by zero.
 
         Parameters:
+            var (str): The variable whose expression tree is evaluated.
             tree (BinaryTree): The root of the expression tree to evaluate.
+            evaluated (dict): Results of the variables already evaluated, updated with the new results.
 
         Returns:
             float or int or 'None': The result of the expression evaluation, or 'None' if a variable is undefined.
 
         Raises:
+            ValueError: If a circular dependency is detected.
             ZeroDivisionError: If the expression includes division by zero.
+            EvaluationBudgetExceeded: If the evaluation exceeds the budget.
+            EvaluationCancelled: If the evaluation is cancelled or runs past its deadline.
         """
-        # Check if the tree is not empty
-        if tree:
-            # Check if both left and right subtrees exist
-            if tree.get_left_tree() and tree.get_right_tree():
-                op = tree.get_key()  # Get the operator
-                left = self.__evaluate_expression(tree.get_left_tree())  # Evaluate left subtree
-                right = self.__evaluate_expression(tree.get_right_tree())  # Evaluate right subtree
-                
-                # Return 'None' if either operand is 'None'
-                if left == 'None' or right == 'None':
-                    return 'None'
-                # Evaluate the expression based on the operator
-                elif op == '+': return left + right
-                elif op == '-': return left - right
-                elif op == '*': return left * right
-                elif op == '/':
-                    # Check for division by zero
-                    if right == 0:
-                        raise ZeroDivisionError('Division by zero error')
-                    return left / right
-                elif op == '**': return left ** right
-            else:
+        statements = self.__statements
+        optimized_statements = self.__optimized_statements
+        active_evaluations = self.__active_evaluations
+        apply_operator = self.apply_operator
+        budget = self.__budget
+        tracer = self.__tracer
+        if tracer is not None:
+            tracer.enter(var)
+
+        # A task is a BinaryTree to visit, an operator (str) to apply or a variable (tuple) to exit
+        tasks = [(var,), tree]
+        values = []
+
+        while tasks:
+            item = tasks.pop()
+            if isinstance(item, BinaryTree):
+                if budget is not None:
+                    budget.visit()
+                if tracer is not None:
+                    tracer.node()
+                left_tree, right_tree = item.get_left_tree(), item.get_right_tree()
+                # Check if both left and right subtrees exist
+                if left_tree and right_tree:
+                    # Evaluate the left subtree, then the right subtree, then apply the operator
+                    tasks.append(item.get_key())
+                    tasks.append(right_tree)
+                    tasks.append(left_tree)
+                    continue
+
                 # Handle leaf nodes (operands or variables)
-                key = tree.get_key()
+                key = item.get_key()
                 # Return error if the default key is encountered
                 if key == '?':
                     raise RuntimeError('Error evaluating expression due to missing operand or operator.')
-                # Return the operand if it's a number
+                # Push the operand if it's a number
                 if isinstance(key, int) or isinstance(key, float):
-                    return key
+                    values.append(key)
+                # Reuse variables that were already evaluated
+                elif key in evaluated:
+                    if tracer is not None:
+                        tracer.dereference(key, True)
+                    values.append(evaluated[key])
                 # Evaluate variable reference
-                elif key in self.__statements:
-                    return self.evaluate(key, self.__statements[key])
-                # Return 'None' for undefined variables
+                elif key in statements:
+                    if tracer is not None:
+                        tracer.dereference(key, False)
+                    if key in active_evaluations:
+                        raise ValueError(f"Circular dependency detected for variable: {key}")
+                    active_evaluations.add(key)
+                    if tracer is not None:
+                        tracer.enter(key)
+                    tasks.append((key,))
+                    tasks.append(optimized_statements[key] if key in optimized_statements else statements[key])
+                # Push 'None' for undefined variables
                 else:
-                    return 'None'
+                    if tracer is not None:
+                        tracer.dereference(key, False)
+                    values.append('None')
+
+            elif isinstance(item, str):
+                right = values.pop()
+                left = values.pop()
+                if budget is None:
+                    values.append(apply_operator(item, left, right))
+                else:
+                    # Check the size of the result before and after computing it
+                    budget.check_operation(item, left, right)
+                    result = apply_operator(item, left, right)
+                    budget.check_value(result)
+                    values.append(result)
+
+            else:
+                key = item[0]
+                result = values[-1]
+                # Round off floating-point calculations
+                if isinstance(result, float):
+                    result = round(result, 2)
+                    values[-1] = result
+                evaluated[key] = result
+                active_evaluations.discard(key)
+                if tracer is not None:
+                    tracer.exit(key)
+
+        return values.pop()
+
+    @staticmethod
+    def apply_operator(op, left, right):
+        """
+        Applies an operator to two evaluated operands.
+
+        Parameters:
+            op (str): The operator.
+            left (float or int or 'None'): The evaluated left operand.
+            right (float or int or 'None'): The evaluated right operand.
+
+        Returns:
+            float or int or 'None': The result, or 'None' if either operand is 'None'.
+
+        Raises:
+            ZeroDivisionError: If the right operand of a division is zero.
+        """
+        # Return 'None' if either operand is 'None'
+        if left == 'None' or right == 'None':
+            return 'None'
+        # Evaluate the expression based on the operator
+        elif op == '+': return left + right
+        elif op == '-': return left - right
+        elif op == '*': return left * right
+        elif op == '/':
+            # Check for division by zero
+            if right == 0:
+                raise ZeroDivisionError('Division by zero error')
+            return left / right
+        elif op == '**': return left ** right
+
+    def collect_variables(self, tree: BinaryTree):
+        """
+        Collects the variables referred to by an expression tree without recursion.
+
+        Parameters:
+            tree (BinaryTree): The root of the expression tree.
+
+        Returns:
+            set: The names of the variables found in the leaf nodes.
+        """
+        variables = set()
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            left_tree, right_tree = node.get_left_tree(), node.get_right_tree()
+            if left_tree and right_tree:
+                stack.append(left_tree)
+                stack.append(right_tree)
+            else:
+                key = node.get_key()
+                if isinstance(key, str) and key != '?':
+                    variables.add(key)
+        return variables
+
+    def gradient(self, var):
+        """
+        Computes the partial derivatives of a statement with respect to all the leaf variables it depends on,
+        i.e. the defined variables whose statements do not refer to other variables, in one backward pass.
+
+        Parameters:
+            var (str): The variable of the statement.
+
+        Returns:
+            dict: The leaf variables, in alphabetical order, mapped to the partial derivatives,
+                  or to 'None' if the statement evaluates to 'None'.
+
+        Raises:
+            ValueError: If the variable is not defined.
+            ZeroDivisionError: If an expression includes division by zero.
+            RuntimeError: If an expression has a missing operand or operator.
+        """
+        return Differentiator(self).gradient(var)
+
+    def compile_affine(self):
+        """
+        Compiles the affine statements, such as Lemon=(Pear+Tangerine), into a sparse matrix and an offset vector
+        over the leaf variables, so they are all evaluated with one sparse matrix-vector product.
+
+        Returns:
+            AffineCompiler: The compiled program, to evaluate with evaluate_all, or with evaluate for batches of inputs.
+                            It has to be compiled again whenever the statements change.
+        """
+        return AffineCompiler(self).compile()
+
+    def derivative(self, var, wrt):
+        """
+        Computes the derivative of a statement with respect to one leaf variable, in one forward pass.
+
+        Parameters:
+            var (str): The variable of the statement.
+            wrt (str): The leaf variable to differentiate with respect to.
+
+        Returns:
+            float or int or 'None': The derivative, or 'None' if the statement evaluates to 'None'.
+
+        Raises:
+            ValueError: If the variable is not defined.
+            ZeroDivisionError: If an expression includes division by zero.
+            RuntimeError: If an expression has a missing operand or operator.
+        """
+        return Differentiator(self).derivative(var, wrt)
+
+    def specialize(self, fixed, free):
+        """
+        Builds a residual parse tree where the fixed variables and everything depending only on them are constants.
+
+        Every statement is simplified after replacing the fixed variables, and the variables already
+        reduced to a constant, by their values. A statement reduced to a constant is itself replaced
+        in the statements after it, while the statements depending on a free variable keep referring
+        to their variables, so only the small residual trees are evaluated again when a free variable changes.
+        Free variables are never replaced, even when their current statement is a constant.
+
+        Parameters:
+            fixed (dict): The fixed variables mapped to their values, floats are rounded to 2 decimal places.
+                          They do not need to be defined.
+            free (set): The variables that stay in the residual expression trees.
+
+        Returns:
+            ParseTree: A new parse tree holding the residual statements, with the same budget and mode.
+
+        Raises:
+            ValueError: If a variable is both fixed and free, or a fixed value is not a number.
+        """
+        both = set(fixed) & set(free)
+        if both:
+            raise ValueError(f"Variables cannot be both fixed and free: {', '.join(sorted(both))}")
+        for var, value in fixed.items():
+            if type(value) not in (int, float):
+                raise ValueError(f"Fixed value of {var} must be a number.")
+
+        residual = ParseTree()
+        residual.set_budget(self.__budget)
+        constants = {}
+        for var, value in fixed.items():
+            # Round off fixed floats, as the residual statement of the variable reads them
+            if isinstance(value, float):
+                value = round(value, 2)
+            constants[var] = value
+            residual.add_tree(var, BinaryTree(value))
+
+        for var in self.__dependency_graph.topological_order(self.__optimized_statements):
+            if var in fixed:
+                continue
+            tree = self.__optimizer.optimize(self.__statements[var], constants)
+            key = tree.get_key()
+            if var not in free and not (tree.get_left_tree() and tree.get_right_tree()) and type(key) in (int, float):
+                # Round off floating-point calculations, as evaluating the statement would
+                if isinstance(key, float):
+                    tree = BinaryTree(round(key, 2))
+                constants[var] = tree.get_key()
+            residual.add_tree(var, tree)
+
+        residual.set_reactive(self.__reactive)
+        return residual
 
     def add_statement(self, var, exp_tokens):
         """
         Adds a new variable assignment statement to the parse tree.
 
         This method constructs a parse tree for the given expression tokens and associates it
-        with a variable name. It checks for circular dependencies before adding the statement.
+        with a variable name. It checks for circular dependencies before adding the statement,
+        by inserting the variables the expression refers to in the dependency graph.
+        Only the part of the graph whose order has to change is visited. The statement is then read
+        with get_value, so an error in it is raised right away, while the statement stays added.
+        While a batch is in progress, the statement is only staged until commit is called.
 
         Parameters:
             var (str): The variable name for the assignment.
@@ -248,17 +809,286 @@ class ParseTree:
 
         Raises:
             ValueError: If a circular dependency is detected.
+            EvaluationBudgetExceeded: If a constant does not fit in the budget, or evaluating the statement exceeds it.
+            ZeroDivisionError: If the statement includes division by zero. The statement is still added.
+            RuntimeError: If the statement has a missing operand or operator. The statement is still added.
         """
         # Build the parse tree from the expression tokens
         tree = self.build_parse_tree(exp_tokens)
-        
-        # Associate the parse tree with the variable
+        self.add_tree(var, tree)
+
+        # Report an error of the new statement as soon as it is added, the batch reports them on commit
+        if self.__batch is None:
+            self.get_value(var)
+
+    def add_tree(self, var, tree: BinaryTree):
+        """
+        Adds a new variable assignment statement whose expression tree is already built.
+
+        While a batch is in progress, the statement is only staged until commit is called.
+
+        Parameters:
+            var (str): The variable name for the assignment.
+            tree (BinaryTree): The root of the expression tree assigned to the variable.
+
+        Raises:
+            ValueError: If a circular dependency is detected.
+            EvaluationBudgetExceeded: If a constant does not fit in the budget.
+            EvaluationCancelled: If updating the values in reactive mode is cancelled. The statement is still added.
+        """
+        # Stage the statement if a batch is in progress
+        if self.__batch is not None:
+            self.__batch[var] = tree
+            return
+
+        # Reject constants that do not fit in the budget
+        optimized = self.__optimizer.optimize(tree)
+        if self.__budget is not None:
+            self.__budget.admit(optimized)
+
+        # Check for circular dependencies, the graph is left unchanged if one is detected
+        self.__dependency_graph.set_dependencies(var, self.collect_variables(tree))
+
+        # Associate the parse tree with the variable, and its simplified copy used for evaluation
         self.__statements[var] = tree
-        
-        # Check for circular dependencies
+        self.__optimized_statements[var] = optimized
+        self.__stamp([var])
+
+        # Bring the values depending on the variable up to date
+        if self.__reactive:
+            self.__propagate(var)
+
+    def __stamp(self, variables):
+        """
+        Gives a new version stamp to changed variables and to every variable depending on them,
+        and drops their cached values.
+
+        Parameters:
+            variables (iterable): The variables whose statements were added or modified.
+        """
+        stamp = next(self.__clock)
+        stack = list(variables)
+        for var in stack:
+            self.__versions[var] = stamp
+            self.__cached_values.pop(var, None)
+            self.__cached_failures.pop(var, None)
+        while stack:
+            for dependent in self.__dependency_graph.get_dependents(stack.pop()):
+                if self.__versions.get(dependent) != stamp:
+                    self.__versions[dependent] = stamp
+                    self.__cached_values.pop(dependent, None)
+                    self.__cached_failures.pop(dependent, None)
+                    stack.append(dependent)
+
+    def __propagate(self, var):
+        """
+        Evaluates a changed statement and the statements depending on it again, in topological order.
+
+        Statements are taken from a heap ordered by their position in the dependency graph, so a statement
+        is only evaluated once all the changed statements it depends on are up to date. The dependents
+        of a statement are only scheduled if its value actually changed (early cutoff).
+
+        Parameters:
+            var (str): The variable whose statement was added or modified.
+        """
+        if self.__stale:
+            self.__materialize_all()
+            return
+
+        dependency_graph = self.__dependency_graph
+        heap = [(dependency_graph.get_order(var), var)]
+        scheduled = {var}
+        touched = 0
+        while heap:
+            _, current = heapq.heappop(heap)
+            touched += 1
+            if self.__materialize(current):
+                for dependent in dependency_graph.get_dependents(current):
+                    if dependent not in scheduled and dependent in dependency_graph:
+                        scheduled.add(dependent)
+                        heapq.heappush(heap, (dependency_graph.get_order(dependent), dependent))
+
+        self.__touched = touched
+
+    def __materialize(self, var):
+        """
+        Evaluates a statement from the kept values of the statements it refers to, and keeps its value.
+
+        Parameters:
+            var (str): The variable to evaluate.
+
+        Returns:
+            bool: True if the value or error of the statement changed, False otherwise.
+        """
+        old_value = self.__values.pop(var, None)
+        old_failure = self.__failures.pop(var, None)
+        # Each statement has its own budget, the statements it refers to are already evaluated
+        if self.__budget is not None:
+            self.__budget.start()
+        self.__active_evaluations.add(var)
+        try:
+            # The kept values act as the evaluated variables, and the new value is stored in them
+            value = self.__evaluate_expression(var, self.__optimized_statements[var], self.__values)
+        except EvaluationCancelled as error:
+            # The values are only brought up to date again by the next evaluation
+            self.__stale = True
+            if self.__tracer is not None:
+                self.__tracer.unwind(error)
+            raise
+        except (ZeroDivisionError, RuntimeError, OverflowError) as error:
+            if self.__tracer is not None:
+                self.__tracer.unwind(error)
+            self.__failures[var] = error
+            return old_failure is None or str(old_failure) != str(error)
+        finally:
+            self.__active_evaluations.clear()
+
+        # Integers and floats that compare equal are displayed differently
+        return old_failure is not None or type(old_value) is not type(value) or old_value != value
+
+    def __materialize_all(self):
+        """
+        Evaluates and keeps the value of every statement, in topological order.
+        """
+        self.__values = {}
+        self.__failures = {}
+        self.__stale = False
+
+        order = self.__dependency_graph.topological_order()
+        for var in order:
+            self.__materialize(var)
+        self.__touched = len(order)
+
+    def begin_batch(self):
+        """
+        Starts a batch of statements.
+
+        The statements added until commit is called are staged instead of being added one by one,
+        and are checked for circular dependencies and evaluated only once, when the batch is committed.
+
+        Raises:
+            RuntimeError: If a batch is already in progress.
+        """
+        if self.__batch is not None:
+            raise RuntimeError('A batch of statements is already in progress.')
+        self.__batch = {}
+
+    def in_batch(self):
+        """
+        Checks if a batch of statements is in progress.
+
+        Returns:
+            bool: True if statements are being staged until commit is called, False otherwise.
+        """
+        return self.__batch is not None
+
+    def rollback(self):
+        """
+        Discards the statements staged since begin_batch, if any.
+        """
+        self.__batch = None
+
+    def commit(self):
+        """
+        Adds all the statements staged since begin_batch.
+
+        The dependencies of all the statements are checked at once by sorting them topologically.
+        If a circular dependency is detected, the whole batch is discarded and the statements are left unchanged.
+        The statements are then evaluated in a single pass, and if the evaluation fails, the batch is
+        discarded as well and the previous statements, dependency graph and values are restored.
+
+        Returns:
+            dict: The variables, in alphabetical order, mapped to their evaluated values.
+
+        Raises:
+            RuntimeError: If no batch is in progress.
+            ValueError: If a circular dependency is detected.
+            ZeroDivisionError: If an expression includes division by zero.
+            EvaluationBudgetExceeded: If a constant does not fit in the budget, or an evaluation exceeds it.
+        """
+        if self.__batch is None:
+            raise RuntimeError('No batch of statements is in progress.')
+        batch, self.__batch = self.__batch, None
+
+        # Reject the batch if a constant does not fit in the budget
+        optimized_batch = {var: self.__optimizer.optimize(tree) for var, tree in batch.items()}
+        if self.__budget is not None:
+            for optimized in optimized_batch.values():
+                self.__budget.admit(optimized)
+
+        # Dependencies of the statements once the batch is added
+        dependencies = {var: self.__dependency_graph.get_dependencies(var) for var in self.__statements}
+        for var, tree in batch.items():
+            dependencies[var] = self.collect_variables(tree)
+
+        # Sort the statements topologically, only references to defined variables are edges
+        remaining = {}
+        dependents = {var: [] for var in dependencies}
+        for var, deps in dependencies.items():
+            deps = [dep for dep in deps if dep in dependencies]
+            remaining[var] = len(deps)
+            for dep in deps:
+                dependents[dep].append(var)
+        order = [var for var, count in remaining.items() if count == 0]
+        for var in order:
+            for dependent in dependents[var]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    order.append(dependent)
+
+        if len(order) != len(dependencies):
+            raise ValueError(f"Circular dependency detected for variable: {self.__find_cycle(dependencies, remaining)}")
+
+        # Rebuild the dependency graph in topological order, so no variable has to be reordered
+        dependency_graph = DependencyGraph()
+        for var in order:
+            dependency_graph.set_dependencies(var, dependencies[var])
+
+        # Keep the current state, so it can be restored if evaluating the batch fails
+        previous_graph = self.__dependency_graph
+        previous_trees = {var: self.__statements[var] for var in batch if var in self.__statements}
+        previous_optimized = {var: self.__optimized_statements[var] for var in batch if var in self.__optimized_statements}
+        previous_state = (dict(self.__versions), dict(self.__cached_values), dict(self.__cached_failures),
+                          self.__values, self.__failures, self.__stale, self.__touched)
+
+        self.__dependency_graph = dependency_graph
+        for var, tree in batch.items():
+            self.__statements[var] = tree
+            self.__optimized_statements[var] = optimized_batch[var]
         try:
-            self.evaluate(var, tree)
-        except ValueError:
-            # Roll back the addition if a circular dependency is detected
-            del self.__statements[var]
-            raise ValueError(f"Circular dependency detected for variable: {var}")
\ No newline at end of file
+            self.__stamp(batch)
+            if self.__reactive:
+                self.__materialize_all()
+            return self.evaluate_all()
+        except BaseException:
+            # Any error, even an interruption, leaves the statements as they were before the batch
+            self.__dependency_graph = previous_graph
+            for var in batch:
+                if var in previous_trees:
+                    self.__statements[var] = previous_trees[var]
+                    self.__optimized_statements[var] = previous_optimized[var]
+                else:
+                    del self.__statements[var]
+                    del self.__optimized_statements[var]
+            (self.__versions, self.__cached_values, self.__cached_failures,
+             self.__values, self.__failures, self.__stale, self.__touched) = previous_state
+            raise
+
+    def __find_cycle(self, dependencies, remaining):
+        """
+        Finds a variable on a circular dependency among the variables left out of a topological sort.
+
+        Parameters:
+            dependencies (dict): The variables mapped to the variables they refer to.
+            remaining (dict): The variables mapped to their number of dependencies left unsorted.
+
+        Returns:
+            str: A variable that depends on itself.
+        """
+        # Every variable left unsorted depends on another unsorted one, so following them must loop
+        var = min(var for var, count in remaining.items() if count > 0)
+        visited = set()
+        while var not in visited:
+            visited.add(var)
+            var = min(dep for dep in dependencies[var] if remaining.get(dep, 0) > 0)
+        return var
@@ -0,0 +1,357 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Numeric root finding for the equations that EquationParseTree.rearrange_tree
+# cannot rearrange, such as (x*x)=(2+0) or (2**x)=(x+3). Both sides of many
+# equations are flattened into NumPy arrays grouped by depth, so every equation
+# and every starting point is iterated in lockstep with one ufunc call per
+# operator and depth, by bisection or by Newton's method.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : RootFinder.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import numpy as np
+
+class RootFinder:
+    """
+    Solves equations of one unknown numerically, many at a time.
+
+    An equation left=right is solved as the root of f(x) = left - right, where x is the target variable.
+    Variables with an assignment statement in the workspace are replaced by their value, and any other
+    variable makes the equation impossible to solve numerically.
+
+    The equations are compiled like VectorizedEvaluator compiles statements: every node of every tree
+    gets a row of a value matrix, with one column per starting point or bracket, and the nodes are grouped
+    by their height and operator, so f of all the equations is evaluated with one ufunc call per group.
+    The derivative f' is carried along in forward mode, with the same rules as Differentiator.partials.
+
+    Bisection needs a bracket [lower, upper] where f changes sign, and halves it until it is shorter than
+    the tolerance. Newton's method needs a starting point, and stops when a step is shorter than the
+    tolerance. Both stop after max_iterations. The roots that did not converge are nan.
+
+    Attributes:
+        parse_tree (ParseTree): The workspace giving the values of the other variables, or None.
+        tolerance (float): The width of a bracket, or the length of a step, at which a root has converged,
+                           relative to the size of the root once it is larger than 1.
+        max_iterations (int): The largest number of iterations.
+    """
+
+    # Operator codes used in the flattened node arrays, '=' is evaluated as left - right
+    CONSTANT = 0
+    VARIABLE = 1
+    OPERATORS = {'+': 2, '-': 3, '*': 4, '/': 5, '**': 6, '=': 3}
+
+    def __init__(self, parse_tree=None, tolerance=1e-9, max_iterations=100):
+        """
+        Initializes the root finder.
+
+        Parameters:
+            parse_tree (ParseTree, optional): The workspace giving the values of the other variables.
+                                              Defaults to None.
+            tolerance (float, optional): The tolerance of the roots. Defaults to 1e-9.
+            max_iterations (int, optional): The largest number of iterations. Defaults to 100.
+
+        Raises:
+            ValueError: If the tolerance is not positive or max_iterations is less than 1.
+        """
+        self.__parse_tree = parse_tree
+        self.set_tolerance(tolerance)
+        self.set_max_iterations(max_iterations)
+
+    # Getter methods
+    def get_parse_tree(self):
+        return self.__parse_tree
+
+    def get_tolerance(self):
+        return self.__tolerance
+
+    def get_max_iterations(self):
+        return self.__max_iterations
+
+    # Setter methods
+    def set_parse_tree(self, parse_tree):
+        self.__parse_tree = parse_tree
+
+    def set_tolerance(self, tolerance):
+        """
+        Sets the tolerance of the roots.
+
+        Raises:
+            ValueError: If the tolerance is not positive.
+        """
+        if not tolerance > 0:
+            raise ValueError('Tolerance must be positive.')
+        self.__tolerance = tolerance
+
+    def set_max_iterations(self, max_iterations):
+        """
+        Sets the largest number of iterations.
+
+        Raises:
+            ValueError: If max_iterations is less than 1.
+        """
+        if max_iterations < 1:
+            raise ValueError('The number of iterations must be at least 1.')
+        self.__max_iterations = max_iterations
+
+    def compile(self, equations):
+        """
+        Flattens equations into node arrays grouped by height and operator, without recursion.
+
+        Parameters:
+            equations (list): The equations, as (tree, target) pairs where tree is an equation tree
+                              with '=' at its root and target is the variable to solve for.
+
+        Returns:
+            dict: The compiled program, to pass to evaluate, bisect and newton.
+
+        Raises:
+            ValueError: If an equation refers to a variable, other than its target, that has no value,
+                        or has a missing operand or operator.
+        """
+        ops, lefts, rights, constants, owners, heights = [], [], [], [], [], []
+        roots = []
+        for equation, (tree, target) in enumerate(equations):
+            if tree.get_key() != '=' or not (tree.get_left_tree() and tree.get_right_tree()):
+                raise ValueError('Equation format not supported.')
+            # Tasks are (tree, False) to visit a node and (tree, True) to add it once its subtrees are added
+            tasks = [(tree, False)]
+            nodes = []  # Rows of the subtrees added so far
+            while tasks:
+                node, ready = tasks.pop()
+                left_tree, right_tree = node.get_left_tree(), node.get_right_tree()
+                if left_tree and right_tree and not ready:
+                    tasks.append((node, True))
+                    tasks.append((right_tree, False))
+                    tasks.append((left_tree, False))
+                    continue
+
+                key = node.get_key()
+                left = right = 0
+                constant = 0.0
+                height = 0
+                if ready:
+                    if key not in self.OPERATORS:
+                        raise ValueError(f"Unsupported operator: {key}")
+                    right = nodes.pop()
+                    left = nodes.pop()
+                    op = self.OPERATORS[key]
+                    height = max(heights[left], heights[right]) + 1
+                elif key == target:
+                    op = self.VARIABLE
+                elif isinstance(key, int) or isinstance(key, float):
+                    op = self.CONSTANT
+                    constant = key
+                elif key == '?':
+                    raise ValueError('Equation has a missing operand or operator.')
+                else:
+                    value = 'None'
+                    if self.__parse_tree is not None:
+                        value = self.__parse_tree.get_value(key)
+                    if value == 'None':
+                        raise ValueError(f"Variable {key} has no value, so the equation cannot be solved for {target}.")
+                    op = self.CONSTANT
+                    constant = value
+
+                try:
+                    constant = float(constant)
+                except (TypeError, OverflowError):
+                    raise ValueError(f"Constant {constant} is not a real number that fits in a float.")
+                ops.append(op)
+                lefts.append(left)
+                rights.append(right)
+                constants.append(constant)
+                owners.append(equation)
+                heights.append(height)
+                nodes.append(len(ops) - 1)
+            roots.append(nodes.pop())
+
+        ops = np.array(ops, dtype=np.int64)
+        heights = np.array(heights, dtype=np.int64)
+        steps = []
+        # Every operator of a height only uses nodes of lower heights
+        order = np.lexsort((ops, heights))
+        operators = order[heights[order] > 0]
+        boundaries = np.flatnonzero(np.diff(heights[operators]) | np.diff(ops[operators])) + 1
+        for group in np.split(operators, boundaries):
+            if len(group):
+                steps.append((int(ops[group[0]]), group, np.array(lefts)[group], np.array(rights)[group]))
+
+        return {
+            'size': len(equations),
+            'constants': np.array(constants, dtype=np.float64),
+            'variables': np.flatnonzero(ops == self.VARIABLE),
+            'owners': np.array(owners, dtype=np.int64),
+            'steps': steps,
+            'roots': np.array(roots, dtype=np.int64),
+        }
+
+    def evaluate(self, program, x):
+        """
+        Evaluates f(x) = left - right and its derivative for every equation at once.
+
+        Parameters:
+            program (dict): The program compiled by compile.
+            x (numpy.ndarray): The values of the target variables, one row per equation and one column per point.
+
+        Returns:
+            tuple: The values of f and of its derivative, with the shape of x.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        points = x.shape[1]
+        values = np.repeat(program['constants'][:, None], points, axis=1)
+        derivatives = np.zeros_like(values)
+        variables = program['variables']
+        values[variables] = x[program['owners'][variables]]
+        derivatives[variables] = 1.0
+
+        with np.errstate(all='ignore'):
+            for op, out, left, right in program['steps']:
+                l, r = values[left], values[right]
+                dl, dr = derivatives[left], derivatives[right]
+                if op == 2:
+                    values[out], derivatives[out] = l + r, dl + dr
+                elif op == 3:
+                    values[out], derivatives[out] = l - r, dl - dr
+                elif op == 4:
+                    values[out], derivatives[out] = l * r, dl * r + l * dr
+                elif op == 5:
+                    values[out], derivatives[out] = l / r, (dl * r - l * dr) / (r * r)
+                else:
+                    power = np.power(l, r)
+                    # Only the parts of the derivative that depend on the target are computed, so a constant
+                    # exponent does not need the logarithm of a negative base
+                    derivative = np.where(dl != 0, r * np.power(l, r - 1) * dl, 0.0)
+                    derivative += np.where(dr != 0, power * np.log(l) * dr, 0.0)
+                    values[out], derivatives[out] = power, derivative
+
+        roots = program['roots']
+        return values[roots], derivatives[roots]
+
+    def bisect(self, program, lower, upper):
+        """
+        Finds roots by bisection, halving every bracket in lockstep.
+
+        Parameters:
+            program (dict): The program compiled by compile.
+            lower (array_like): The lower ends of the brackets: one number for all the equations, one number
+                                per equation, or a matrix with one row for all the equations or one row per equation.
+            upper (array_like): The upper ends of the brackets, broadcast like lower.
+
+        Returns:
+            tuple: The roots, and whether each root converged. A bracket where f does not change sign
+                   does not converge, and its root is nan.
+        """
+        lower, upper = self.__points(program, lower), self.__points(program, upper)
+        lower, upper = np.minimum(lower, upper), np.maximum(lower, upper)
+        f_lower, _ = self.evaluate(program, lower)
+        f_upper, _ = self.evaluate(program, upper)
+
+        # A bracket holds a root if f is zero at one of its ends or changes sign
+        exact = np.where(f_lower == 0, lower, np.where(f_upper == 0, upper, np.nan))
+        active = np.isnan(exact) & (np.sign(f_lower) * np.sign(f_upper) < 0)
+        failed = np.isnan(exact) & ~active
+
+        for _ in range(self.__max_iterations):
+            if not active.any():
+                break
+            middle = (lower + upper) / 2
+            f_middle, _ = self.evaluate(program, middle)
+            below = np.sign(f_middle) == np.sign(f_lower)
+            lower = np.where(active & below, middle, lower)
+            f_lower = np.where(active & below, f_middle, f_lower)
+            upper = np.where(active & ~below, middle, upper)
+            exact = np.where(active & (f_middle == 0), middle, exact)
+            active &= (f_middle != 0) & (upper - lower > self.__tolerance * np.maximum(1, np.abs(middle)))
+
+        roots = np.where(np.isnan(exact), (lower + upper) / 2, exact)
+        converged = ~failed & ~active
+        return np.where(converged, roots, np.nan), converged
+
+    def newton(self, program, starts):
+        """
+        Finds roots by Newton's method, stepping every starting point in lockstep.
+
+        Parameters:
+            program (dict): The program compiled by compile.
+            starts (array_like): The starting points: one number for all the equations, one number per equation,
+                                 or a matrix with one row for all the equations or one row per equation.
+
+        Returns:
+            tuple: The roots, and whether each root converged. A point where f' is zero or f is not
+                   defined does not converge, and its root is nan.
+        """
+        x = self.__points(program, starts)
+        active = np.ones(x.shape, dtype=bool)
+        converged = np.zeros(x.shape, dtype=bool)
+
+        for _ in range(self.__max_iterations):
+            if not active.any():
+                break
+            f, derivative = self.evaluate(program, x)
+            with np.errstate(all='ignore'):
+                step = np.where(f == 0, 0.0, f / derivative)
+            valid = np.isfinite(step)
+            x = np.where(active & valid, x - step, x)
+            done = active & valid & (np.abs(step) <= self.__tolerance * np.maximum(1, np.abs(x)))
+            converged |= done
+            active &= valid & ~done
+
+        return np.where(converged, x, np.nan), converged
+
+    def solve(self, tree, target, starts=None):
+        """
+        Finds the distinct real roots of one equation, running Newton's method from many starting points at once.
+
+        Parameters:
+            tree (BinaryTree): The equation tree, with '=' at its root.
+            target (str): The variable to solve for.
+            starts (array_like, optional): The starting points. Defaults to 201 points spread over [-100, 100].
+
+        Returns:
+            list: The distinct roots in increasing order, empty if no starting point converged.
+
+        Raises:
+            ValueError: If the equation refers to a variable, other than the target, that has no value.
+        """
+        program = self.compile([(tree, target)])
+        if starts is None:
+            starts = np.linspace(-100, 100, 201)
+        roots, converged = self.newton(program, np.asarray(starts, dtype=np.float64)[None, :])
+
+        # Keep the roots where f is actually zero, to drop the points where Newton's method stalled
+        roots = roots[converged]
+        f, _ = self.evaluate(program, roots[None, :])
+        roots = np.sort(roots[np.abs(f[0]) <= np.sqrt(self.__tolerance) * np.maximum(1, np.abs(roots))])
+
+        distinct = []
+        for root in roots.tolist():
+            if not distinct or root - distinct[-1] > np.sqrt(self.__tolerance) * max(1, abs(root)):
+                distinct.append(root)
+        return distinct
+
+    def __points(self, program, points):
+        """
+        Broadcasts points to one row per equation.
+
+        Parameters:
+            program (dict): The compiled program.
+            points (array_like): One number for all the equations, one number per equation,
+                                 or a matrix of points with one row for all the equations or one row per equation.
+
+        Returns:
+            numpy.ndarray: The points, one row per equation.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim < 2:
+            points = points.reshape(-1, 1)
+        return np.broadcast_to(points, (program['size'], points.shape[1])).copy()
@@ -0,0 +1,164 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# A class to simplify expression parse trees before they are evaluated.
+# Constant subtrees are folded into a single number and the identities
+# x+0, 0+x, x-0, x*1, 1*x and x**1 are reduced to x, so that statements
+# such as (Pear+0) or (2**4) do not have to be evaluated node by node.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : TreeOptimizer.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+from ADT import BinaryTree
+
+class TreeOptimizer:
+    """
+    A class to simplify expression parse trees before they are evaluated.
+
+    The optimized tree always evaluates to the same result as the original tree:
+    - Constant subtrees are folded, unless folding would raise an error (division by zero,
+      overflow) or produce a very large integer, so errors are still raised when evaluating.
+    - Identities are only applied with the integer constants 0 and 1, since adding the float 0.0
+      to an integer would turn it into a float.
+    - x*0 is only reduced when x is a constant, since a variable may be undefined ('None')
+      or a float, and the result would then not be the integer 0.
+
+    The original tree is left unchanged, so it can still be displayed as it was entered.
+    """
+
+    # Largest number of bits of an integer power folded at insertion
+    MAX_FOLD_BITS = 4096
+
+    def optimize(self, tree: BinaryTree, constants=None):
+        """
+        Builds a simplified copy of an expression tree without recursion.
+
+        Parameters:
+            tree (BinaryTree): The root of the expression tree.
+            constants (dict, optional): Variables replaced by numbers before simplifying. Defaults to None.
+
+        Returns:
+            BinaryTree: The root of the simplified copy.
+        """
+        stack = [(tree, False)]
+        results = []  # Simplified subtrees, in post-order
+
+        while stack:
+            node, children_done = stack.pop()
+            left_tree, right_tree = node.get_left_tree(), node.get_right_tree()
+            if not (left_tree and right_tree):
+                key = node.get_key()
+                if constants and isinstance(key, str) and key in constants:
+                    key = constants[key]
+                results.append(BinaryTree(key))
+                continue
+            if not children_done:
+                # Simplify the children first
+                stack.append((node, True))
+                stack.append((right_tree, False))
+                stack.append((left_tree, False))
+                continue
+
+            right = results.pop()
+            left = results.pop()
+            results.append(self.__simplify(node.get_key(), left, right))
+
+        return results.pop()
+
+    def __simplify(self, op, left: BinaryTree, right: BinaryTree):
+        """
+        Simplifies an operator node whose children are already simplified.
+
+        Parameters:
+            op (str): The operator of the node.
+            left (BinaryTree): The simplified left subtree.
+            right (BinaryTree): The simplified right subtree.
+
+        Returns:
+            BinaryTree: The simplified node.
+        """
+        left_key = self.__constant(left)
+        right_key = self.__constant(right)
+
+        # Fold constant subtrees
+        if left_key is not None and right_key is not None:
+            value = self.__fold(op, left_key, right_key)
+            if value is not None:
+                return BinaryTree(value)
+
+        # Identities, only with integer constants so the type of x is kept
+        if type(right_key) is int:
+            if right_key == 0 and op in ('+', '-'):
+                return left
+            if right_key == 1 and op in ('*', '**'):
+                return left
+        if type(left_key) is int:
+            if left_key == 0 and op == '+':
+                return right
+            if left_key == 1 and op == '*':
+                return right
+
+        node = BinaryTree(op)
+        node.set_left_tree(left)
+        node.set_right_tree(right)
+        return node
+
+    def __constant(self, tree: BinaryTree):
+        """
+        Returns the number held by a leaf node.
+
+        Parameters:
+            tree (BinaryTree): The node.
+
+        Returns:
+            int or float: The number, or None if the node is not a number.
+        """
+        if tree.get_left_tree() or tree.get_right_tree():
+            return None
+        key = tree.get_key()
+        if type(key) in (int, float):
+            return key
+        return None
+
+    def __fold(self, op, left, right):
+        """
+        Computes the result of an operator applied to two numbers, if it is safe to do so at insertion.
+
+        Parameters:
+            op (str): The operator.
+            left (int or float): The left operand.
+            right (int or float): The right operand.
+
+        Returns:
+            int or float: The result, or None if the operation is left to evaluation.
+        """
+        if op == '/' and right == 0:
+            return None
+        # Leave huge integer powers to evaluation, where they are computed only when asked for
+        if op == '**' and type(left) is int and type(right) is int and right > 0 \
+                and left.bit_length() * right > self.MAX_FOLD_BITS:
+            return None
+
+        try:
+            if op == '+': value = left + right
+            elif op == '-': value = left - right
+            elif op == '*': value = left * right
+            elif op == '/': value = left / right
+            elif op == '**': value = left ** right
+            else: return None
+        except (OverflowError, ZeroDivisionError):
+            return None
+
+        # Complex powers cannot be stored as a number key
+        if type(value) not in (int, float):
+            return None
+        return value
@@ -0,0 +1,329 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# A level-synchronous evaluator that evaluates every assignment statement of a
+# ParseTree at once. The dependency DAG of the statements is flattened into
+# NumPy arrays and grouped into topological levels, so that all the '+', '-',
+# '*', '/' and '**' nodes of a level are evaluated with one ufunc call each.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : VectorizedEvaluator.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import numpy as np
+
+class VectorizedEvaluator:
+    """
+    Evaluates all the assignment statements of a ParseTree level by level using NumPy.
+
+    Every node of every expression tree is given a slot in a dense float64 value vector.
+    A variable reference does not get a slot of its own, it points to the slot of the root
+    of the referenced statement. Nodes are then grouped by their depth in the dependency DAG
+    (their topological level) and by operator, so each group is evaluated with one ufunc call.
+
+    The results match ParseTree.evaluate, including the 2 decimal place rounding applied every
+    time a variable is evaluated, integer results and 'None' for undefined variables. Integer
+    slots are kept free of negative zero, since the float64 product 0*(-3) gives -0.0 where the
+    integers of ParseTree.evaluate give 0, and -0.0 would change the sign of a later division.
+    Statements whose value cannot be represented exactly in float64 (integers above 2**53,
+    overflows or complex powers) or that raise an error (division by zero) are evaluated
+    again with ParseTree.evaluate, in alphabetical order, so they give the same results and errors.
+
+    Attributes:
+        parse_tree (ParseTree): The parse tree holding the assignment statements.
+        program (dict): The compiled evaluation program, or None if not compiled yet.
+    """
+
+    # Operator codes used in the flattened node arrays
+    OPERATORS = {'+': 1, '-': 2, '*': 3, '/': 4, '**': 5}
+    UFUNCS = {1: np.add, 2: np.subtract, 3: np.multiply, 4: np.true_divide, 5: np.power}
+
+    # Largest magnitude up to which every integer is exactly representable in float64
+    MAX_EXACT_INT = 2 ** 53
+
+    def __init__(self, parse_tree):
+        """
+        Initializes the evaluator for the given parse tree.
+
+        Parameters:
+            parse_tree (ParseTree): The parse tree holding the assignment statements.
+        """
+        self.__parse_tree = parse_tree
+        self.__program = None
+
+    def get_parse_tree(self):
+        """Returns the parse tree being evaluated."""
+        return self.__parse_tree
+
+    def set_parse_tree(self, parse_tree):
+        """Sets the parse tree to evaluate and discards the compiled program."""
+        self.__parse_tree = parse_tree
+        self.__program = None
+
+    def get_program(self):
+        """Returns the compiled evaluation program."""
+        return self.__program
+
+    def compile(self):
+        """
+        Flattens the statements of the parse tree into level grouped NumPy index arrays.
+
+        The program has to be compiled again whenever the statements of the parse tree change.
+
+        Returns:
+            VectorizedEvaluator: The evaluator itself, to allow chaining with evaluate_all.
+
+        Raises:
+            ValueError: If a circular dependency is detected.
+            RuntimeError: If an expression tree has a missing operand or operator.
+        """
+        # The simplified trees are compiled, since ParseTree.evaluate evaluates them, and identities
+        # such as x+0 -> x keep a -0.0 that the addition would turn into 0.0
+        statements = self.__parse_tree.get_statements()
+        optimized_statements = self.__parse_tree.get_optimized_statements()
+        items = [(var, optimized_statements[var]) for var in sorted(statements)]
+        trees = dict(items)
+
+        # Collect the variables each statement refers to
+        dependencies = {}
+        for var, tree in items:
+            dependencies[var] = {key for key in self.__leaf_keys(tree) if isinstance(key, str) and key in trees}
+
+        order = self.__topological_order(dependencies)
+
+        # Slot 0 holds the value of every undefined variable
+        ops, lefts, rights, levels = [0], [0], [0], [0]
+        values, is_int, exact = [0.0], [True], [True]
+        roots = {}
+
+        def add_node(op, left, right, level, value, integer, is_exact):
+            ops.append(op)
+            lefts.append(left)
+            rights.append(right)
+            levels.append(level)
+            values.append(value)
+            is_int.append(integer)
+            exact.append(is_exact)
+            return len(ops) - 1
+
+        for var in order:
+            tree = trees[var]
+            slots = []  # Slots of evaluated subtrees, in post-order
+            stack = [(tree, False)]
+            while stack:
+                node, children_done = stack.pop()
+                left, right = node.get_left_tree(), node.get_right_tree()
+                if left and right:
+                    if not children_done:
+                        # Visit the children first, left before right
+                        stack.append((node, True))
+                        stack.append((right, False))
+                        stack.append((left, False))
+                        continue
+                    right_slot = slots.pop()
+                    left_slot = slots.pop()
+                    op = self.OPERATORS.get(node.get_key())
+                    if op is None:
+                        raise ValueError(f"Unsupported operator: {node.get_key()}")
+                    level = 1 + max(levels[left_slot], levels[right_slot])
+                    slots.append(add_node(op, left_slot, right_slot, level, 0.0, False, True))
+                else:
+                    key = node.get_key()
+                    if key == '?':
+                        raise RuntimeError('Error evaluating expression due to missing operand or operator.')
+                    if isinstance(key, (int, float)):
+                        # A constant statement is rounded like any other evaluated variable
+                        if node is tree and isinstance(key, float):
+                            key = round(key, 2)
+                        try:
+                            value, is_exact = float(key), isinstance(key, float) or abs(key) <= self.MAX_EXACT_INT
+                        except OverflowError:
+                            value, is_exact = np.inf, False
+                        slots.append(add_node(0, 0, 0, 0, value, isinstance(key, int), is_exact))
+                    else:
+                        # A variable reference points to the root of its statement, or to slot 0 if undefined
+                        slots.append(roots.get(key, 0))
+            roots[var] = slots.pop()
+
+        ops = np.array(ops, dtype=np.int8)
+        lefts = np.array(lefts, dtype=np.int64)
+        rights = np.array(rights, dtype=np.int64)
+        levels = np.array(levels, dtype=np.int64)
+
+        # Group the operator nodes by level, then by operator
+        interior = np.nonzero(ops)[0]
+        interior = interior[np.lexsort((ops[interior], levels[interior]))]
+        steps = []
+        if len(interior):
+            keys = levels[interior] * 8 + ops[interior]
+            bounds = np.flatnonzero(np.diff(keys)) + 1
+            for group in np.split(interior, bounds):
+                steps.append((int(levels[group[0]]), int(ops[group[0]]), group, lefts[group], rights[group]))
+
+        # Statement roots that are operator nodes get rounded at the end of their level
+        root_slots = np.unique(np.array([slot for slot in roots.values() if ops[slot]], dtype=np.int64))
+        root_levels = {}
+        for level in np.unique(levels[root_slots]):
+            root_levels[int(level)] = root_slots[levels[root_slots] == level]
+
+        self.__program = {
+            'size': len(ops),
+            'values': np.array(values, dtype=np.float64),
+            'is_int': np.array(is_int, dtype=bool),
+            'exact': np.array(exact, dtype=bool),
+            'steps': steps,
+            'root_levels': root_levels,
+            'roots': [(var, roots[var]) for var, _ in items],
+            'trees': {var: statements[var] for var, _ in items},
+        }
+        return self
+
+    def evaluate_all(self):
+        """
+        Evaluates every assignment statement of the parse tree.
+
+        Returns:
+            dict: The variables, in alphabetical order, mapped to their evaluated values
+                  (int, float or 'None' if the statement depends on an undefined variable).
+
+        Raises:
+            ValueError: If a circular dependency is detected.
+            ZeroDivisionError: If an expression includes division by zero.
+        """
+        if self.__program is None:
+            self.compile()
+        program = self.__program
+
+        values = program['values'].copy()
+        is_int = program['is_int'].copy()
+        exact = program['exact'].copy()
+        defined = np.ones(program['size'], dtype=bool)
+        defined[0] = False
+
+        root_levels = program['root_levels']
+        current_level = None
+        with np.errstate(all='ignore'):
+            for level, op, out, left, right in program['steps']:
+                if level != current_level:
+                    if current_level in root_levels:
+                        self.__round_roots(values, is_int, defined, root_levels[current_level])
+                    current_level = level
+
+                left_values, right_values = values[left], values[right]
+                both_defined = defined[left] & defined[right]
+                both_exact = exact[left] & exact[right]
+
+                if op == 4:
+                    # Divisions by zero are left to ParseTree.evaluate, so errors are raised in the same order
+                    both_exact &= ~(both_defined & (right_values == 0))
+
+                result = self.UFUNCS[op](left_values, right_values)
+
+                if op == 4:
+                    integer = np.zeros(len(out), dtype=bool)
+                elif op == 5:
+                    integer = is_int[left] & is_int[right] & (right_values >= 0)
+                else:
+                    integer = is_int[left] & is_int[right]
+                # Integers have no negative zero, so 0*(-3) gives 0 and not -0.0, like the int of ParseTree.evaluate
+                result[integer] += 0.0
+
+                # Results that float64 cannot hold exactly are evaluated again with ParseTree.evaluate
+                representable = np.isfinite(result) & (~integer | (np.abs(result) <= self.MAX_EXACT_INT))
+
+                values[out] = result
+                is_int[out] = integer
+                defined[out] = both_defined
+                exact[out] = both_exact & (~both_defined | representable)
+
+            if current_level in root_levels:
+                self.__round_roots(values, is_int, defined, root_levels[current_level])
+
+        results = {}
+        for var, slot in program['roots']:
+            if not exact[slot]:
+                results[var] = self.__parse_tree.evaluate(var, program['trees'][var])
+            elif not defined[slot]:
+                results[var] = 'None'
+            elif is_int[slot]:
+                results[var] = int(values[slot])
+            else:
+                results[var] = float(values[slot])
+        return results
+
+    def __round_roots(self, values, is_int, defined, slots):
+        """
+        Rounds the float values of evaluated statement roots to 2 decimal places.
+
+        The builtin round is mapped over the values so the rounding is identical to ParseTree.evaluate.
+
+        Parameters:
+            values (ndarray): The value vector.
+            is_int (ndarray): Whether each slot holds an integer.
+            defined (ndarray): Whether each slot holds a defined value.
+            slots (ndarray): The statement roots to round.
+        """
+        slots = slots[~is_int[slots] & defined[slots]]
+        if len(slots):
+            values[slots] = list(map(round, values[slots].tolist(), [2] * len(slots)))
+
+    def __leaf_keys(self, tree):
+        """
+        Collects the keys of the leaf nodes of an expression tree without recursion.
+
+        Parameters:
+            tree (BinaryTree): The root of the expression tree.
+
+        Returns:
+            list: The keys of the leaf nodes.
+        """
+        keys = []
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            left, right = node.get_left_tree(), node.get_right_tree()
+            if left and right:
+                stack.append(left)
+                stack.append(right)
+            else:
+                keys.append(node.get_key())
+        return keys
+
+    def __topological_order(self, dependencies):
+        """
+        Orders the variables so that every variable comes after the variables it depends on.
+
+        Parameters:
+            dependencies (dict): The variables mapped to the set of defined variables they refer to.
+
+        Returns:
+            list: The variables in topological order.
+
+        Raises:
+            ValueError: If a circular dependency is detected.
+        """
+        remaining = {var: len(deps) for var, deps in dependencies.items()}
+        dependents = {var: [] for var in dependencies}
+        for var, deps in dependencies.items():
+            for dep in deps:
+                dependents[dep].append(var)
+
+        order = [var for var, count in remaining.items() if count == 0]
+        for var in order:
+            for dependent in dependents[var]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    order.append(dependent)
+
+        if len(order) != len(dependencies):
+            var = min(var for var, count in remaining.items() if count > 0)
+            raise ValueError(f"Circular dependency detected for variable: {var}")
+        return order
@@ -0,0 +1,313 @@
+# -----------------------------------------------------
+# ST1507 DSAA
+# CA2
+#
+# Compiles all the assignment statements of a ParseTree into a Python module.
+# Every statement becomes a local assignment, in topological order, inside one
+# evaluate function. The module is cached on disk under a hash of the text of the
+# statements, so it is only generated once, importlib reuses its compiled bytecode,
+# and a cached module can be found before the statements are even parsed.
+#
+# -----------------------------------------------------
+#
+# Author    : Lim Zhen Yang
+# StudentID : 2214506
+# Class     : DAAA/FT/2B/04
+# Date      : 7-Feb-2023
+# Filename  : WorkspaceCompiler.py
+#
+# -----------------------------------------------------
+# To run: python main.py
+# -----------------------------------------------------
+import hashlib
+import importlib.util
+import math
+import os
+
+class WorkspaceCompiler:
+    """
+    Compiles all the assignment statements of a ParseTree into an importable Python module.
+
+    The generated evaluate function gives the same results as ParseTree.evaluate_all:
+    - Statements are assigned in the topological order of the dependency graph, to locals named v_<variable>.
+    - Every statement value is rounded to 2 decimal places if it is a float.
+    - Statements the dependency graph reports as resolved never meet an undefined value, so their
+      expressions need no 'None' checks. The other statements apply every operator through _op, which
+      gives 'None' like ParseTree.apply_operator, and still raise the errors of the rest of their tree.
+    - Divisions go through a guard raising the same ZeroDivisionError as the ParseTree.
+    Evaluation budgets are not checked by the generated code.
+
+    Attributes:
+        parse_tree (ParseTree): The parse tree holding the assignment statements.
+        cache_directory (str): The directory holding the generated modules.
+    """
+
+    # Changing the generated code or the hash must change this version, so cached modules are generated again
+    VERSION = 4
+
+    # Deepest nesting of an expression before a subexpression is assigned to a temporary
+    MAX_NESTING = 50
+
+    HEADER = '''# Generated from a workspace of assignment statements, do not edit.
+
+def _r(value):
+    return round(value, 2) if isinstance(value, float) else value
+
+def _div(left, right):
+    if right == 0:
+        raise ZeroDivisionError('Division by zero error')
+    return left / right
+
+def _missing():
+    raise RuntimeError('Error evaluating expression due to missing operand or operator.')
+
+def _op(op, left, right):
+    if left == 'None' or right == 'None':
+        return 'None'
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    if op == '/':
+        return _div(left, right)
+    if op == '**':
+        return left ** right
+
+def evaluate():
+'''
+
+    def __init__(self, parse_tree, cache_directory='.workspace_cache'):
+        """
+        Initializes the compiler for the given parse tree.
+
+        Parameters:
+            parse_tree (ParseTree): The parse tree holding the assignment statements.
+            cache_directory (str, optional): The directory holding the generated modules. Defaults to '.workspace_cache'.
+        """
+        self.__parse_tree = parse_tree
+        self.__cache_directory = cache_directory
+        self.__modules = {}  # Modules already loaded, by workspace hash
+
+    def get_parse_tree(self):
+        """Returns the parse tree being compiled."""
+        return self.__parse_tree
+
+    def set_parse_tree(self, parse_tree):
+        """Sets the parse tree to compile."""
+        self.__parse_tree = parse_tree
+
+    def get_cache_directory(self):
+        """Returns the directory holding the generated modules."""
+        return self.__cache_directory
+
+    def set_cache_directory(self, cache_directory):
+        """Sets the directory holding the generated modules."""
+        self.__cache_directory = cache_directory
+
+    @classmethod
+    def statements_hash(cls, statements):
+        """
+        Computes the hash naming the module of statements given as text, so no parsing is needed.
+
+        Parameters:
+            statements (iterable): The statements as 'var=expression' strings without spaces, one per
+                                   variable, in any order, e.g. the lines of a file of statements.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest of the statements.
+        """
+        digest = hashlib.sha256(f"WorkspaceCompiler {cls.VERSION}\n".encode())
+        for statement in sorted(statements):
+            digest.update(f"{statement}\n".encode())
+        return digest.hexdigest()
+
+    def workspace_hash(self):
+        """
+        Computes the hash of the statements of the parse tree, used to name the generated module.
+        It is the hash of their text, as given by statements_hash.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest of the statements.
+        """
+        statements = self.__parse_tree.get_statements()
+        if not len(statements):
+            return self.statements_hash([])
+        return self.statements_hash(f"{var}={tree.shallow_tree()}" for var, tree in statements.getitem_inorder())
+
+    def generate_source(self):
+        """
+        Generates the Python source of the module.
+
+        Returns:
+            str: The source, defining an evaluate function returning the variables in alphabetical order
+                 mapped to their evaluated values.
+        """
+        optimized_statements = self.__parse_tree.get_optimized_statements()
+        dependency_graph = self.__parse_tree.get_dependency_graph()
+
+        lines = [self.HEADER]
+        temporaries = [0]  # Number of temporaries used so far, shared by all the statements
+        for var in dependency_graph.topological_order(optimized_statements):
+            resolved = dependency_graph.is_resolved(var)
+            expression = self.__expression(optimized_statements[var], lines, temporaries, resolved)
+            lines.append(f"    v_{var} = _r({expression})\n")
+
+        results = ', '.join(f"{var!r}: v_{var}" for var in sorted(optimized_statements))
+        lines.append(f"    return {{{results}}}\n")
+        return ''.join(lines)
+
+    def load(self):
+        """
+        Loads the module of the current statements, generating it first if it is not cached on disk.
+
+        Returns:
+            module: The module, whose evaluate function evaluates all the statements.
+        """
+        workspace_hash = self.workspace_hash()
+        module = self.__modules.get(workspace_hash)
+        if module is not None:
+            return module
+
+        path = self.__module_path(workspace_hash)
+        if not os.path.exists(path):
+            os.makedirs(self.__cache_directory, exist_ok=True)
+            # Write to a temporary file first, so a partly written module is never imported
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'w') as file:
+                file.write(self.generate_source())
+            os.replace(temporary_path, path)
+        return self.__import(workspace_hash)
+
+    def find(self, statements):
+        """
+        Finds the cached module of statements given as text, without parsing them.
+
+        Parameters:
+            statements (iterable): The statements as 'var=expression' strings, as taken by statements_hash.
+
+        Returns:
+            module: The module, whose evaluate function evaluates all the statements, or None if it is not cached.
+        """
+        workspace_hash = self.statements_hash(statements)
+        module = self.__modules.get(workspace_hash)
+        if module is None and os.path.exists(self.__module_path(workspace_hash)):
+            module = self.__import(workspace_hash)
+        return module
+
+    def __module_path(self, workspace_hash):
+        """
+        Returns the path of the module of a workspace hash in the cache directory.
+        """
+        return os.path.join(self.__cache_directory, f"workspace_{workspace_hash[:16]}.py")
+
+    def __import(self, workspace_hash):
+        """
+        Imports the cached module of a workspace hash and keeps it loaded.
+
+        Parameters:
+            workspace_hash (str): The hash of the statements of the module.
+
+        Returns:
+            module: The module.
+        """
+        # The source file loader reuses the compiled bytecode it keeps in __pycache__
+        name = f"workspace_{workspace_hash[:16]}"
+        spec = importlib.util.spec_from_file_location(name, self.__module_path(workspace_hash))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        self.__modules[workspace_hash] = module
+        return module
+
+    def evaluate_all(self):
+        """
+        Evaluates every assignment statement with a single call to the generated module.
+
+        Returns:
+            dict: The variables, in alphabetical order, mapped to their evaluated values.
+
+        Raises:
+            ZeroDivisionError: If an expression includes division by zero.
+            RuntimeError: If an expression has a missing operand or operator.
+        """
+        return self.load().evaluate()
+
+    def __expression(self, tree, lines, temporaries, resolved=True):
+        """
+        Generates the Python expression of an expression tree without recursion.
+        Subexpressions nested deeper than MAX_NESTING are assigned to temporaries first,
+        so the generated code stays within the limits of the Python parser.
+
+        Parameters:
+            tree (BinaryTree): The root of the simplified expression tree.
+            lines (list): The lines of the source, the temporaries are appended to it.
+            temporaries (list): A single counter of the temporaries used so far.
+            resolved (bool, optional): Whether the statement only refers to defined variables. Defaults to True.
+
+        Returns:
+            str: The Python expression.
+        """
+        stack = [(tree, False)]
+        results = []  # (expression, nesting) of the subtrees, in post-order
+
+        while stack:
+            node, children_done = stack.pop()
+            left_tree, right_tree = node.get_left_tree(), node.get_right_tree()
+            if not (left_tree and right_tree):
+                results.append((self.__leaf(node.get_key(), resolved), 0))
+                continue
+            if not children_done:
+                stack.append((node, True))
+                stack.append((right_tree, False))
+                stack.append((left_tree, False))
+                continue
+
+            right, right_nesting = results.pop()
+            left, left_nesting = results.pop()
+            op = node.get_key()
+            if not resolved:
+                # An operand can be 'None'
+                expression = f"_op({op!r}, {left}, {right})"
+            elif op == '/':
+                expression = f"_div({left}, {right})"
+            elif op in ('+', '-', '*', '**'):
+                expression = f"({left} {op} {right})"
+            else:
+                # ParseTree.apply_operator gives None for any other operator
+                expression = f"({left}, {right}, None)[2]"
+            nesting = max(left_nesting, right_nesting) + 1
+
+            if nesting > self.MAX_NESTING:
+                temporaries[0] += 1
+                temporary = f"_t{temporaries[0]}"
+                lines.append(f"    {temporary} = {expression}\n")
+                expression, nesting = temporary, 0
+            results.append((expression, nesting))
+
+        return results.pop()[0]
+
+    def __leaf(self, key, resolved=True):
+        """
+        Generates the Python expression of a leaf node.
+
+        Parameters:
+            key: The key of the leaf node.
+            resolved (bool, optional): Whether the statement only refers to defined variables. Defaults to True.
+
+        Returns:
+            str: The Python expression.
+        """
+        if key == '?':
+            return '_missing()'
+        if isinstance(key, float) and not math.isfinite(key):
+            return f"float('{key!r}')"
+        if isinstance(key, int) or isinstance(key, float):
+            # A negative constant is grouped, since -3 ** v_B is read as -(3 ** v_B)
+            if math.copysign(1, key) < 0:
+                return f"({key!r})"
+            return repr(key)
+        # Resolved statements only refer to defined variables
+        if not resolved and key not in self.__parse_tree.get_optimized_statements():
+            return "'None'"
+        return f"v_{key}"
@@ -18,6 +18,19 @@
 from .ParseTree import *
 from .FileHandler import *
 from .MergeSort import *
+from .BottomUpMergeSort import *
 from .ExpressionTokenizer import *
 from .Validation import *
-from .EquationParseTree import *
\ No newline at end of file
+from .EquationParseTree import *
+from .VectorizedEvaluator import *
+from .TreeOptimizer import *
+from .ParallelEvaluator import *
+from .EvaluationBudget import *
+from .EvaluationTracer import *
+from .WorkspaceCompiler import *
+from .Differentiator import *
+from .LinearSystemSolver import *
+from .AffineCompiler import *
+from .RootFinder import *
+from .ExternalMergeSort import *
+from .ParallelMergeSort import *
\ No newline at end of file